@@ -0,0 +1,10 @@
+"""
+Performance benchmarks of the command line, run from the root of the project with `python -m benchmarks.<name>`.
+"""
+import sys
+from pathlib import Path
+
+# The modules of the project are flat in src, as in the tests run with PYTHONPATH=src
+SOURCE_DIRECTORY = Path(__file__).resolve().parent.parent / 'src'
+if str(SOURCE_DIRECTORY) not in sys.path:
+    sys.path.insert(0, str(SOURCE_DIRECTORY))
@@ -0,0 +1,101 @@
+"""
+Measures the end-to-end wall time and network use of the command line against the local fake Jira server.
+
+    python -m benchmarks.end_to_end [--issues 2000] [--latency 0.05] [--rate-limit 20] [--backend json] [--transport async] [--activity-filter]
+
+The report is generated by the display-daily-tickets entry point, run from the sources, and the results are written as JSON.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import SOURCE_DIRECTORY
+from benchmarks.fake_jira import FakeJira, FakeJiraServer
+from benchmarks.payloads import REPORT_USER, STATUS_MAPPING, Workload, generate_raw_issues
+
+
+def write_config(path: Path, server_url: str, workload: Workload, backend: str, transport: str, max_workers: int,
+                 activity_filter: bool = False):
+    status_mapping = '\n'.join(f'{status_id} = {status.name}' for status_id, status in STATUS_MAPPING.items())
+    path.write_text(f"""[Jira]
+server = {server_url}
+username = bench
+api_token = bench
+project_key = {workload.project}
+backend = {backend}
+transport = {transport}
+max_workers = {max_workers}
+activity_filter = {str(activity_filter).lower()}
+
+[Report]
+username = {REPORT_USER['name']}
+introduction = Synthetic report
+
+[Logging]
+level = WARNING
+
+[StatusMapping]
+{status_mapping}
+""", encoding='utf-8')
+
+
+def main():
+    defaults = Workload()
+    parser = argparse.ArgumentParser(description="Benchmarks the command line against a local fake Jira server.")
+    parser.add_argument("--issues", type=int, default=defaults.issues, help="Number of issues of the project.")
+    parser.add_argument("--histories", type=int, default=defaults.histories, help="Number of changelog histories per issue.")
+    parser.add_argument("--comments", type=int, default=defaults.comments, help="Number of comments per issue.")
+    parser.add_argument("--today-fraction", type=float, default=defaults.today_fraction, help="Fraction of the issues updated today.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency added to every request, in seconds.")
+    parser.add_argument("--rate-limit", type=int, help="Maximum number of requests per second, the others get a 429 response.")
+    parser.add_argument("--backend", default='json', help="The [Jira] backend option.")
+    parser.add_argument("--transport", default='sync', help="The [Jira] transport option.")
+    parser.add_argument("--max-workers", type=int, default=8, help="The [Jira] max_workers option.")
+    parser.add_argument("--activity-filter", action='store_true', help="Sets the [Jira] activity_filter option.")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="Number of runs.")
+    parser.add_argument("-o", "--output", help="File to write the JSON results to (default: standard output).")
+    args = parser.parse_args()
+
+    workload = Workload(issues=args.issues, histories=args.histories, comments=args.comments, today_fraction=args.today_fraction)
+    fake_jira = FakeJira(generate_raw_issues(workload, datetime.now().astimezone()))
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = Path(directory) / 'config.ini'
+        for _ in range(args.runs):
+            # Every run gets a fresh server, so that the traffic statistics are the run's own
+            server = FakeJiraServer(fake_jira, latency=args.latency, rate_limit=args.rate_limit).start()
+            try:
+                write_config(config_path, server.url, workload, args.backend, args.transport, args.max_workers, args.activity_filter)
+                started = time.perf_counter()
+                result = subprocess.run([sys.executable, str(SOURCE_DIRECTORY / 'display.py'), '-c', str(config_path)],
+                                        check=False, capture_output=True, text=True)
+                wall_time = time.perf_counter() - started
+                if result.returncode != 0:
+                    sys.exit(f"The report failed: {result.stderr}")
+                runs.append({'wall_seconds': wall_time, 'report_lines': len(result.stdout.splitlines()), **server.statistics()})
+            finally:
+                server.stop()
+
+    results = {
+        'workload': {'issues': workload.issues, 'histories': workload.histories, 'comments': workload.comments,
+                     'today_fraction': workload.today_fraction},
+        'options': {'latency': args.latency, 'rate_limit': args.rate_limit, 'backend': args.backend, 'transport': args.transport,
+                    'max_workers': args.max_workers, 'activity_filter': args.activity_filter},
+        'runs': runs,
+        'median_wall_seconds': sorted(run['wall_seconds'] for run in runs)[len(runs) // 2],
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+"""
+A local stand-in for a Jira Server REST API, serving a synthetic project, to measure the network use of the client.
+
+    python -m benchmarks.fake_jira [--port 8080] [--issues 2000] [--latency 0.05] [--rate-limit 20]
+
+Point the [Jira] server option of a configuration file to the printed URL, with the report username 'user0'.
+The search, changelog, comment, user, myself and status endpoints follow the Jira pagination semantics: the page size is
+capped by the server, and an issue expanded with its changelog only holds its first histories, as on a real server.
+"""
+import argparse
+import gzip
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.payloads import STATUSES, USERS, Workload, generate_raw_issues
+from issue import parse_jira_date, start_of_day
+
+REST_API_PATH = '/rest/api/2/'
+# The page size limits of a default Jira Server
+MAX_SEARCH_RESULTS = 50
+MAX_CHANGELOG_RESULTS = 100
+MAX_COMMENT_RESULTS = 50
+EXPANDED_CHANGELOG_SIZE = 20
+JQL_DATE_FORMAT = '%Y/%m/%d %H:%M'
+FIELDS = [
+    {'id': field_id, 'name': name, 'custom': False, 'navigable': True, 'searchable': True, 'clauseNames': [field_id]}
+    for field_id, name in [('summary', 'Summary'), ('status', 'Status'), ('assignee', 'Assignee'), ('issuetype', 'Issue Type'),
+                           ('updated', 'Updated'), ('comment', 'Comment')]
+]
+
+
+class FakeJira:
+    """
+    The synthetic project and the REST endpoints, independent of the HTTP layer.
+    """
+
+    def __init__(self, raw_issues: list[dict[str, Any]], report_user: dict[str, Any] = USERS[0]):
+        self.raw_issues = raw_issues
+        self.raw_issues_by_key = {raw_issue['key']: raw_issue for raw_issue in raw_issues}
+        self.report_user = report_user
+
+    def handle(self, method: str, path: str, params: dict[str, list[str]], body: dict[str, Any] | None) -> tuple[int, Any]:
+        if method == 'POST' and body:
+            params = {name: value if isinstance(value, list) else [value] for name, value in body.items()}
+        if path == 'serverInfo':
+            return 200, {'baseUrl': 'http://localhost', 'version': '9.12.0', 'versionNumbers': [9, 12, 0], 'deploymentType': 'Server'}
+        if path == 'myself':
+            return 200, self.report_user
+        if path == 'status':
+            return 200, STATUSES
+        if path == 'field':
+            return 200, FIELDS
+        if path == 'user/search':
+            username = _param(params, 'username') or _param(params, 'query')
+            return 200, [user for user in USERS if username in (user['name'], user['displayName'], user['emailAddress'])]
+        if path == 'search':
+            if 'issueFunction' in (_param(params, 'jql') or ''):
+                # As on a server without ScriptRunner
+                return 400, {'errorMessages': ["Field 'issueFunction' does not exist or you do not have permission to view it."], 'errors': {}}
+            return 200, self.search(params)
+
+        match = re.fullmatch(r'issue/([^/]+)(/changelog|/comment)?', path)
+        if match is None or match.group(1) not in self.raw_issues_by_key:
+            return 404, {'errorMessages': ['Issue Does Not Exist'], 'errors': {}}
+        raw_issue = self.raw_issues_by_key[match.group(1)]
+        if match.group(2) == '/changelog':
+            return 200, self.changelog(raw_issue, params)
+        if match.group(2) == '/comment':
+            return 200, self.comments(raw_issue, params)
+        return 200, self.issue(raw_issue, params)
+
+    def search(self, params: dict[str, list[str]]) -> dict[str, Any]:
+        jql = _param(params, 'jql') or ''
+        matches = [raw_issue for raw_issue in self.raw_issues if _matches(raw_issue, jql)]
+        start_at, max_results = _page(params, MAX_SEARCH_RESULTS)
+        fields = _fields(params)
+        expand = _param(params, 'expand') or ''
+        return {
+            'expand': 'names,schema',
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(matches),
+            'issues': [_issue_view(raw_issue, fields, expand) for raw_issue in matches[start_at:start_at + max_results]],
+        }
+
+    def issue(self, raw_issue: dict[str, Any], params: dict[str, list[str]]) -> dict[str, Any]:
+        return _issue_view(raw_issue, _fields(params), _param(params, 'expand') or '')
+
+    def changelog(self, raw_issue: dict[str, Any], params: dict[str, list[str]]) -> dict[str, Any]:
+        histories = raw_issue['changelog']['histories']
+        start_at, max_results = _page(params, MAX_CHANGELOG_RESULTS)
+        values = histories[start_at:start_at + max_results]
+        return {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(histories),
+            'isLast': start_at + len(values) >= len(histories),
+            'values': values,
+        }
+
+    def comments(self, raw_issue: dict[str, Any], params: dict[str, list[str]]) -> dict[str, Any]:
+        comments = raw_issue['fields']['comment']['comments']
+        if _param(params, 'orderBy') in ('-created', '-updated'):
+            comments = comments[::-1]
+        start_at, max_results = _page(params, MAX_COMMENT_RESULTS)
+        return {'startAt': start_at, 'maxResults': max_results, 'total': len(comments), 'comments': comments[start_at:start_at + max_results]}
+
+
+def _param(params: dict[str, list[str]], name: str) -> str | None:
+    values = params.get(name)
+    return str(values[0]) if values else None
+
+
+def _page(params: dict[str, list[str]], max_page_size: int) -> tuple[int, int]:
+    start_at = int(_param(params, 'startAt') or 0)
+    # As on a real server, the requested page size is silently capped
+    max_results = min(int(_param(params, 'maxResults') or max_page_size), max_page_size)
+    return start_at, max_results
+
+
+def _fields(params: dict[str, list[str]]) -> list[str] | None:
+    values = params.get('fields')
+    if not values:
+        return None
+    fields = [field for value in values for field in str(value).split(',') if field]
+    return None if '*all' in fields or '*navigable' in fields else fields
+
+
+def _issue_view(raw_issue: dict[str, Any], fields: list[str] | None, expand: str) -> dict[str, Any]:
+    issue_fields = raw_issue['fields'] if fields is None else {name: value for name, value in raw_issue['fields'].items() if name in fields}
+    view = {'id': raw_issue['id'], 'key': raw_issue['key'], 'self': f"http://localhost{REST_API_PATH}issue/{raw_issue['id']}", 'fields': issue_fields}
+    if 'changelog' in expand:
+        # The expanded changelog is truncated, the changelog endpoint must be paged to get all the histories
+        histories = raw_issue['changelog']['histories']
+        truncated = histories[:EXPANDED_CHANGELOG_SIZE]
+        view['changelog'] = {'startAt': 0, 'maxResults': len(truncated), 'total': len(histories), 'histories': truncated}
+    return view
+
+
+def _matches(raw_issue: dict[str, Any], jql: str) -> bool:
+    """
+    Evaluates the JQL clauses sent by the client, the other clauses are considered as always true.
+    """
+    clauses = re.split(r'\s+ORDER BY\s+', jql, flags=re.IGNORECASE)[0]
+    return all(_clause_matches(raw_issue, clause.strip()) for clause in re.split(r'\s+AND\s+', clauses, flags=re.IGNORECASE))
+
+
+def _clause_matches(raw_issue: dict[str, Any], clause: str) -> bool:
+    fields = raw_issue['fields']
+    if match := re.fullmatch(r'\((.*)\)', clause):
+        return any(_clause_matches(raw_issue, alternative.strip()) for alternative in re.split(r'\s+OR\s+', match.group(1)))
+    if match := re.fullmatch(r'project\s*=\s*"?([^"]+)"?', clause):
+        return raw_issue['key'].startswith(match.group(1) + '-')
+    if match := re.fullmatch(r'key\s+in\s+\((.*)\)', clause):
+        return raw_issue['key'] in re.findall(r'"?([A-Z][A-Z0-9_]*-\d+)"?', match.group(1))
+    if match := re.fullmatch(r'(assignee|reporter)\s*=\s*"?([^"]+)"?', clause):
+        user = fields.get(match.group(1)) or {}
+        return match.group(2) in (user.get('name'), user.get('key'), user.get('displayName'))
+    if re.fullmatch(r'resolution\s*=\s*Unresolved', clause, flags=re.IGNORECASE):
+        return fields['status']['statusCategory']['key'] != 'done'
+    if match := re.fullmatch(r'updated\s*>=\s*(.+)', clause):
+        return parse_jira_date(fields['updated']) >= _jql_date(match.group(1))
+    if match := re.fullmatch(r'status\s+CHANGED\s+BY\s+"([^"]+)"\s+DURING\s+\((.+),\s*(.+)\)', clause, flags=re.IGNORECASE):
+        since, until = _jql_date(match.group(2)), _jql_date(match.group(3))
+        return any(
+            match.group(1) in (history['author'].get('name'), history['author'].get('key'))
+            and since <= parse_jira_date(history['created']) <= until
+            and any(item['field'] == 'status' for item in history['items'])
+            for history in raw_issue['changelog']['histories']
+        )
+    return True
+
+
+def _jql_date(value: str) -> datetime:
+    if value == 'now()':
+        return datetime.now().astimezone()
+    if match := re.fullmatch(r'"-(\d+)m"', value):
+        # A relative date, in minutes
+        return datetime.now().astimezone() - timedelta(minutes=int(match.group(1)))
+    if match := re.fullmatch(r'startOfDay\((-\d+)?\)', value):
+        # The offset is in days
+        return start_of_day() + timedelta(days=int(match.group(1) or 0))
+    return datetime.strptime(value.strip('"'), JQL_DATE_FORMAT).astimezone()
+
+
+class FakeJiraServer(ThreadingHTTPServer):
+    """
+    Serves a FakeJira over HTTP, with a per-request latency and an optional rate limit, and counts the traffic.
+    """
+    daemon_threads = True
+
+    def __init__(self, fake_jira: FakeJira, port: int = 0, latency: float = 0.0, rate_limit: int | None = None):
+        super().__init__(('127.0.0.1', port), _FakeJiraHandler)
+        self.fake_jira = fake_jira
+        self.latency = latency
+        # Maximum number of requests per second, the others are answered with 429 Too Many Requests
+        self.rate_limit = rate_limit
+        self.requests: Counter[str] = Counter()
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._window: tuple[int, int] = (0, 0)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def start(self) -> 'FakeJiraServer':
+        threading.Thread(target=self.serve_forever, name='fake-jira', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # The clients hang up on the requests cut short by their deadline
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': sum(self.requests.values()),
+                'requests_by_endpoint': dict(self.requests),
+                'throttled': self.throttled,
+                'bytes_sent': self.bytes_sent,
+            }
+
+    def admit(self, endpoint: str) -> bool:
+        with self._lock:
+            self.requests[endpoint] += 1
+            if self.rate_limit is None:
+                return True
+            second = int(time.monotonic())
+            window_second, count = self._window
+            count = count + 1 if window_second == second else 1
+            self._window = (second, count)
+            if count > self.rate_limit:
+                self.throttled += 1
+                return False
+            return True
+
+    def count_bytes(self, size: int):
+        with self._lock:
+            self.bytes_sent += size
+
+
+class _FakeJiraHandler(BaseHTTPRequestHandler):
+    server: FakeJiraServer
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written separately, Nagle's algorithm would delay every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        if not url.path.startswith(REST_API_PATH):
+            self._reply(404, {'errorMessages': ['Not found']})
+            return
+
+        path = url.path[len(REST_API_PATH):]
+        endpoint = re.sub(r'issue/[^/]+', 'issue/{key}', path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if not self.server.admit(endpoint):
+            self._reply(429, {'errorMessages': ['Rate limit exceeded']}, {'Retry-After': '1'})
+            return
+
+        status, content = self.server.fake_jira.handle(method, path, parse_qs(url.query), body)
+        self._reply(status, content)
+
+    def _reply(self, status: int, content: Any, headers: dict[str, str] | None = None):
+        body = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count_bytes(len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    defaults = Workload()
+    parser = argparse.ArgumentParser(description="Serves a synthetic Jira project over a local fake Jira REST API.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on, on the loopback interface.")
+    parser.add_argument("--issues", type=int, default=defaults.issues, help="Number of issues of the project.")
+    parser.add_argument("--histories", type=int, default=defaults.histories, help="Number of changelog histories per issue.")
+    parser.add_argument("--comments", type=int, default=defaults.comments, help="Number of comments per issue.")
+    parser.add_argument("--today-fraction", type=float, default=defaults.today_fraction, help="Fraction of the issues updated today.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency added to every request, in seconds.")
+    parser.add_argument("--rate-limit", type=int, help="Maximum number of requests per second, the others get a 429 response.")
+    args = parser.parse_args()
+
+    workload = Workload(issues=args.issues, histories=args.histories, comments=args.comments, today_fraction=args.today_fraction)
+    server = FakeJiraServer(FakeJira(generate_raw_issues(workload, datetime.now().astimezone())), args.port, args.latency, args.rate_limit)
+    print(f"Fake Jira serving project {workload.project} at {server.url}, press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.statistics(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
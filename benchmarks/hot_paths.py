@@ -0,0 +1,231 @@
+"""
+Times and memory-profiles the parse, extract and render hot paths on a synthetic project, without any Jira server.
+
+    python -m benchmarks.hot_paths [--issues 2000] [--histories 20] [--comments 5] [--today-fraction 0.2] [--extraction-processes 4]
+                                   [--output results.json]
+
+The results are written as JSON, so that the runs before and after a change can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, replace
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from benchmarks.payloads import REPORT_USER, STATUS_MAPPING, Workload, generate_raw_issues
+from config import JiraConfig, ReportConfig
+from issue import Issue, ReportWindow, map_raw_status, map_status, parse_jira_date, start_of_day
+from jira_client import JiraClient
+from reporter import Reporter
+
+
+class StubJira:
+    """
+    In-memory stand-in for the jira library session of a Jira Server, serving the synthetic issues.
+    """
+    deploymentType = 'Server'
+
+    def __init__(self, raw_issues: list[dict[str, Any]], window_start: datetime):
+        self.raw_issues = raw_issues
+        self.raw_issues_by_key = {raw_issue['key']: raw_issue for raw_issue in raw_issues}
+        self.updated_issues = [raw_issue for raw_issue in raw_issues if parse_jira_date(raw_issue['fields']['updated']) >= window_start]
+        self.assigned_issues = [
+            raw_issue for raw_issue in raw_issues
+            if raw_issue['fields']['assignee']['key'] == REPORT_USER['key'] and raw_issue['fields']['status']['statusCategory']['key'] != 'done'
+        ]
+
+    def server_info(self) -> dict[str, Any]:
+        return {'deploymentType': self.deploymentType}
+
+    def search_issues(self, jql: str, startAt: int = 0, maxResults: int = 50, fields: str = '', json_result: bool = True) -> dict[str, Any]:
+        if jql.startswith('key in'):
+            matches = [self.raw_issues_by_key[issue_key] for issue_key in re.findall(r'"([^"]+)"', jql)]
+        elif 'assignee' in jql:
+            matches = self.assigned_issues
+        else:
+            matches = self.updated_issues
+        field_names = fields.split(',')
+        return {
+            'startAt': startAt,
+            'maxResults': maxResults,
+            'total': len(matches),
+            'issues': [_project(raw_issue, field_names) for raw_issue in matches[startAt:startAt + maxResults]],
+        }
+
+    def _get_json(self, path: str, params: dict[str, Any] | None = None, use_post: bool = False) -> Any:
+        if path == 'user/search':
+            return [REPORT_USER]
+        raw_issue = self.raw_issues_by_key[path.split('/')[1]]
+        start_at, max_results = params['startAt'], params['maxResults']
+        if path.endswith('/comment'):
+            # Requested newest first
+            comments = raw_issue['fields']['comment']['comments'][::-1]
+            return {
+                'startAt': start_at,
+                'maxResults': max_results,
+                'total': len(comments),
+                'comments': comments[start_at:start_at + max_results],
+            }
+        histories = raw_issue['changelog']['histories']
+        return {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(histories),
+            'isLast': start_at + max_results >= len(histories),
+            'values': histories[start_at:start_at + max_results],
+        }
+
+
+def _project(raw_issue: dict[str, Any], field_names: list[str]) -> dict[str, Any]:
+    # Every search returns new objects, as the client completes the raw issues in place
+    fields = {name: raw_issue['fields'][name] for name in field_names if name in raw_issue['fields']}
+    return json.loads(json.dumps({'id': raw_issue['id'], 'key': raw_issue['key'], 'fields': fields}))
+
+
+def bench_map_status(raw_issues: list[dict[str, Any]]) -> Callable[[], Any]:
+    jira_statuses = [
+        SimpleNamespace(id=raw_status['id'], name=raw_status['name'], statusCategory=SimpleNamespace(key=raw_status['statusCategory']['key']))
+        for raw_status in (raw_issue['fields']['status'] for raw_issue in raw_issues)
+    ]
+    raw_statuses = [raw_issue['fields']['status'] for raw_issue in raw_issues]
+
+    def run():
+        for jira_status in jira_statuses:
+            map_status(jira_status, STATUS_MAPPING)
+        for raw_status in raw_statuses:
+            map_raw_status(raw_status, STATUS_MAPPING)
+    return run
+
+
+def bench_extract_daily_actions(raw_issues: list[dict[str, Any]]) -> Callable[[], Any]:
+    def run():
+        since = start_of_day()
+        for raw_issue in raw_issues:
+            issue = Issue(raw_issue['key'], raw_issue['fields']['issuetype']['name'], raw_issue['fields']['summary'],
+                          map_raw_status(raw_issue['fields']['status'], STATUS_MAPPING), None, [])
+            issue.extract_daily_actions(raw_issue, REPORT_USER['displayName'], STATUS_MAPPING, since)
+    return run
+
+
+def bench_fetch_issues(raw_issues: list[dict[str, Any]], workload: Workload) -> Callable[[], Any]:
+    stub_jira = StubJira(raw_issues, start_of_day())
+    config = JiraConfig(server='http://jira.invalid', username='bench', api_token='bench', projects=[workload.project],
+                        status_mapping=STATUS_MAPPING, backend='json')
+
+    def run():
+        client = JiraClient(config)
+        # The stub replaces the lazily created session, nothing leaves the process
+        client._jira = stub_jira
+        try:
+            return client.fetch_issues(REPORT_USER['name'])
+        finally:
+            client.close()
+    return run
+
+
+def bench_build_issues(raw_issues: list[dict[str, Any]], workload: Workload, extraction_processes: int) -> Callable[[], Any]:
+    config = JiraConfig(server='http://jira.invalid', username='bench', api_token='bench', projects=[workload.project],
+                        status_mapping=STATUS_MAPPING, extraction_processes=extraction_processes)
+    client = JiraClient(config)
+    window = ReportWindow(start_of_day())
+    # Starts the extraction processes, so that the timed runs measure the extraction and not the start of the processes
+    client._build_issues(raw_issues[:1], window)
+
+    def run():
+        return client._build_issues(raw_issues, window)
+    return run
+
+
+def bench_generate_report(issues: list[Issue]) -> Callable[[], Any]:
+    reporter = Reporter(ReportConfig(username=REPORT_USER['name'], introduction='Synthetic report'))
+
+    def run():
+        # The report adds the in progress marker to the issues, each run renders fresh copies
+        issues_copy = [replace(issue, daily_actions=list(issue.daily_actions)) for issue in issues]
+        with contextlib.redirect_stdout(io.StringIO()):
+            reporter.generate_report(issues_copy)
+    return run
+
+
+def bench_pickle_issues(issues: list[Issue]) -> Callable[[], Any]:
+    # The issues are pickled to and from the extraction processes
+    def run():
+        return pickle.loads(pickle.dumps(issues))
+    return run
+
+
+def measure(run: Callable[[], Any], runs: int) -> dict[str, Any]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    # Memory is traced on a separate run, as tracing slows the timed ones down
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'runs': runs,
+        'median_seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'max_seconds': max(timings),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def main():
+    defaults = Workload()
+    parser = argparse.ArgumentParser(description="Benchmarks the hot paths on a synthetic Jira project.")
+    parser.add_argument("--issues", type=int, default=defaults.issues, help="Number of issues of the project.")
+    parser.add_argument("--histories", type=int, default=defaults.histories, help="Number of changelog histories per issue.")
+    parser.add_argument("--comments", type=int, default=defaults.comments, help="Number of comments per issue.")
+    parser.add_argument("--today-fraction", type=float, default=defaults.today_fraction, help="Fraction of the issues updated today.")
+    parser.add_argument("--extraction-processes", type=int, default=os.cpu_count(), help="Number of processes of the parallel extraction.")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Number of timed runs per benchmark.")
+    parser.add_argument("-o", "--output", help="File to write the JSON results to (default: standard output).")
+    args = parser.parse_args()
+
+    workload = Workload(issues=args.issues, histories=args.histories, comments=args.comments, today_fraction=args.today_fraction)
+    raw_issues = generate_raw_issues(workload, datetime.now().astimezone())
+    issues = bench_fetch_issues(raw_issues, workload)()
+
+    benchmarks = {
+        'map_status': bench_map_status(raw_issues),
+        'extract_daily_actions': bench_extract_daily_actions(raw_issues),
+        'fetch_issues': bench_fetch_issues(raw_issues, workload),
+        'build_issues': bench_build_issues(raw_issues, workload, 0),
+        'build_issues_in_processes': bench_build_issues(raw_issues, workload, args.extraction_processes),
+        'generate_report': bench_generate_report(issues),
+        'pickle_issues': bench_pickle_issues(issues),
+    }
+    results = {
+        'workload': asdict(workload),
+        'python': platform.python_version(),
+        'reported_issues': len(issues),
+        'benchmarks': {name: measure(run, args.runs) for name, run in benchmarks.items()},
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Synthetic Jira payloads, shaped like the raw JSON returned by the Jira Server REST API.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from issue import Status
+
+JIRA_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000%z"
+
+STATUSES = [
+    {'id': '1', 'name': 'To Do', 'statusCategory': {'key': 'new'}},
+    {'id': '3', 'name': 'In Progress', 'statusCategory': {'key': 'indeterminate'}},
+    {'id': '10001', 'name': 'Code Review', 'statusCategory': {'key': 'indeterminate'}},
+    {'id': '10002', 'name': 'In Test', 'statusCategory': {'key': 'indeterminate'}},
+    {'id': '10003', 'name': 'Done', 'statusCategory': {'key': 'done'}},
+]
+# The [StatusMapping] of the synthetic project
+STATUS_MAPPING = {
+    '1': Status.TO_DO,
+    '3': Status.IN_PROGRESS,
+    '10001': Status.IN_REVIEW,
+    '10002': Status.IN_TEST,
+    '10003': Status.DONE,
+}
+ISSUE_TYPES = ['Story', 'Bug', 'Task']
+USERS = [
+    {'name': f'user{index}', 'key': f'JIRAUSER{index}', 'displayName': f'User {index}', 'emailAddress': f'user{index}@example.com'}
+    for index in range(10)
+]
+REPORT_USER = USERS[0]
+
+
+@dataclass
+class Workload:
+    """
+    The shape of a synthetic project.
+    """
+    issues: int = 2000
+    histories: int = 20
+    comments: int = 5
+    # The fraction of the issues with events since the start of the day
+    today_fraction: float = 0.2
+    project: str = 'BENCH'
+    seed: int = 42
+
+
+def generate_raw_issues(workload: Workload, now: datetime) -> list[dict[str, Any]]:
+    """
+    Generates raw issues with their full changelog and comments.
+    The events of the issues updated today are spread over the last hours, the others over the previous weeks.
+    """
+    generator = random.Random(workload.seed)
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    raw_issues = []
+    for index in range(workload.issues):
+        is_updated_today = generator.random() < workload.today_fraction
+        # Both the changelog and the comments are in chronological order, as returned by Jira
+        if is_updated_today:
+            newest = start_of_day + (now - start_of_day) * generator.random()
+        else:
+            newest = start_of_day - timedelta(hours=generator.randint(1, 500))
+        histories = [_history(generator, newest - timedelta(hours=position * 7)) for position in range(workload.histories)][::-1]
+        comments = [_comment(generator, newest - timedelta(hours=position * 5 + 1)) for position in range(workload.comments)][::-1]
+        status_items = [history['items'][0] for history in histories if history['items'][0]['field'] == 'status']
+        raw_issues.append({
+            'id': str(10000 + index),
+            'key': f'{workload.project}-{index + 1}',
+            'fields': {
+                'summary': f'Synthetic issue {index + 1}',
+                'issuetype': {'name': generator.choice(ISSUE_TYPES)},
+                'status': _status(status_items[-1]['to']) if status_items else STATUSES[0],
+                'assignee': generator.choice(USERS),
+                'updated': newest.strftime(JIRA_DATE_FORMAT),
+                'comment': {'startAt': 0, 'maxResults': len(comments), 'total': len(comments), 'comments': comments},
+            },
+            'changelog': {'startAt': 0, 'maxResults': len(histories), 'total': len(histories), 'histories': histories},
+        })
+    return raw_issues
+
+
+def _history(generator: random.Random, created: datetime) -> dict[str, Any]:
+    if generator.random() < 0.2:
+        item = {'field': 'description', 'fieldtype': 'jira', 'from': None, 'fromString': 'Before', 'to': None, 'toString': 'After'}
+    else:
+        status = generator.choice(STATUSES)
+        item = {'field': 'status', 'fieldtype': 'jira', 'from': '1', 'fromString': 'To Do', 'to': status['id'], 'toString': status['name']}
+    return {'id': str(generator.randint(1, 10 ** 9)), 'author': generator.choice(USERS), 'created': created.strftime(JIRA_DATE_FORMAT), 'items': [item]}
+
+
+def _comment(generator: random.Random, created: datetime) -> dict[str, Any]:
+    author = generator.choice(USERS)
+    created_str = created.strftime(JIRA_DATE_FORMAT)
+    return {
+        'id': str(generator.randint(1, 10 ** 9)),
+        'author': author,
+        'body': 'Synthetic comment ' * generator.randint(1, 20),
+        'updateAuthor': author,
+        'created': created_str,
+        'updated': created_str,
+    }
+
+
+def _status(status_id: str) -> dict[str, Any]:
+    return next(status for status in STATUSES if status['id'] == status_id)
@@ -0,0 +1,49 @@
+"""
+Measures the time to first output of the command line, as seen from a shell prompt or a morning script.
+
+    python -m benchmarks.startup [--runs N] [--command "dist/display-linux/display-linux"]
+
+Without a command, the script is run from the sources with the current interpreter.
+"""
+import argparse
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import SOURCE_DIRECTORY
+
+SOURCE_COMMAND = [sys.executable, str(SOURCE_DIRECTORY / 'display.py')]
+
+# The scenarios that must never connect to Jira, nor import the jira library
+SCENARIOS = {
+    'help': ['--help'],
+    'missing configuration': ['--config', 'missing-config.ini'],
+}
+
+
+def time_to_first_line(command: list[str]) -> float:
+    started = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+        process.stdout.readline()
+        elapsed = time.perf_counter() - started
+        process.communicate()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the startup time of the command line.")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="Number of runs per scenario.")
+    parser.add_argument("--command", help="Command to benchmark, such as a built executable (default: the sources).")
+    args = parser.parse_args()
+
+    command = shlex.split(args.command) if args.command else SOURCE_COMMAND
+    for scenario, arguments in SCENARIOS.items():
+        timings = [time_to_first_line(command + arguments) for _ in range(args.runs)]
+        print(f"{scenario}: median {statistics.median(timings) * 1000:.1f} ms, "
+              f"min {min(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms ({args.runs} runs)")
+
+
+if __name__ == '__main__':
+    main()
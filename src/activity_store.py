@@ -0,0 +1,126 @@
+import logging
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing, contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+
+from issue import Action, Author, Event, Issue, ReportUser, ReportWindow, Status, intern_author
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    issue_key TEXT PRIMARY KEY,
+    issue_type TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    status TEXT,
+    status_category_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    author TEXT PRIMARY KEY,
+    display_name TEXT,
+    name TEXT,
+    email_address TEXT,
+    account_id TEXT
+);
+-- The primary key orders the events of each issue by time, without a separate index
+CREATE TABLE IF NOT EXISTS events (
+    issue_key TEXT NOT NULL,
+    created TEXT NOT NULL,
+    day TEXT NOT NULL,
+    author TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT,
+    PRIMARY KEY (issue_key, created, author, action)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_by_author_day ON events (author, day);
+"""
+# Upper bound of the creation dates of the events of a current window
+END_OF_TIME = '9999-12-31'
+
+
+class ActivityStore:
+    """
+    Keeps every event extracted from Jira in a local SQLite database, so that the report of any user over any past day
+    can be generated offline.
+    The events are stored with their creation time in UTC, which orders them, and their local calendar day, which the reports
+    are queried by. The issues keep their last fetched summary and status.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation: the store is written by whichever thread fetched the issues
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path)) as connection:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+
+    def save(self, issues: Iterable[Issue], window: ReportWindow):
+        """
+        Replaces the events of the given issues inside the window with their extracted events, whoever their authors are.
+        """
+        issues = list(issues)
+        since = _stored_time(window.since)
+        until = _stored_time(window.until) if window.until is not None else END_OF_TIME
+        authors = {_author_key(event.author): event.author for issue in issues for event in issue.events}
+        with self._connect() as connection:
+            connection.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)", [
+                (issue.issue_key, issue.issue_type, issue.summary, issue.status.name if issue.status else None, issue.status_category_key)
+                for issue in issues
+            ])
+            connection.executemany("INSERT OR REPLACE INTO authors VALUES (?, ?, ?, ?, ?)", [
+                (key, author.display_name, author.name, author.email_address, author.account_id) for key, author in authors.items()
+            ])
+            connection.executemany("DELETE FROM events WHERE issue_key = ? AND created >= ? AND created < ?",
+                                   [(issue.issue_key, since, until) for issue in issues])
+            connection.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)", [
+                (issue.issue_key, _stored_time(event.created), event.created.astimezone().date().isoformat(), _author_key(event.author),
+                 event.action.name, event.status.name if event.status else None)
+                for issue in issues for event in issue.events
+            ])
+        self.logger.info("Stored the events of %d issues.", len(issues))
+
+    def load_issues(self, report_user: ReportUser, window: ReportWindow) -> list[Issue]:
+        """
+        Returns the issues the user acted on inside the window, with the user's events, in the order of their first event.
+        As when they are extracted, the changes made at the same time as a comment come first.
+        The current state of the issues is not known offline, so none of them is reported as in progress.
+        """
+        days = window.days()
+        with self._connect() as connection:
+            authors = {
+                key: author
+                for key, *identity in connection.execute("SELECT author, display_name, name, email_address, account_id FROM authors")
+                if report_user.is_author(author := intern_author(*identity))
+            }
+            if not authors:
+                self.logger.warning("No events of '%s' in the activity store.", report_user.username)
+                return []
+            rows = connection.execute(f"""
+                SELECT events.issue_key, issue_type, summary, issues.status, status_category_key, created, author, action, events.status
+                FROM events JOIN issues ON issues.issue_key = events.issue_key
+                WHERE author IN ({', '.join('?' * len(authors))}) AND day BETWEEN ? AND ?
+                ORDER BY created, action = 'DISCUSSION'
+            """, [*authors, days[0].isoformat(), days[-1].isoformat()]).fetchall()
+
+        issues: dict[str, Issue] = {}
+        for issue_key, issue_type, summary, status, status_category_key, created, author, action, event_status in rows:
+            issue = issues.get(issue_key)
+            if issue is None:
+                issue = issues[issue_key] = Issue(issue_key, issue_type, summary, Status[status] if status else None, None, [], status_category_key)
+            issue.events.append(Event(datetime.fromisoformat(created).astimezone(), authors[author], Action[action],
+                                      Status[event_status] if event_status else None))
+        return [issue.for_user(report_user, current=False) for issue in issues.values()]
+
+
+def _stored_time(value: datetime) -> str:
+    # In UTC and with a fixed width, the stored times sort chronologically as text
+    return value.astimezone(UTC).isoformat(timespec='milliseconds')
+
+
+def _author_key(author: Author) -> str:
+    return author.account_id or author.name or author.display_name or author.email_address or ''
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import aiohttp
+from jira import JIRAError
+
+from profiler import Profiler
+
+T = TypeVar('T')
+
+REST_API_PATH = '/rest/api/2/'
+
+
+class AsyncJiraTransport:
+    """
+    Performs the Jira REST requests as coroutines, on a single event loop running in a background thread.
+    All the requests share a pool of keep-alive connections, negotiate gzip responses and are limited in concurrency.
+    """
+
+    def __init__(self, server: str, username: str, api_token: str, max_connections: int, profiler: Profiler | None = None):
+        self.base_url = server.rstrip('/') + REST_API_PATH
+        self.max_connections = max_connections
+        self.profiler = profiler or Profiler()
+        self.logger = logging.getLogger(__name__)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='jira-transport', daemon=True)
+        self._thread.start()
+        self._session, self._semaphore = self.run(self._open(aiohttp.encode_basic_auth(username, api_token)))
+
+    async def _open(self, authorization: str) -> tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        # The session and the semaphore must be created on the transport loop
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Authorization': authorization, 'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'},
+        )
+        return session, asyncio.Semaphore(self.max_connections)
+
+    def run(self, coroutine: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """
+        Runs the coroutine on the transport loop and waits for its result, from any thread but the loop's own.
+        Raises TimeoutError once the timeout in seconds elapses, the coroutine being left to the deadline of its requests,
+        and CancelledError if the transport is closed first.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    async def gather(self, coroutines: list[Coroutine[Any, Any, T]]) -> list[T]:
+        return list(await asyncio.gather(*coroutines))
+
+    async def get_json(self, path: str, params: dict[str, Any] | None = None, timeout: float | None = None) -> Any:
+        return await self._request('GET', path, timeout, params=_query_params(params or {}))
+
+    async def post_json(self, path: str, payload: dict[str, Any], timeout: float | None = None) -> Any:
+        return await self._request('POST', path, timeout, json=payload)
+
+    async def _request(self, method: str, path: str, timeout: float | None, **kwargs) -> Any:
+        """
+        Sends the request, which may take up to the given timeout, in seconds, as the requests of the jira library session.
+        """
+        url = self.base_url + path
+        async with self._semaphore, self._session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+            body = await response.read()
+            self.profiler.update({
+                'http.requests': 1,
+                'http.bytes_received': response.content_length or len(body),
+                'http.throttled': int(response.status == 429),
+            })
+            if response.status >= 400:
+                raise JIRAError(status_code=response.status, text=body.decode(errors='replace'), url=str(response.url), response=response)
+            return json.loads(body)
+
+    def close(self):
+        self.run(self._close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _close(self):
+        # The coroutines still pending, cut short by the deadline, are cancelled so that no thread is left waiting for them
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self._session.close()
+
+
+def _query_params(params: dict[str, Any]) -> dict[str, str]:
+    query_params = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            query_params[name] = 'true' if value else 'false'
+        elif isinstance(value, list | tuple):
+            query_params[name] = ','.join(str(item) for item in value)
+        else:
+            query_params[name] = str(value)
+    return query_params
+
@@ -1,28 +1,47 @@
 import configparser
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from issue import Status
+from request_scheduler import DEFAULT_MAX_RETRIES
 
 if TYPE_CHECKING:
     from jira_client import JiraClient
 
+DEFAULT_CACHE_DIRECTORY = '~/.cache/display-jira-tickets'
+BACKENDS = ('resources', 'json')
+TRANSPORTS = ('sync', 'async')
+DEFAULT_MAX_WORKERS = 8
+
 
 @dataclass
 class JiraConfig:
     server: str
     username: str
     api_token: str
-    project: str
+    projects: list[str]
     status_mapping: dict[str, Status]
+    backend: str = 'resources'
+    max_workers: int = DEFAULT_MAX_WORKERS
+    transport: str = 'sync'
+    # Maximum number of requests per second, unlimited if not set
+    rate_limit: float | None = None
+    max_retries: int = DEFAULT_MAX_RETRIES
+    # Sends a duplicate of the searches still pending well past their usual latency
+    hedge_searches: bool = False
+    # Narrows the searches to the issues the reported users acted on, with the JQL history and ScriptRunner clauses the server supports
+    activity_filter: bool = False
+    # Processes building the issues from their raw JSON, 0 to build them in the fetching process
+    extraction_processes: int = 0
 
 
 @dataclass
 class ReportConfig:
     username: str
     introduction: str
+    team: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -30,6 +49,14 @@ class LoggingConfig:
     level: int
 
 
+@dataclass
+class CacheConfig:
+    enabled: bool
+    directory: Path
+    # SQLite database keeping every extracted event, for the offline reports over past days
+    activity_store: Path | None = None
+
+
 class Config:
     def __init__(self, file_path: Path):
         if not file_path.exists():
@@ -41,16 +68,45 @@ class Config:
         self.jira_config = self._get_jira_config(config)
         self.report_config = self._get_report_config(config)
         self.logging_config = self._get_logging_config(config)
+        self.cache_config = self._get_cache_config(config)
 
     def _get_jira_config(self, config: configparser.ConfigParser) -> JiraConfig:
         status_mapping = self._get_status_mapping(config)
 
+        backend = config.get('Jira', 'backend', fallback='resources').lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}' in Jira section. Available backends are: {list(BACKENDS)}")
+
+        transport = config.get('Jira', 'transport', fallback='sync').lower()
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Invalid transport '{transport}' in Jira section. Available transports are: {list(TRANSPORTS)}")
+
+        max_workers = config.getint('Jira', 'max_workers', fallback=DEFAULT_MAX_WORKERS)
+        if max_workers < 1:
+            raise ValueError(f"Invalid max_workers '{max_workers}' in Jira section. At least one request must be sent at a time.")
+
+        rate_limit = config.getfloat('Jira', 'rate_limit', fallback=None)
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError(f"Invalid rate_limit '{rate_limit:g}' in Jira section. Leave it unset to send the requests without limit.")
+
+        max_retries = config.getint('Jira', 'max_retries', fallback=DEFAULT_MAX_RETRIES)
+        if max_retries < 0:
+            raise ValueError(f"Invalid max_retries '{max_retries}' in Jira section. Set it to 0 to never retry the requests.")
+
         return JiraConfig(
             server=config.get('Jira', 'server'),
             username=config.get('Jira', 'username'),
             api_token=config.get('Jira', 'api_token'),
-            project=config.get('Jira', 'project_key'),
+            projects=parse_list(config.get('Jira', 'project_key')),
             status_mapping=status_mapping,
+            backend=backend,
+            max_workers=max_workers,
+            transport=transport,
+            rate_limit=rate_limit,
+            max_retries=max_retries,
+            hedge_searches=config.getboolean('Jira', 'hedge_searches', fallback=False),
+            activity_filter=config.getboolean('Jira', 'activity_filter', fallback=False),
+            extraction_processes=config.getint('Jira', 'extraction_processes', fallback=0),
         )
 
     @staticmethod
@@ -70,6 +126,7 @@ class Config:
         return ReportConfig(
             username=config.get('Report', 'username'),
             introduction=config.get('Report', 'introduction', fallback=''),
+            team=parse_list(config.get('Report', 'team', fallback='')),
         )
 
     @staticmethod
@@ -78,6 +135,19 @@ class Config:
         level = getattr(logging, level_str, logging.INFO)
         return LoggingConfig(level=level)
 
+    @staticmethod
+    def _get_cache_config(config: configparser.ConfigParser) -> CacheConfig:
+        activity_store = config.get('Cache', 'activity_store', fallback=None)
+        return CacheConfig(
+            enabled=config.getboolean('Cache', 'enabled', fallback=False),
+            directory=Path(config.get('Cache', 'directory', fallback=DEFAULT_CACHE_DIRECTORY)).expanduser(),
+            activity_store=Path(activity_store).expanduser() if activity_store else None,
+        )
+
+
+def parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
 
 class ConfigFileInitializer:
     def __init__(self, config_file_path: str):
@@ -1,22 +1,67 @@
 #!/usr/bin/env python3
 import argparse
+import io
 import logging
+import multiprocessing
 import sys
+from dataclasses import replace
+from datetime import date, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from config import Config, ConfigFileInitializer
+from config import Config, ConfigFileInitializer, parse_list
+from issue import ReportUser, ReportWindow, start_of_day
+from issue_cache import IssueCache, MemoryIssueCache
 from jira_client import JiraClient
+from profiler import PROFILE_FORMATS, Profiler
+from recording import ResponseRecorder, ResponseReplayer
 from reporter import Reporter
 
+if TYPE_CHECKING:
+    from activity_store import ActivityStore
+
+DEFAULT_REFRESH_INTERVAL = 120.0
+
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 
 def main():
+    profiler = Profiler()
     parser = argparse.ArgumentParser(description="Displays a summary of daily Jira tickets.")
     parser.add_argument("-c", "--config", default="config.ini", help="Path to the configuration file.")
     parser.add_argument("-i", "--init", action="store_true", help="Initialize the configuration file.")
+    parser.add_argument("-u", "--users", help="Comma-separated list of users to generate one report each for, from a single fetch.")
+    parser.add_argument("-r", "--refresh", action="store_true", help="Ignore the issue cache and fetch every issue again.")
+    window_group = parser.add_mutually_exclusive_group()
+    window_group.add_argument("--since", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                              help="Report on every day from this one, with one section per day.")
+    window_group.add_argument("--days", type=int, metavar="N", help="Report on the last N days, with one section per day.")
+    parser.add_argument("--until", type=date.fromisoformat, metavar="YYYY-MM-DD", help="Last day of the report (default: today).")
+    recording_group = parser.add_mutually_exclusive_group()
+    recording_group.add_argument("--record", metavar="FILE", help="Record the Jira responses to the given file (gzip compressed if it ends with .gz).")
+    recording_group.add_argument("--replay", metavar="FILE", help="Generate the report from recorded Jira responses, without connecting to Jira.")
+    recording_group.add_argument("--offline", action="store_true",
+                                 help="Generate the report from the events kept in the activity store, without connecting to Jira.")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Render the report after at most this many seconds, leaving out and listing what is still pending.")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="Keep running and serve the report over HTTP, at this port of the loopback interface or at this Unix socket path.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_REFRESH_INTERVAL, metavar="SECONDS",
+                        help=f"With --serve, refresh the report every this many seconds (default: {DEFAULT_REFRESH_INTERVAL:g}).")
+    parser.add_argument("--profile", action="store_true", help="Print the time spent in each phase and request, and the request counters, on stderr.")
+    parser.add_argument("--profile-output", metavar="FILE", help="Write the profile to the given file, implies --profile.")
+    parser.add_argument("--profile-format", choices=PROFILE_FORMATS, default='json',
+                        help="Format of the profile file: json, or trace for the Trace Event Format of chrome://tracing and Perfetto.")
     args = parser.parse_args()
+    try:
+        window = report_window(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.serve and (args.deadline is not None or args.record):
+        parser.error("--serve cannot be combined with --deadline or --record.")
+    if args.offline and args.serve:
+        parser.error("--offline cannot be combined with --serve.")
 
     try:
         config = Config(Path(args.config))
@@ -28,25 +73,136 @@ def main():
         sys.exit(1)
 
     logging.basicConfig(level=config.logging_config.level, format=LOG_FORMAT, datefmt=DATE_FORMAT)
+    if args.offline and config.cache_config.activity_store is None:
+        parser.error("--offline requires the activity_store option of the [Cache] section.")
 
     try:
-        jira_client = JiraClient(config.jira_config)
+        store = None
+        if config.cache_config.activity_store is not None:
+            from activity_store import ActivityStore
+            store = ActivityStore(config.cache_config.activity_store)
+        recorder = ResponseRecorder(config.jira_config.server, window.since if window else start_of_day()) if args.record else None
+        replayer = ResponseReplayer.load(Path(args.replay)) if args.replay else None
+        # Recorded runs fetch everything, so that they can be replayed without the cache
+        use_cache = config.cache_config.enabled and recorder is None and replayer is None
+        if args.serve and replayer is None:
+            # The served report is refreshed from the issues kept in memory, written through to the disk cache if enabled
+            cache = MemoryIssueCache(config.cache_config.directory if use_cache else None)
+        else:
+            cache = IssueCache(config.cache_config.directory) if use_cache else None
+        team = parse_list(args.users) if args.users else config.report_config.team
+        if args.offline:
+            render_offline_report(Reporter(config.report_config), store, cache, config, team, window, profiler)
+            write_profile(args, profiler)
+            return
+
+        jira_client = JiraClient(config.jira_config, cache, recorder, replayer, profiler, args.deadline, store)
 
         if args.init:
             logging.info("Initializing configuration file at %s", args.config)
             initializer = ConfigFileInitializer(args.config)
-            initializer.initialize_status_mapping(jira_client, config.jira_config.project)
+            initializer.initialize_status_mapping(jira_client, ', '.join(config.jira_config.projects))
             logging.info("Configuration file initialized successfully.")
             sys.exit(0)
 
-        issues = jira_client.fetch_issues(config.report_config.username)
+        if args.serve:
+            serve(args, config, jira_client, team, window, profiler)
+        else:
+            render_report(Reporter(config.report_config), jira_client, config, team, window, args.refresh, profiler)
+        jira_client.close()
 
-        reporter = Reporter(config.report_config)
-        reporter.generate_report(issues)
+        if recorder is not None:
+            recorder.save(Path(args.record))
     except Exception as e:
         logging.error("An error occurred during execution: %s", e)
+        write_profile(args, profiler)
         sys.exit(1)
 
+    write_profile(args, profiler)
+
+
+def render_report(reporter: Reporter, jira_client: JiraClient, config: Config, team: list[str], window: ReportWindow | None,
+                  refresh: bool, profiler: Profiler):
+    if team:
+        with profiler.span('fetch'):
+            issues_by_user = jira_client.fetch_team_issues(team, window)
+        with profiler.span('render'):
+            reporter.generate_team_report(issues_by_user, window)
+            reporter.report_missing(jira_client.missing)
+    else:
+        with profiler.span('fetch'):
+            issues = jira_client.fetch_issues(config.report_config.username, refresh=refresh, window=window)
+        with profiler.span('render'):
+            reporter.generate_report(issues, window)
+            reporter.report_missing(jira_client.missing)
+
+
+def render_offline_report(reporter: Reporter, store: 'ActivityStore', cache: IssueCache | None, config: Config, team: list[str],
+                          window: ReportWindow | None, profiler: Profiler):
+    """
+    Renders the report from the activity store. The users are matched as resolved by the previous runs, if cached.
+    """
+    # The current state of the issues is unknown offline, the window is reported as a past one
+    window = replace(window or ReportWindow(start_of_day()), current=False)
+    with profiler.span('store load'):
+        issues_by_user = {}
+        for username in team or [config.report_config.username]:
+            report_user = cache.load_report_user(config.jira_config.server, username) if cache is not None else None
+            issues_by_user[username] = store.load_issues(report_user or ReportUser(username), window)
+    with profiler.span('render'):
+        if team:
+            reporter.generate_team_report(issues_by_user, window)
+        else:
+            reporter.generate_report(issues_by_user[config.report_config.username], window)
+
+
+def serve(args: argparse.Namespace, config: Config, jira_client: JiraClient, team: list[str], window: ReportWindow | None, profiler: Profiler):
+    """
+    Serves the report until interrupted, refreshed with the same Jira client, which keeps its session and issues between refreshes.
+    """
+    from report_server import ReportServer
+
+    refresh = args.refresh
+
+    def render() -> str:
+        nonlocal refresh
+        output = io.StringIO()
+        render_report(Reporter(config.report_config, output), jira_client, config, team, window, refresh, profiler)
+        # Only the first refresh ignores the cache
+        refresh = False
+        # The profile of each refresh is printed, then started again, so that it does not grow for as long as the server runs
+        write_profile(args, profiler)
+        profiler.reset()
+        return output.getvalue()
+
+    report_server = ReportServer(render, args.interval)
+    report_server.bind(args.serve)
+    report_server.serve_forever()
+
+
+def report_window(args: argparse.Namespace) -> ReportWindow | None:
+    """
+    Returns the window of the --since, --days and --until arguments, or None to report on today only.
+    """
+    if args.since is None and args.days is None and args.until is None:
+        return None
+    if args.days is not None and args.days < 1:
+        raise ValueError("--days must be at least 1.")
+    last_day = args.until or date.today()
+    first_day = args.since or last_day - timedelta(days=(args.days or 1) - 1)
+    return ReportWindow.between(first_day, last_day)
+
+
+def write_profile(args: argparse.Namespace, profiler: Profiler):
+    if not args.profile and not args.profile_output:
+        return
+    profiler.print_summary(sys.stderr)
+    if args.profile_output:
+        profiler.save(Path(args.profile_output), args.profile_format)
+
 
 if __name__ == "__main__":
+    # The extraction processes of the executables built by PyInstaller start through this entry point: they must run the
+    # multiprocessing bootstrap instead of the report
+    multiprocessing.freeze_support()
     main()
@@ -1,5 +1,11 @@
-from dataclasses import dataclass
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field, replace
+from datetime import UTC, date, datetime, time, timedelta, timezone
 from enum import StrEnum, auto
+from functools import cache
 from typing import Any
 
 
@@ -38,12 +44,179 @@ ACTION_MAPPING = {
     Status.IN_TEST: Action.TEST,
     Status.DONE: Action.DONE,
 }
+# The actions and the statuses of the event tables are stored as their index in these tuples, 0 being no status
+ACTIONS = tuple(Action)
+STATUSES = (None, *Status)
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+_SECOND = timedelta(seconds=1)
+# The authors met so far, by their raw fields, shared by all the events and issues
+_authors: dict[tuple[str | None, ...], 'Author'] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class Author:
+    """
+    Identity of the author of a changelog entry or a comment.
+    """
+    display_name: str | None = None
+    name: str | None = None
+    email_address: str | None = None
+    # The account ID on Jira Cloud, the user key on Jira Server/Data Center
+    account_id: str | None = None
+
+    @staticmethod
+    def from_raw(raw_author: dict[str, Any] | None) -> 'Author':
+        if raw_author is None:
+            return intern_author()
+        return intern_author(raw_author.get('displayName'), raw_author.get('name'), raw_author.get('emailAddress'),
+                             raw_author.get('accountId') or raw_author.get('key'))
+
+    def matches(self, username: str) -> bool:
+        if self.display_name == username:
+            return True
+        if self.name == username:
+            return True
+        return self.email_address is not None and (self.email_address == username or self.email_address.split('@')[0] == username)
+
+
+def intern_author(display_name: str | None = None, name: str | None = None, email_address: str | None = None,
+                  account_id: str | None = None) -> Author:
+    """
+    Returns the single author with the given identity, so that the events of the same author share one object.
+    """
+    key = (display_name, name, email_address, account_id)
+    author = _authors.get(key)
+    if author is None:
+        author = _authors.setdefault(key, Author(*(sys.intern(value) if value is not None else None for value in key)))
+    return author
+
+
+@dataclass(frozen=True, slots=True)
+class ReportUser:
+    """
+    The user the report is generated for, as configured and, when it could be resolved, as known by Jira.
+    """
+    username: str
+    account_id: str | None = None
+    name: str | None = None
+
+    def is_author(self, author: Author) -> bool:
+        if self.account_id is not None and author.account_id is not None:
+            return author.account_id == self.account_id
+        return author.matches(self.username)
+
+    @property
+    def jql_reference(self) -> str:
+        # Jira Cloud only knows the account IDs, Jira Server/Data Center the user names
+        return self.name or self.account_id or self.username
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """
+    An action performed on an issue, whoever its author is.
+    """
+    created: datetime
+    author: Author
+    action: Action
+    # The status the issue was moved to, for the status changes
+    status: Status | None = None
 
 
-@dataclass
+class EventTable(Sequence[Event]):
+    """
+    The events of an issue, stored as integers rather than objects: each event is a row of two items of a single array,
+    its creation time in microseconds since the epoch, then its UTC offset, author, action and status packed together.
+    The actions and the statuses are stored as their code, the authors as their index among the authors of the issue.
+    The memory used and the size of the pickled issues grow with the number of events, not with the number of objects,
+    and an Event is only created when it is read.
+    """
+    __slots__ = ('_authors', '_rows')
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self._rows = array('q')
+        self._authors: list[Author] = []
+        for event in events:
+            self.append(event)
+
+    def append(self, event: Event):
+        try:
+            author_code = self._authors.index(event.author)
+        except ValueError:
+            author_code = len(self._authors)
+            self._authors.append(event.author)
+        self._rows.append((event.created - EPOCH) // _MICROSECOND)
+        self._rows.append(event.created.utcoffset() // _SECOND << 24 | author_code << 8 | _ACTION_CODES[event.action] << 4
+                          | _STATUS_CODES[event.status])
+
+    def actions(self) -> Iterator[Action]:
+        """
+        Returns the actions of the events, without creating the events.
+        """
+        return (ACTIONS[attributes >> 4 & 0xF] for attributes in self._rows[1::2])
+
+    def by_authors(self, is_author: Callable[[Author], bool]) -> 'EventTable':
+        """
+        Returns the events of the authors accepted by the predicate, which is called once per distinct author.
+        """
+        author_codes = {code for code, author in enumerate(self._authors) if is_author(author)}
+        return self._select([
+            position for position, attributes in enumerate(self._rows[1::2]) if attributes >> 8 & 0xFFFF in author_codes
+        ])
+
+    def _select(self, positions: list[int]) -> 'EventTable':
+        table = EventTable()
+        table._authors = list(self._authors)
+        for position in positions:
+            table._rows.extend(self._rows[2 * position:2 * position + 2])
+        return table
+
+    def __len__(self) -> int:
+        return len(self._rows) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._select(list(range(*index.indices(len(self)))))
+        position = 2 * range(len(self))[index]
+        return self._event(self._rows[position], self._rows[position + 1])
+
+    def __iter__(self) -> Iterator[Event]:
+        rows = iter(self._rows)
+        for time_code, attributes in zip(rows, rows):
+            yield self._event(time_code, attributes)
+
+    def _event(self, time_code: int, attributes: int) -> Event:
+        return Event(_event_time(time_code, attributes >> 24), self._authors[attributes >> 8 & 0xFFFF], ACTIONS[attributes >> 4 & 0xF],
+                     STATUSES[attributes & 0xF])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(event == other_event for event, other_event in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"EventTable({list(self)!r})"
+
+
+def _event_time(time_code: int, offset: int) -> datetime:
+    return (EPOCH + timedelta(microseconds=time_code)).astimezone(_timezone(offset))
+
+
+@cache
+def _timezone(offset: int) -> timezone:
+    return timezone(timedelta(seconds=offset))
+
+
+@dataclass(slots=True)
 class Issue:
     """
     Represents a Jira issue.
+    The issues are filled in place by the extraction, their events are kept in an EventTable.
     """
     issue_key: str
     issue_type: str
@@ -53,6 +226,12 @@ class Issue:
     daily_actions: list[str]
     status_category_key: str = ""
     is_in_progress: bool = False
+    events: EventTable = field(default_factory=EventTable)
+    assignee_account_id: str | None = None
+
+    def __post_init__(self):
+        if not isinstance(self.events, EventTable):
+            self.events = EventTable(self.events)
 
     def is_valid(self):
         return self.issue_key is not None and self.summary is not None and self.status is not None
@@ -60,115 +239,245 @@ class Issue:
     def is_bug(self):
         return self.issue_type == "Bug"
 
-    def extract_daily_actions(self, jira_issue: Any, report_username: str, status_mapping: dict[str, Status]):
-        from datetime import datetime
-        # Get the current time in the local timezone, find midnight, and keep timezone awareness
-        now = datetime.now().astimezone()
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
+    def is_assigned_to(self, report_user: 'ReportUser') -> bool:
+        if self.assignee is None and self.assignee_account_id is None:
+            return False
+        return report_user.is_author(Author(display_name=self.assignee, account_id=self.assignee_account_id))
+
+    def for_user(self, report_user: 'ReportUser', current: bool = True) -> 'Issue':
+        """
+        Returns a copy of the issue with the events and the daily actions of the given user.
+        An issue in progress assigned to the user, without any action today, is still reported with the action of its status,
+        unless the report window is in the past.
+        """
+        is_assigned = current and self.is_assigned_to(report_user)
+        user_events = self.events.by_authors(report_user.is_author)
+        user_issue = replace(self, daily_actions=[], events=user_events, is_in_progress=is_assigned and self.status_category_key != 'done')
+        user_issue.compute_daily_actions(report_user)
+        if not user_issue.daily_actions and self.status_category_key == 'indeterminate' and is_assigned:
+            user_issue.daily_actions.append(map_action_from_status(self.issue_type, self.status).value)
+        return user_issue
+
+    def on_day(self, day: date, current: bool) -> 'Issue':
+        """
+        Returns a copy of the user issue, as returned by for_user, with the actions of the given local calendar day only.
+        The current state of the issue, in progress or not, is only reported on the current day.
+        """
+        day_events = [event for event in self.events if event.created.astimezone().date() == day]
+        day_issue = replace(self, daily_actions=_distinct_actions(event.action for event in day_events), events=day_events,
+                            is_in_progress=current and self.is_in_progress)
+        if current and not day_issue.daily_actions and self.status_category_key == 'indeterminate' and self.is_in_progress:
+            day_issue.daily_actions.append(map_action_from_status(self.issue_type, self.status).value)
+        return day_issue
+
+    def extract_daily_actions(self, jira_issue: Any, report_username: str, status_mapping: dict[str, Status], since: datetime | None = None):
+        raw_issue = jira_issue if isinstance(jira_issue, dict) else jira_issue.raw
+        self.extract_events(raw_issue, StatusClassifier(status_mapping), since or start_of_day())
+        self.compute_daily_actions(ReportUser(report_username))
+
+    def extract_events(self, raw_issue: dict[str, Any], classifier: 'StatusClassifier', since: datetime, scan_counters: Counter | None = None,
+                       until: datetime | None = None):
+        """
+        Collects the status changes, description updates and comments of the issue made since the given date, and before the
+        given end date, if any.
+        The issue is read from its raw JSON representation, as returned by the Jira REST API.
+        The numbers of histories and comments scanned, and of those inside the window, are added to the given counters, if any.
+        """
         events = []
-
-        # Parse changelog for status updates
-        if hasattr(jira_issue, 'changelog') and hasattr(jira_issue.changelog, 'histories'):
-            for history in jira_issue.changelog.histories:
-                history_created = datetime.strptime(history.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-                if history_created < start_of_day:
-                    continue
-
-                # Check author
-                author = history.author.displayName if hasattr(history, 'author') and hasattr(history.author, 'displayName') else None
-                # Fallback to name or emailAddress if displayName doesn't match perfectly, but we'll try matching displayName first
-                author_matches = False
-                if author == report_username:
-                    author_matches = True
-                elif hasattr(history, 'author') and hasattr(history.author, 'name') and history.author.name == report_username:
-                    author_matches = True
-                elif hasattr(history, 'author') and hasattr(history.author, 'emailAddress') and report_username in history.author.emailAddress:
-                    author_matches = True
-
-                if not author_matches:
-                    continue
-
-                for item in history.items:
-                    if item.field == 'status':
-                        # Try to map status
-                        try:
-                            # Try to create a dummy object to pass to map_status
-                            class DummyStatus:
-                                def __init__(self, name, status_id):
-                                    self.name = name
-                                    self.id = status_id
-                                    class DummyCat:
-                                        key = 'indeterminate'
-                                    self.statusCategory = DummyCat()
-
-                            to_status_obj = DummyStatus(item.toString, item.to)
-                            new_status = map_status(to_status_obj, status_mapping)
-
-                            action = map_action_from_status(self.issue_type, new_status)
-                            events.append((history_created, str(action)))
-                        except Exception:
-                            pass
-                    elif item.field == 'description':
-                        events.append((history_created, str(Action.DESCRIPTION_UPDATE)))
-
-        # Parse comments
-        if hasattr(jira_issue.fields, 'comment') and hasattr(jira_issue.fields.comment, 'comments'):
-            for comment in jira_issue.fields.comment.comments:
-                # Check for comment creation
-                comment_created = datetime.strptime(comment.created, "%Y-%m-%dT%H:%M:%S.%f%z")
-                if comment_created >= start_of_day:
-                    author = comment.author.displayName if hasattr(comment, 'author') and hasattr(comment.author, 'displayName') else None
-                    author_matches = False
-                    if author == report_username:
-                        author_matches = True
-                    elif hasattr(comment, 'author') and hasattr(comment.author, 'name') and comment.author.name == report_username:
-                        author_matches = True
-                    elif hasattr(comment, 'author') and hasattr(comment.author, 'emailAddress') and report_username in comment.author.emailAddress:
-                        author_matches = True
-
-                    if author_matches:
-                        events.append((comment_created, str(Action.DISCUSSION)))
-
-                # Check for comment update
-                if hasattr(comment, 'updated') and comment.updated != comment.created:
-                    comment_updated = datetime.strptime(comment.updated, "%Y-%m-%dT%H:%M:%S.%f%z")
-                    if comment_updated >= start_of_day:
-                        update_author = comment.updateAuthor.displayName if hasattr(comment, 'updateAuthor') and hasattr(comment.updateAuthor, 'displayName') else None
-                        update_author_matches = False
-                        if update_author == report_username:
-                            update_author_matches = True
-                        elif hasattr(comment, 'updateAuthor') and hasattr(comment.updateAuthor, 'name') and comment.updateAuthor.name == report_username:
-                            update_author_matches = True
-                        elif hasattr(comment, 'updateAuthor') and hasattr(comment.updateAuthor, 'emailAddress') and report_username in comment.updateAuthor.emailAddress:
-                            update_author_matches = True
-
-                        if update_author_matches:
-                            events.append((comment_updated, str(Action.DISCUSSION)))
+        histories_scanned = histories_in_window = comments_in_window = 0
+
+        # Parse changelog for status updates.
+        # Jira returns the histories in chronological order, so they are scanned from the newest one
+        # and the scan stops at the first history older than the window.
+        for history in reversed((raw_issue.get('changelog') or {}).get('histories', ())):
+            histories_scanned += 1
+            history_created = parse_jira_date(history['created'])
+            if history_created < since:
+                break
+            if until is not None and history_created >= until:
+                continue
+            histories_in_window += 1
+
+            author = Author.from_raw(history.get('author'))
+            for item in history.get('items', ()):
+                field_name = item.get('field')
+                if field_name == 'status':
+                    resolved = classifier.resolve(self.issue_type, item.get('to'), item.get('toString'))
+                    if resolved is not None:
+                        events.append(Event(history_created, author, *resolved))
+                elif field_name == 'description':
+                    events.append(Event(history_created, author, Action.DESCRIPTION_UPDATE))
+
+        # Parse comments.
+        # An old comment may have been edited inside the window, so all of them are scanned, but the ones whose last update
+        # is older than the window are skipped without parsing their creation date.
+        comments = (raw_issue['fields'].get('comment') or {}).get('comments', ())
+        for comment in comments:
+            comment_created_str = comment['created']
+            comment_updated_str = comment.get('updated', comment_created_str)
+            comment_updated = parse_jira_date(comment_updated_str)
+            if comment_updated < since:
+                continue
+            comments_in_window += 1
+
+            # Check for comment creation
+            comment_created = comment_updated if comment_updated_str == comment_created_str else parse_jira_date(comment_created_str)
+            if since <= comment_created and (until is None or comment_created < until):
+                events.append(Event(comment_created, Author.from_raw(comment.get('author')), Action.DISCUSSION))
+
+            # Check for comment update
+            if comment_updated_str != comment_created_str and (until is None or comment_updated < until):
+                events.append(Event(comment_updated, Author.from_raw(comment.get('updateAuthor')), Action.DISCUSSION))
 
         # Sort events chronologically
-        events.sort(key=lambda x: x[0])
-
-        # Deduplicate actions while preserving order
-        seen_actions = set()
-        daily_actions = []
-        for _, action_str in events:
-            if action_str and action_str not in seen_actions and action_str != Action.EMPTY:
-                seen_actions.add(action_str)
-                daily_actions.append(action_str)
+        events.sort(key=lambda x: x.created)
+        self.events = EventTable(events)
+
+        if scan_counters is not None:
+            scan_counters['events.histories_scanned'] += histories_scanned
+            scan_counters['events.histories_in_window'] += histories_in_window
+            scan_counters['events.comments_scanned'] += len(comments)
+            scan_counters['events.comments_in_window'] += comments_in_window
+
+    def compute_daily_actions(self, report_user: ReportUser):
+        """
+        Keeps the actions of the extracted events performed by the given user.
+        """
+        self.daily_actions = _distinct_actions(self.events.by_authors(report_user.is_author).actions())
+
+
+def _distinct_actions(actions: Iterable[Action]) -> list[str]:
+    # Deduplicate actions while preserving order
+    seen_actions = set()
+    distinct_actions = []
+    for action in actions:
+        # The value of the action is shared by all the issues, where str() would copy it
+        action_str = action.value
+        if action_str and action_str not in seen_actions and action_str != Action.EMPTY:
+            seen_actions.add(action_str)
+            distinct_actions.append(action_str)
+    return distinct_actions
+
+
+@dataclass(frozen=True)
+class ReportWindow:
+    """
+    The consecutive local calendar days covered by a report.
+    A current window ends now: its events are not bounded, and the current state of the issues is reported on its last day.
+    """
+    since: datetime
+    day_count: int = 1
+    current: bool = True
+
+    @staticmethod
+    def between(first_day: date, last_day: date) -> 'ReportWindow':
+        """
+        Returns the window from the first to the last given days, both included. Days after today are left out.
+        """
+        today = date.today()
+        last_day = min(last_day, today)
+        if last_day < first_day:
+            raise ValueError(f"The report window ends on {last_day}, before its first day {first_day}.")
+        return ReportWindow(local_midnight(first_day), (last_day - first_day).days + 1, current=last_day == today)
+
+    @property
+    def until(self) -> datetime | None:
+        return None if self.current else local_midnight(self.days()[-1] + timedelta(days=1))
+
+    def days(self) -> list[date]:
+        first_day = self.since.date()
+        return [first_day + timedelta(days=offset) for offset in range(self.day_count)]
+
+
+class StatusClassifier:
+    """
+    Resolves the target statuses of the changelog status changes to actions.
+    Statuses are mapped once and memoized, and the changes that are not explicitly mapped are counted instead of being hidden.
+    """
 
-        self.daily_actions = daily_actions
+    def __init__(self, status_mapping: dict[str, Status]):
+        self.status_mapping = status_mapping
+        self._actions: dict[tuple[bool, str, str | None], tuple[Action, Status, bool]] = {}
+        # Status changes resolved through the category fallback, by (status id, status name)
+        self.unmapped: Counter[tuple[str, str | None]] = Counter()
+        # Status changes that could not be resolved at all
+        self.unclassified = 0
+
+    def merge(self, other: 'StatusClassifier'):
+        """
+        Adds the classification gaps counted by another classifier, such as one used by an extraction process.
+        """
+        self.unmapped.update(other.unmapped)
+        self.unclassified += other.unclassified
+
+    def classify(self, issue_type: str, status_id: str | None, status_name: str | None) -> Action | None:
+        resolved = self.resolve(issue_type, status_id, status_name)
+        return resolved[0] if resolved is not None else None
+
+    def resolve(self, issue_type: str, status_id: str | None, status_name: str | None) -> tuple[Action, Status] | None:
+        """
+        Returns the action of a change to the given status, and the status it is mapped to.
+        """
+        if status_id is None:
+            self.unclassified += 1
+            return None
+
+        key = (issue_type == "Bug", status_id, status_name)
+        resolved = self._actions.get(key)
+        if resolved is None:
+            resolved = self._resolve(issue_type, status_id, status_name)
+            if resolved is None:
+                self.unclassified += 1
+                return None
+            self._actions[key] = resolved
+
+        action, status, mapped = resolved
+        if not mapped:
+            self.unmapped[(status_id, status_name)] += 1
+        return action, status
+
+    def _resolve(self, issue_type: str, status_id: str, status_name: str | None) -> tuple[Action, Status, bool] | None:
+        mapped = status_id in self.status_mapping or (status_name is not None and status_name.lower() in self.status_mapping)
+        try:
+            # The changelog does not tell the category of the target status, unmapped ones are considered in progress
+            status = map_status_fields(status_id, status_name, 'indeterminate', self.status_mapping)
+            return map_action_from_status(issue_type, status), status, mapped
+        except ValueError:
+            return None
+
+
+def start_of_day() -> datetime:
+    # Get the current time in the local timezone, find midnight, and keep timezone awareness
+    now = datetime.now().astimezone()
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def local_midnight(day: date) -> datetime:
+    # The offset of the local timezone may differ from today's, across a daylight saving time change
+    return datetime.combine(day, time()).astimezone()
+
+
+def parse_jira_date(value: str) -> datetime:
+    # Jira dates are ISO 8601 (e.g. 2024-05-02T10:30:00.000+0200), which fromisoformat parses far faster than strptime
+    return datetime.fromisoformat(value)
 
 
 def map_status(jira_status: Any, custom_mapping: dict[str, Status]) -> Status:
-    if jira_status.id in custom_mapping:
-        return custom_mapping[jira_status.id]
+    return map_status_fields(jira_status.id, jira_status.name, jira_status.statusCategory.key, custom_mapping)
+
+
+def map_raw_status(raw_status: dict[str, Any], custom_mapping: dict[str, Status]) -> Status:
+    return map_status_fields(raw_status['id'], raw_status['name'], raw_status['statusCategory']['key'], custom_mapping)
+
+
+def map_status_fields(status_id: str, status_name: str | None, status_category: str, custom_mapping: dict[str, Status]) -> Status:
+    if status_id in custom_mapping:
+        return custom_mapping[status_id]
 
-    jira_status_name = jira_status.name.lower() if jira_status.name else None
+    jira_status_name = status_name.lower() if status_name else None
     if jira_status_name is not None and jira_status_name in custom_mapping:
         return custom_mapping[jira_status_name]
 
-    status_category = jira_status.statusCategory.key
     if status_category == 'new':
         return Status.TO_DO
     elif status_category == 'indeterminate':
@@ -176,7 +485,7 @@ def map_status(jira_status: Any, custom_mapping: dict[str, Status]) -> Status:
     elif status_category == 'done':
         return Status.DONE
 
-    raise ValueError(f"Unable to map status: {jira_status.name} (ID: {jira_status.id}, Category: {status_category})")
+    raise ValueError(f"Unable to map status: {status_name} (ID: {status_id}, Category: {status_category})")
 
 
 def map_action_from_status(issue_type: str, status: Status) -> Action:
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from issue import Action, Event, Issue, ReportUser, Status, intern_author
+
+
+@dataclass
+class CacheState:
+    """
+    Issues already fetched for a project during the current report window.
+    """
+    window_start: datetime
+    report_username: str
+    high_water_mark: datetime
+    issues: dict[str, Issue]
+
+
+class IssueCache:
+    """
+    Persists the parsed issues of a project on disk, so that later runs only fetch what changed since the last sync.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        # The users and the server properties are saved from the client threads, each save reads and rewrites a whole file
+        self._lock = threading.Lock()
+
+    def path_for(self, project: str) -> Path:
+        return self.directory / f"{project}.json"
+
+    @property
+    def users_path(self) -> Path:
+        return self.directory / "users.json"
+
+    @property
+    def servers_path(self) -> Path:
+        return self.directory / "servers.json"
+
+    def load(self, project: str) -> CacheState | None:
+        path = self.path_for(project)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, encoding='utf-8') as cache_file:
+                content = json.load(cache_file)
+            return CacheState(
+                window_start=datetime.fromisoformat(content['window_start']),
+                report_username=content['report_username'],
+                high_water_mark=datetime.fromisoformat(content['high_water_mark']),
+                issues={key: _issue_from_dict(value) for key, value in content['issues'].items()},
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning("Ignoring unreadable issue cache %s: %s", path, e)
+            return None
+
+    def save(self, project: str, state: CacheState):
+        content = {
+            'window_start': state.window_start.isoformat(),
+            'report_username': state.report_username,
+            'high_water_mark': state.high_water_mark.isoformat(),
+            'issues': {key: _issue_to_dict(issue) for key, issue in state.issues.items()},
+        }
+
+        self._write(self.path_for(project), content)
+
+    def load_report_user(self, server: str, username: str) -> ReportUser | None:
+        content = self._read_users().get(server, {}).get(username)
+        if content is None:
+            return None
+        return ReportUser(username, account_id=content['account_id'], name=content['name'])
+
+    def save_report_user(self, server: str, report_user: ReportUser):
+        with self._lock:
+            content = self._read_users()
+            content.setdefault(server, {})[report_user.username] = {'account_id': report_user.account_id, 'name': report_user.name}
+            self._write(self.users_path, content)
+
+    def load_deployment_type(self, server: str) -> str | None:
+        return self._read(self.servers_path).get(server, {}).get('deployment_type')
+
+    def save_deployment_type(self, server: str, deployment_type: str):
+        self._save_server_property(server, 'deployment_type', deployment_type)
+
+    def load_activity_filter(self, server: str) -> str | None:
+        return self._read(self.servers_path).get(server, {}).get('activity_filter')
+
+    def save_activity_filter(self, server: str, activity_filter: str):
+        self._save_server_property(server, 'activity_filter', activity_filter)
+
+    def _save_server_property(self, server: str, name: str, value: str):
+        with self._lock:
+            content = self._read(self.servers_path)
+            content.setdefault(server, {})[name] = value
+            self._write(self.servers_path, content)
+
+    def _read_users(self) -> dict[str, dict[str, dict[str, str | None]]]:
+        return self._read(self.users_path)
+
+    def _read(self, path: Path) -> dict[str, Any]:
+        if not path.exists():
+            return {}
+        try:
+            with open(path, encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable cache %s: %s", path, e)
+            return {}
+
+    def _write(self, path: Path, content: Any):
+        temporary_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # A temporary file of its own, so that concurrent writes never share one
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.directory, prefix=f'{path.stem}.', suffix='.tmp',
+                                             delete=False) as cache_file:
+                temporary_path = Path(cache_file.name)
+                json.dump(content, cache_file)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            self.logger.warning("Unable to write cache %s: %s", path, e)
+            if temporary_path is not None:
+                temporary_path.unlink(missing_ok=True)
+
+
+class MemoryIssueCache(IssueCache):
+    """
+    Keeps the cache in memory for a long running process, so that each refresh only fetches what changed since the previous one
+    without parsing the cache files again. Without a directory, nothing is written to disk, otherwise everything is written through.
+    """
+
+    def __init__(self, directory: Path | None = None):
+        # Without a directory, the paths are only used as keys of the in-memory files
+        super().__init__(directory or Path())
+        self.persistent = directory is not None
+        self._states: dict[str, CacheState | None] = {}
+        self._files: dict[Path, dict[str, Any]] = {}
+
+    def load(self, project: str) -> CacheState | None:
+        if project not in self._states:
+            self._states[project] = super().load(project) if self.persistent else None
+        return self._states[project]
+
+    def save(self, project: str, state: CacheState):
+        self._states[project] = state
+        if self.persistent:
+            super().save(project, state)
+
+    def _read(self, path: Path) -> dict[str, Any]:
+        if path not in self._files:
+            self._files[path] = super()._read(path) if self.persistent else {}
+        return self._files[path]
+
+    def _write(self, path: Path, content: Any):
+        self._files[path] = content
+        if self.persistent:
+            super()._write(path, content)
+
+
+def _issue_to_dict(issue: Issue) -> dict[str, Any]:
+    return {
+        'issue_key': issue.issue_key,
+        'issue_type': issue.issue_type,
+        'summary': issue.summary,
+        'status': issue.status.value if issue.status else None,
+        'assignee': issue.assignee,
+        'assignee_account_id': issue.assignee_account_id,
+        'status_category_key': issue.status_category_key,
+        'is_in_progress': issue.is_in_progress,
+        'events': [
+            [event.created.isoformat(), [event.author.display_name, event.author.name, event.author.email_address, event.author.account_id], event.action.value,
+             event.status.value if event.status else None]
+            for event in issue.events
+        ],
+    }
+
+
+def _issue_from_dict(content: dict[str, Any]) -> Issue:
+    return Issue(
+        issue_key=content['issue_key'],
+        issue_type=sys.intern(content['issue_type']),
+        summary=content['summary'],
+        status=Status(content['status']) if content['status'] else None,
+        assignee=content['assignee'],
+        assignee_account_id=content.get('assignee_account_id'),
+        daily_actions=[],
+        status_category_key=sys.intern(content['status_category_key']),
+        is_in_progress=content['is_in_progress'],
+        events=[
+            # The status of the events was not kept by the earlier caches
+            Event(datetime.fromisoformat(created), intern_author(*author), Action(action), Status(status[0]) if status and status[0] else None)
+            for created, author, action, *status in content['events']
+        ],
+    )
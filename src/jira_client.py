@@ -1,83 +1,222 @@
 import logging
 import concurrent.futures
-from jira import JIRA
+import math
+import multiprocessing
+import queue
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 from config import JiraConfig
-from issue import Issue, map_status, map_action_from_status
+from issue import Author, Issue, ReportUser, ReportWindow, Status, StatusClassifier, map_raw_status, parse_jira_date, start_of_day
+from issue_cache import CacheState, IssueCache
+from profiler import Profiler
+from recording import ReplayError, ResponseRecorder, ResponseReplayer
+from request_scheduler import RequestScheduler
+
+if TYPE_CHECKING:
+    from jira import JIRA
+
+    from activity_store import ActivityStore
+    from async_transport import AsyncJiraTransport
+
+# JQL only accepts dates to the minute, and the clocks of the client and the server may drift apart a little.
+HIGH_WATER_MARK_OVERLAP = timedelta(minutes=1)
+MINUTE = timedelta(minutes=1)
+SEARCH_PAGE_SIZE = 100
+SEARCH_FIELDS = "key,summary,status,assignee,issuetype,updated"
+# The comments are fetched newest first, only for the issues updated inside the report window, and only until the window start
+COMMENT_PAGE_SIZE = 10
+# The only comment fields used to extract the daily actions, the bodies are dropped
+COMMENT_FIELDS = ('created', 'updated', 'author', 'updateAuthor')
+# The only changelog fields used to extract the daily actions
+CHANGELOG_FIELDS = ('status', 'description')
+CHANGELOG_BULK_SIZE = 1000
+CHANGELOG_PAGE_SIZE = 100
+EXPANDED_CHANGELOG_PARAMS = {'fields': 'status', 'expand': 'changelog'}
+JIRA_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+# A search is duplicated once pending for this many times the median latency of the recent searches
+HEDGE_LATENCY_FACTOR = 3
+HEDGE_MIN_DELAY = 0.5
+# Delay before duplicating a search, until enough searches have completed to know their usual latency
+HEDGE_DEFAULT_DELAY = 2.0
+HEDGE_SAMPLES = 50
+# Number of issue keys listed in the parts missing from a partial report
+MISSING_KEYS_LISTED = 10
+# Number of raw issues sent at once to an extraction process: large enough to outweigh the cost of the transfer
+EXTRACTION_CHUNK_SIZE = 250
+# Server-side activity filters, from the narrowest to none: commented() is a ScriptRunner function, CHANGED BY is standard JQL
+ACTIVITY_FILTERS = ('commented', 'changed', 'none')
 
 
 class JiraClient:
-    def __init__(self, config: JiraConfig):
+    def __init__(self, config: JiraConfig, cache: IssueCache | None = None,
+                 recorder: ResponseRecorder | None = None, replayer: ResponseReplayer | None = None, profiler: Profiler | None = None,
+                 deadline: float | None = None, store: 'ActivityStore | None' = None):
+        """
+        With a deadline, in seconds from now, the issues are fetched until it expires, and the parts of the report still
+        pending at that time are left out and listed in missing instead.
+        With a store, the events extracted from the fetched issues are kept in it, for the offline reports.
+        """
         self.config = config
+        self.cache = cache
+        self.store = store
+        self.profiler = profiler or Profiler()
+        # Every request to Jira goes through the scheduler, which paces and retries them, and refuses them past the deadline
+        self.scheduler = RequestScheduler(config.max_workers, config.rate_limit, config.max_retries, self.profiler,
+                                          time.monotonic() + deadline if deadline is not None else None)
+        self.missing: list[str] = []
+        # Captures the raw responses of the run, or serves recorded ones instead of Jira
+        self.recorder = recorder
+        self.replayer = replayer
         self.logger = logging.getLogger(__name__)
-        self.jira = self._connect()
+        self.classifier = StatusClassifier(config.status_mapping)
+        # Shared by every concurrent request: the scans of all the queries of all the projects, and the per-issue changelogs.
+        # Tasks running on this pool must not wait on other tasks of the pool.
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix='jira')
+        # Runs the attempts of the hedged searches, which are awaited by the tasks of the other pools
+        self.hedge_executor = concurrent.futures.ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix='jira-hedge')
+        self._search_latencies: deque[float] = deque(maxlen=HEDGE_SAMPLES)
+        # Started by the first extraction that needs it, and kept for the next ones
+        self._extraction_pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self.transport = self._open_transport() if config.transport == 'async' and replayer is None else None
+        # The jira library and the server information are only loaded by the first request that needs them
+        self._jira: 'JIRA | None' = None
+        self._deployment_type: str | None = None
+        self._activity_filter: str | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def jira(self) -> 'JIRA':
+        with self._lock:
+            if self._jira is None:
+                self._jira = self._connect()
+            return self._jira
 
-    def _connect(self) -> JIRA:
+    @property
+    def is_cloud(self) -> bool:
+        with self._lock:
+            if self._deployment_type is None:
+                self._deployment_type = self._load_deployment_type()
+            return self._deployment_type == 'Cloud'
+
+    def _connect(self) -> 'JIRA':
         self.logger.info("Connecting to Jira server at %s", self.config.server)
         try:
             jira_options = {'server': self.config.server}
-            jira = JIRA(
-                options=jira_options,
-                basic_auth=(self.config.username, self.config.api_token)
-            )
+            # The server information probe is skipped, the deployment type is loaded on demand and cached instead
+            with self.profiler.span('connect'):
+                from jira import JIRA
+                # The retries are left to the scheduler, which shares the throttling of a request with all the others.
+                # The timeout is set again as each request is sent, see _bounded.
+                jira = JIRA(
+                    options=jira_options,
+                    basic_auth=(self.config.username, self.config.api_token),
+                    get_server_info=False,
+                    max_retries=0,
+                    timeout=self.scheduler.remaining()
+                )
+            jira.deploymentType = self._deployment_type
+            jira._session.hooks['response'].append(self._count_response)
             self.logger.info("Successfully connected to Jira.")
             return jira
         except Exception as e:
             self.logger.error("Failed to connect to Jira: %s", e)
             raise
 
-    def fetch_issues(self, report_username: str) -> list[Issue]:
-        jql_filter_updated = f'project = "{self.config.project}" AND updated >= startOfDay() ORDER BY updated ASC'
-        jql_filter_assigned = f'project = "{self.config.project}" AND assignee = "{report_username}" AND resolution = Unresolved AND sprint in openSprints()'
-        self.logger.info("Fetching updated issues using JQL: %s", jql_filter_updated)
+    def _count_response(self, response: Any, *args, **kwargs):
+        # Every HTTP exchange of the jira library session, retries included
+        self.profiler.update({
+            'http.requests': 1,
+            'http.bytes_received': int(response.headers.get('Content-Length') or len(response.content)),
+            'http.throttled': int(response.status_code == 429),
+        })
+
+    def _load_deployment_type(self) -> str:
+        if self.cache is not None:
+            deployment_type = self.cache.load_deployment_type(self.config.server)
+            if deployment_type is not None:
+                return self._set_deployment_type(deployment_type)
+
+        server_info = self._recorded('serverInfo', None, lambda: self._fetch_json('serverInfo') if self.transport is not None else self.jira.server_info())
+        deployment_type = server_info.get('deploymentType') or 'Server'
+        self.logger.info("Jira server at %s is a %s deployment.", self.config.server, deployment_type)
+        if self.cache is not None:
+            self.cache.save_deployment_type(self.config.server, deployment_type)
+        return self._set_deployment_type(deployment_type)
+
+    def _set_deployment_type(self, deployment_type: str) -> str:
+        # Keeps the jira library consistent, some of its methods depend on the deployment type
+        if self._jira is not None:
+            self._jira.deploymentType = deployment_type
+        return deployment_type
+
+    def _open_transport(self) -> 'AsyncJiraTransport':
         try:
-            self.logger.info("Fetching assigned issues using JQL: %s", jql_filter_assigned)
-
-            def fetch(jql):
-                return self.jira.search_issues(
-                    jql,
-                    maxResults=1000,
-                    fields="key,summary,status,assignee,issuetype,comment",
-                    expand="changelog"
-                )
+            from async_transport import AsyncJiraTransport
+        except ImportError as e:
+            raise ImportError("The async transport requires aiohttp, install it with the 'async' extra.") from e
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                future_updated = executor.submit(fetch, jql_filter_updated)
-                future_assigned = executor.submit(fetch, jql_filter_assigned)
+        self.logger.info("Using the async transport with up to %d connections.", self.config.max_workers)
+        return AsyncJiraTransport(self.config.server, self.config.username, self.config.api_token, self.config.max_workers, self.profiler)
 
-                jira_issues_updated = future_updated.result()
-                jira_issues_assigned = future_assigned.result()
+    def _default_window(self) -> ReportWindow:
+        # A replayed run reports on the day it was recorded
+        return ReportWindow(self.replayer.window_start if self.replayer is not None else start_of_day())
 
-            issues_dict = {}
-            all_jira_issues = list(jira_issues_updated) + list(jira_issues_assigned)
-            for jira_issue in all_jira_issues:
-                if jira_issue.key in issues_dict:
-                    continue
-
-                issue_type = jira_issue.fields.issuetype.name
-                current_status = map_status(jira_issue.fields.status, self.config.status_mapping)
-                assignee = jira_issue.fields.assignee.displayName if jira_issue.fields.assignee else None
-                status_category_key = jira_issue.fields.status.statusCategory.key
-                is_in_progress = (assignee == report_username and status_category_key != 'done')
-
-                issue_obj = Issue(
-                    issue_key=jira_issue.key,
-                    issue_type=issue_type,
-                    summary=jira_issue.fields.summary,
-                    status=current_status,
-                    assignee=assignee,
-                    daily_actions=[],
-                    status_category_key=status_category_key,
-                    is_in_progress=is_in_progress
-                )
-                issue_obj.extract_daily_actions(jira_issue, report_username, self.config.status_mapping)
-                issues_dict[issue_obj.issue_key] = issue_obj
+    def fetch_issues(self, report_username: str, refresh: bool = False, window: ReportWindow | None = None) -> list[Issue]:
+        """
+        Fetches the issues of the user with their actions over the report window, today by default.
+        The issues are fetched once for the whole window, whatever its number of days.
+        """
+        window = window or self._default_window()
+        window_start = window.since
+        self.missing = []
+        sync_started = self._now()
+        # Only the current windows are cached, the others are not synchronized again
+        use_cache = not refresh and window.current
+        with self.profiler.span('cache load'):
+            states = {project: self._load_cache_state(project, window_start, report_username) if use_cache else None for project in self.config.projects}
 
-            issues = list(issues_dict.values())
+        try:
+            with self.profiler.span('resolve user'):
+                report_user = self.resolve_report_user(report_username)
 
-            for issue in issues:
-                if not issue.daily_actions and issue.status_category_key == 'indeterminate' and issue.assignee == report_username:
-                    action = map_action_from_status(issue.issue_type, issue.status)
-                    issue.daily_actions.append(str(action))
+            activity = self._activity_clause([report_user], window, sync_started)
+            jql_filters = {}
+            for project, state in states.items():
+                if state is None:
+                    jql_filters[project] = [self._updated_jql(project, window, sync_started, activity)] + self._assigned_jqls(project, [report_user], window)
+                else:
+                    jql_filters[project] = [self._changed_jql(project, state.high_water_mark, sync_started, activity)]
+            issue_keys_by_project, fetched_issues = self._fetch_all(jql_filters, window)
+
+            issues_dict = {}
+            for project, state in states.items():
+                project_issues = state.issues if state is not None else {}
+                project_issues.update((issue_key, fetched_issues[issue_key]) for issue_key in issue_keys_by_project[project])
+                # A partial fetch is not a consistent state to synchronize from
+                if self.cache is not None and window.current and not self.missing:
+                    with self.profiler.span('cache save', project=project):
+                        self.cache.save(project, CacheState(
+                            window_start=window_start,
+                            report_username=report_username,
+                            high_water_mark=sync_started - HIGH_WATER_MARK_OVERLAP,
+                            issues=project_issues,
+                        ))
+                for issue_key, issue in project_issues.items():
+                    issues_dict.setdefault(issue_key, issue)
+
+            with self.profiler.span('user actions'):
+                issues = [issue.for_user(report_user, window.current) for issue in issues_dict.values()]
+            self.profiler.count('issues.reported', len(issues))
+            self._log_classification_gaps()
 
             if self.logger.isEnabledFor(logging.DEBUG):
                 for issue in issues:
@@ -89,10 +228,782 @@ class JiraClient:
             self.logger.error("Failed to fetch issues from Jira: %s", e)
             raise
 
+    def fetch_team_issues(self, report_usernames: list[str], window: ReportWindow | None = None) -> dict[str, list[Issue]]:
+        """
+        Fetches the issues of several users at once: the project wide updated issues are only fetched once,
+        and each user's report is extracted from the shared issues.
+        """
+        window = window or self._default_window()
+        self.missing = []
+        now = self._now()
+        try:
+            with self.profiler.span('resolve user', users=len(report_usernames)):
+                report_users = list(self.executor.map(self.resolve_report_user, report_usernames))
+            activity = self._activity_clause(report_users, window, now)
+            jql_filters = {
+                project: [self._updated_jql(project, window, now, activity)] + self._assigned_jqls(project, report_users, window)
+                for project in self.config.projects
+            }
+            issues = list(self._fetch_all(jql_filters, window)[1].values())
+            self._log_classification_gaps()
+
+            with self.profiler.span('user actions', users=len(report_users)):
+                issues_by_user = {
+                    report_user.username: [issue.for_user(report_user, window.current) for issue in issues] for report_user in report_users
+                }
+            self.profiler.count('issues.reported', sum(len(user_issues) for user_issues in issues_by_user.values()))
+            self.logger.info("Found %d issues for %d users.", len(issues), len(report_users))
+            return issues_by_user
+        except Exception as e:
+            self.logger.error("Failed to fetch issues from Jira: %s", e)
+            raise
+
+    def _now(self) -> datetime:
+        # The reference of the relative dates of the queries: a replayed run sends the queries of the recorded one
+        if self.replayer is not None:
+            return self.replayer.recorded_at
+        if self.recorder is not None:
+            return self.recorder.recorded_at
+        return datetime.now().astimezone()
+
+    def _log_classification_gaps(self):
+        for (status_id, status_name), count in self.classifier.unmapped.items():
+            self.logger.warning("Status '%s' (ID: %s) is missing from StatusMapping, %d changes to it were considered in progress.",
+                                status_name, status_id, count)
+        if self.classifier.unclassified:
+            self.logger.warning("%d status changes could not be classified.", self.classifier.unclassified)
+        self.classifier.unmapped.clear()
+        self.classifier.unclassified = 0
+
+    def _load_cache_state(self, project: str, window_start: datetime, report_username: str) -> CacheState | None:
+        if self.cache is None:
+            return None
+
+        state = self.cache.load(project)
+        if state is None or state.window_start != window_start or state.report_username != report_username:
+            self.logger.info("No usable issue cache for project %s, running a full sync.", project)
+            return None
+
+        self.logger.info("Using issue cache for project %s (last sync: %s).", project, state.high_water_mark)
+        return state
+
+    def resolve_report_user(self, report_username: str) -> ReportUser:
+        """
+        Resolves the configured report username to the Jira user it designates, so that authors are matched by identity.
+        The resolution is kept in the cache, if any. An unresolved username is matched by name, as configured.
+        """
+        if self.cache is not None:
+            report_user = self.cache.load_report_user(self.config.server, report_username)
+            if report_user is not None:
+                return report_user
+
+        try:
+            # Jira Cloud searches users by a free query, Jira Server/Data Center by username
+            query_parameter = 'query' if self.is_cloud else 'username'
+            raw_users = self._get_json('user/search', params={query_parameter: report_username})
+        except TimeoutError:
+            if not self.scheduler.expired():
+                raise
+            self._add_missing(f"the resolution of the report user '{report_username}', matched by name instead")
+            return ReportUser(report_username)
+        # The search also returns the users whose name merely contains the username: only an exact match designates the user,
+        # a guess is neither used nor cached
+        candidates = [raw_user for raw_user in raw_users if Author.from_raw(raw_user).matches(report_username)]
+        if len(candidates) != 1:
+            self.logger.warning("Unable to resolve report user '%s' (%d exact matches among %d users found), authors will be matched by name.",
+                                report_username, len(candidates), len(raw_users))
+            return ReportUser(report_username)
+
+        raw_user = candidates[0]
+        report_user = ReportUser(report_username, account_id=raw_user.get('accountId') or raw_user.get('key'), name=raw_user.get('name'))
+        self.logger.info("Resolved report user '%s' to %s.", report_username, report_user.account_id)
+        if self.cache is not None:
+            self.cache.save_report_user(self.config.server, report_user)
+        return report_user
+
+    @staticmethod
+    def _updated_jql(project: str, window: ReportWindow, now: datetime, activity: str | None = None) -> str:
+        activity_filter = f' AND ({activity})' if activity else ''
+        return f'project = "{project}" AND updated >= {_jql_since(window, now)}{activity_filter} ORDER BY updated ASC'
+
+    @staticmethod
+    def _assigned_jqls(project: str, report_users: list[ReportUser], window: ReportWindow) -> list[str]:
+        # The issues assigned to the users only matter for their current state, which a past window does not report
+        if not window.current:
+            return []
+        return [
+            f'project = "{project}" AND assignee = "{report_user.jql_reference}" AND resolution = Unresolved AND sprint in openSprints()'
+            for report_user in report_users
+        ]
+
+    @staticmethod
+    def _changed_jql(project: str, high_water_mark: datetime, now: datetime, activity: str | None = None) -> str:
+        # Any change that may alter the report (status, assignee, sprint, comment...) bumps the issue's updated date,
+        # so the issues updated since the last sync are the only ones to refresh.
+        # Jira reads the absolute dates in the timezone of the user's profile, which may not be the local one: the high water mark
+        # is sent relative to the server's current time instead, rounded up to the minute.
+        elapsed_minutes = max(1, math.ceil((now - high_water_mark) / MINUTE))
+        activity_filter = f' AND ({activity})' if activity else ''
+        return f'project = "{project}" AND updated >= "-{elapsed_minutes}m"{activity_filter} ORDER BY updated ASC'
+
+    def _activity_clause(self, report_users: list[ReportUser], window: ReportWindow, now: datetime) -> str | None:
+        """
+        Returns the JQL clause matching the issues the users acted on inside the window, or None to search every updated issue.
+        """
+        if not self.config.activity_filter:
+            return None
+        with self._lock:
+            if self._activity_filter is None:
+                try:
+                    self._activity_filter = self._probe_activity_filter(report_users, window, now)
+                except TimeoutError:
+                    # The searches are refused as well past the deadline, the probe is tried again by the next run
+                    if not self.scheduler.expired():
+                        raise
+                    return None
+        return _activity_clause(self._activity_filter, report_users, window, now)
+
+    def _probe_activity_filter(self, report_users: list[ReportUser], window: ReportWindow, now: datetime) -> str:
+        """
+        Returns the narrowest activity filter the server accepts, tried with a one page search, and kept in the cache, if any.
+        """
+        if self.cache is not None:
+            activity_filter = self.cache.load_activity_filter(self.config.server)
+            if activity_filter is not None:
+                return activity_filter
+
+        for activity_filter in ACTIVITY_FILTERS[:-1]:
+            jql = self._updated_jql(self.config.projects[0], window, now, _activity_clause(activity_filter, report_users, window, now))
+            try:
+                with self.profiler.span('activity filter probe', activity_filter=activity_filter):
+                    self._search_page(jql, None, 'key')
+            except Exception as e:
+                # Jira rejects the unknown functions with a 400 response, and a replayed run only recorded the accepted probe:
+                # it does not import the jira library to tell
+                if not isinstance(e, ReplayError) and not (isinstance(e, _jira_error()) and e.status_code == 400):
+                    raise
+                self.logger.info("The Jira server does not support the %s activity filter: %s", activity_filter, e)
+                continue
+            self.logger.info("Narrowing the searches with the %s activity filter.", activity_filter)
+            if self.cache is not None:
+                self.cache.save_activity_filter(self.config.server, activity_filter)
+            return activity_filter
+
+        # Not cached: an unknown user is rejected as well, the probe is tried again by the next run
+        self.logger.warning("The Jira server rejected every activity filter, searching all the updated issues.")
+        return ACTIVITY_FILTERS[-1]
+
+    def _fetch_all(self, jql_filters: dict[str, list[str]], window: ReportWindow) -> tuple[dict[str, list[str]], dict[str, Issue]]:
+        """
+        Scans the queries of every project, and builds the issues as soon as their details are fetched.
+        Returns the keys of the scanned issues of each project, and the built issues in the same order.
+        """
+        # The details are fetched one page of issues at a time, the next pages being downloaded while the current one is built
+        details_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='jira-details')
+        issue_keys_by_project = {project: {} for project in jql_filters}
+        try:
+            with self.profiler.span('scan, details and extraction') as span_args:
+                issues = self._build_issues(self._scan_all(jql_filters, window.since, details_executor, issue_keys_by_project), window)
+                span_args['issues'] = len(issues)
+            # The issues left without their details would erase their stored events
+            if self.store is not None and not self.missing:
+                with self.profiler.span('store save', issues=len(issues)):
+                    self.store.save(issues.values(), window)
+            return {project: list(issue_keys) for project, issue_keys in issue_keys_by_project.items()}, {
+                issue_key: issues[issue_key] for issue_keys in issue_keys_by_project.values() for issue_key in issue_keys
+            }
+        finally:
+            # A batch cut short by the deadline is not waited for, and those queued behind it are not fetched
+            details_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan_all(self, jql_filters: dict[str, list[str]], window_start: datetime, details_executor: concurrent.futures.Executor,
+                  issue_keys_by_project: dict[str, dict[str, None]]) -> Iterator[dict[str, Any]]:
+        """
+        Runs a light scan of the queries of every project, all concurrently on the worker pool, and yields the scanned raw issues
+        page by page, as soon as the changelogs and comments of those updated inside the window are filled in.
+        The details of each page of results are fetched in the background as soon as it arrives, while the scans go on, and
+        the pages are yielded in the order their details complete in, so that no raw issue is kept once built.
+        The keys of the scanned issues are added to those of their project, deduplicated and in the order of the queries.
+        """
+        seen_keys = set()
+        # The raw issues whose details are being fetched, by future
+        pending_pages: dict[concurrent.futures.Future, list[dict[str, Any]]] = {}
+        # The scans, and the details of the pages, put themselves there as they complete
+        completions: queue.SimpleQueue[concurrent.futures.Future] = queue.SimpleQueue()
+        lock = threading.Lock()
+        scanning = True
+
+        def add_page(page_keys: list[list[str]], page: list[dict[str, Any]]):
+            # Runs on the scanning threads, the pages arriving past the deadline are dropped
+            with lock:
+                if not scanning:
+                    return
+                page_keys.append([raw_issue['key'] for raw_issue in page])
+                new_raw_issues = []
+                for raw_issue in page:
+                    if raw_issue['key'] not in seen_keys:
+                        seen_keys.add(raw_issue['key'])
+                        new_raw_issues.append(raw_issue)
+                if new_raw_issues:
+                    details = details_executor.submit(self._fetch_details, new_raw_issues, window_start)
+                    pending_pages[details] = new_raw_issues
+                    details.add_done_callback(completions.put)
+
+        scans = {}
+        for project, project_jql_filters in jql_filters.items():
+            for jql_filter in project_jql_filters:
+                self.logger.info("Fetching issues using JQL: %s", jql_filter)
+                page_keys = []
+                scans[self.executor.submit(self._scan, jql_filter, partial(add_page, page_keys))] = (project, jql_filter, page_keys)
+        for scan in scans:
+            scan.add_done_callback(completions.put)
+
+        def add_missing_results(scan: concurrent.futures.Future):
+            # The pages received before the deadline are still reported
+            _, jql_filter, page_keys = scans[scan]
+            self._add_missing(f"the results of {jql_filter} beyond the first {sum(map(len, page_keys))} issues")
+
+        pending_scans = set(scans)
+        cut_pages = []
+        while pending_scans or pending_pages:
+            try:
+                future = completions.get(timeout=self.scheduler.remaining())
+            except queue.Empty:
+                break
+            if future in pending_scans:
+                pending_scans.remove(future)
+                if not self._completed(future):
+                    add_missing_results(future)
+                continue
+            with lock:
+                page = pending_pages.pop(future)
+            if self._completed(future):
+                yield from page
+            else:
+                cut_pages.append(page)
+
+        with lock:
+            scanning = False
+            completed_scans = [scan for scan in pending_scans if scan.done()]
+            cut_pages.extend(pending_pages.values())
+            pending_pages.clear()
+        for scan in pending_scans:
+            if scan not in completed_scans or not self._completed(scan):
+                add_missing_results(scan)
+        yield from self._without_missing_details([raw_issue for page in cut_pages for raw_issue in page], window_start)
+
+        for project, _, page_keys in scans.values():
+            for keys in page_keys:
+                issue_keys_by_project[project].update(dict.fromkeys(keys))
+
+    def _completed(self, future: concurrent.futures.Future) -> bool:
+        """
+        Waits for the future until the deadline, and returns whether it completed before it expired.
+        """
+        try:
+            future.result(timeout=self.scheduler.remaining())
+            return True
+        except TimeoutError:
+            # Either the wait or a request was cut short by the deadline, any other timeout is an error
+            if not self.scheduler.expired():
+                raise
+            return False
+
+    def _add_missing(self, part: str):
+        self.logger.warning("Deadline expired, the report is missing %s.", part)
+        self.missing.append(part)
+
+    def _scan(self, jql: str, add_page: Callable[[list[dict[str, Any]]], None]):
+        for page in self._search_pages(jql):
+            add_page(page)
+
+    def _without_missing_details(self, raw_issues: list[dict[str, Any]], window_start: datetime) -> Iterator[dict[str, Any]]:
+        """
+        Yields the raw issues left when the deadline expired, with the details fetched in time only: the issues updated inside
+        the window whose changelog or comments are missing are yielded without any detail, and listed as missing.
+        """
+        missing_keys = []
+        for raw_issue in raw_issues:
+            # Copies, as the pending requests may still fill the details in
+            raw_issue = dict(raw_issue)
+            fields = raw_issue['fields'] = dict(raw_issue['fields'])
+            if parse_jira_date(fields['updated']) >= window_start and ('changelog' not in raw_issue or 'comment' not in fields):
+                raw_issue.pop('changelog', None)
+                fields.pop('comment', None)
+                missing_keys.append(raw_issue['key'])
+            yield raw_issue
+        if missing_keys:
+            listed = ', '.join(missing_keys[:MISSING_KEYS_LISTED])
+            if len(missing_keys) > MISSING_KEYS_LISTED:
+                listed += f" and {len(missing_keys) - MISSING_KEYS_LISTED} more"
+            self._add_missing(f"the changes and comments of {len(missing_keys)} issues ({listed})")
+
+    def _fetch_details(self, raw_issues: list[dict[str, Any]], window_start: datetime):
+        # Issues not updated since the start of the window cannot have any history nor comment inside it.
+        updated_issues = [raw_issue for raw_issue in raw_issues if parse_jira_date(raw_issue['fields']['updated']) >= window_start]
+        self.profiler.count('details.issues', len(updated_issues))
+        if not updated_issues:
+            return
+
+        with self.profiler.span('comments', issues=len(updated_issues)):
+            self._fetch_comments(updated_issues, window_start)
+        with self.profiler.span('changelogs', issues=len(updated_issues)):
+            self._fetch_changelogs(updated_issues)
+
+    def _fetch_comments(self, raw_issues: list[dict[str, Any]], window_start: datetime):
+        """
+        Fills the comments of the given raw issues, from the paged comment endpoint rather than the comment field of the search,
+        which inlines the body of every comment of every issue.
+        """
+        if self.transport is not None:
+            self.transport.run(self.transport.gather([self._fill_comments_async(raw_issue, window_start) for raw_issue in raw_issues]),
+                               self.scheduler.remaining())
+        else:
+            list(self.executor.map(partial(self._fill_comments, window_start=window_start), raw_issues))
+
+    def _fill_comments(self, raw_issue: dict[str, Any], window_start: datetime):
+        self._set_comments(raw_issue, self._fetch_issue_comments(raw_issue['key'], window_start))
+
+    async def _fill_comments_async(self, raw_issue: dict[str, Any], window_start: datetime):
+        self._set_comments(raw_issue, await self._fetch_issue_comments_async(raw_issue['key'], window_start))
+
+    def _set_comments(self, raw_issue: dict[str, Any], comments: list[dict[str, Any]]):
+        raw_issue['fields']['comment'] = {'comments': comments}
+        self.profiler.count('comments.fetched', len(comments))
+
+    def _fetch_issue_comments(self, issue_key: str, window_start: datetime) -> list[dict[str, Any]]:
+        comments = []
+        start_at = 0
+        while start_at is not None:
+            response = self._get_json(f'issue/{issue_key}/comment', params=_comment_page_params(start_at))
+            start_at = _add_comment_page(response, start_at, comments, window_start)
+        return comments
+
+    async def _fetch_issue_comments_async(self, issue_key: str, window_start: datetime) -> list[dict[str, Any]]:
+        comments = []
+        start_at = 0
+        while start_at is not None:
+            response = await self._get_json_async(f'issue/{issue_key}/comment', params=_comment_page_params(start_at))
+            start_at = _add_comment_page(response, start_at, comments, window_start)
+        return comments
+
+    def _search_pages(self, jql: str, fields: str = SEARCH_FIELDS) -> Iterator[list[dict[str, Any]]]:
+        """
+        Yields the raw issues matching the JQL page by page, downloading the next page while the current one is processed.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future_page = executor.submit(self._search_page, jql, None, fields)
+            while future_page is not None:
+                raw_issues, cursor = future_page.result()
+                future_page = executor.submit(self._search_page, jql, cursor, fields) if cursor is not None else None
+                yield raw_issues
+
+    def _search_page(self, jql: str, cursor: int | str | None, fields: str) -> tuple[list[dict[str, Any]], int | str | None]:
+        """
+        Fetches one page of search results, and returns its raw issues along with the cursor of the next page, if any.
+        """
+        params = {'jql': jql, 'cursor': cursor, 'fields': fields}
+        raw_issues, next_cursor = self._recorded('search', params, lambda: self._fetch_search_page(jql, cursor, fields),
+                                                 hedged=self.config.hedge_searches)
+        self.profiler.update({'search.pages': 1, 'search.issues': len(raw_issues)})
+        return raw_issues, next_cursor
+
+    def _fetch_search_page(self, jql: str, cursor: int | str | None, fields: str) -> tuple[list[dict[str, Any]], int | str | None]:
+        if self.transport is not None:
+            return self._search_raw_page(jql, cursor, fields)
+
+        json_result = self.config.backend == 'json'
+
+        # Jira Cloud deprecated the offset based search in favour of the token based one.
+        if self.is_cloud:
+            page = self.jira.enhanced_search_issues(
+                jql,
+                nextPageToken=cursor,
+                maxResults=SEARCH_PAGE_SIZE,
+                fields=fields,
+                json_result=json_result
+            )
+            if json_result:
+                return page['issues'], page.get('nextPageToken')
+            return [jira_issue.raw for jira_issue in page], page.nextPageToken if page else None
+
+        page = self.jira.search_issues(
+            jql,
+            startAt=cursor or 0,
+            maxResults=SEARCH_PAGE_SIZE,
+            fields=fields,
+            json_result=json_result
+        )
+        if json_result:
+            raw_issues = page['issues']
+            return raw_issues, _next_start_at(len(raw_issues), page['startAt'], page['total'], page.get('isLast'))
+        raw_issues = [jira_issue.raw for jira_issue in page]
+        return raw_issues, _next_start_at(len(raw_issues), page.startAt, page.total, page.isLast) if page else None
+
+    def _search_raw_page(self, jql: str, cursor: int | str | None, fields: str) -> tuple[list[dict[str, Any]], int | str | None]:
+        if self.is_cloud:
+            page = self._fetch_json('search/jql', params={'jql': jql, 'nextPageToken': cursor, 'maxResults': SEARCH_PAGE_SIZE, 'fields': fields})
+            return page['issues'], page.get('nextPageToken')
+
+        page = self._fetch_json('search', params={'jql': jql, 'startAt': cursor or 0, 'maxResults': SEARCH_PAGE_SIZE, 'fields': fields})
+        raw_issues = page['issues']
+        return raw_issues, _next_start_at(len(raw_issues), page['startAt'], page['total'], page.get('isLast'))
+
+    def _fetch_changelogs(self, raw_issues: list[dict[str, Any]]):
+        """
+        Fills the changelog of the given raw issues with their status and description histories.
+        The changelogs are fetched separately from the search, as the search truncates the histories of long-lived issues.
+        """
+        if not raw_issues:
+            return
+
+        if self.is_cloud:
+            histories_by_id = self._fetch_bulk_changelogs([raw_issue['id'] for raw_issue in raw_issues])
+            for raw_issue in raw_issues:
+                raw_issue['changelog'] = {'histories': histories_by_id.get(raw_issue['id'], [])}
+            self.profiler.count('changelogs.histories', sum(len(histories) for histories in histories_by_id.values()))
+            return
+
+        if self.transport is not None:
+            # Every changelog is paged by its own coroutine, all of them multiplexed on the transport connections
+            self.transport.run(self.transport.gather([self._fill_changelog_async(raw_issue) for raw_issue in raw_issues]), self.scheduler.remaining())
+        else:
+            list(self.executor.map(self._fill_changelog, raw_issues))
+
+    # Each changelog is filled in as soon as it is fetched, so that a report cut short by the deadline still uses it
+    def _fill_changelog(self, raw_issue: dict[str, Any]):
+        self._set_changelog(raw_issue, self._fetch_issue_changelog(raw_issue['key']))
+
+    async def _fill_changelog_async(self, raw_issue: dict[str, Any]):
+        self._set_changelog(raw_issue, await self._fetch_issue_changelog_async(raw_issue['key']))
+
+    def _set_changelog(self, raw_issue: dict[str, Any], histories: list[dict[str, Any]]):
+        raw_issue['changelog'] = {'histories': histories}
+        self.profiler.count('changelogs.histories', len(histories))
+
+    def _fetch_bulk_changelogs(self, issue_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        histories_by_id = {}
+        for chunk_start in range(0, len(issue_ids), CHANGELOG_BULK_SIZE):
+            payload = {
+                'issueIdsOrKeys': issue_ids[chunk_start:chunk_start + CHANGELOG_BULK_SIZE],
+                'fieldIds': list(CHANGELOG_FIELDS),
+                'maxResults': CHANGELOG_BULK_SIZE,
+            }
+            while True:
+                response = self._get_json('changelog/bulkfetch', params=payload, use_post=True)
+                for issue_changelog in response.get('issueChangeLogs', ()):
+                    histories = histories_by_id.setdefault(issue_changelog['issueId'], [])
+                    histories.extend(_normalize_history(history) for history in issue_changelog.get('changeHistories', ()))
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    break
+                payload['nextPageToken'] = next_page_token
+        # The histories of an issue may come in any order, across the pages as well, and the extraction expects them oldest first
+        for histories in histories_by_id.values():
+            histories.sort(key=lambda history: parse_jira_date(history['created']))
+        return histories_by_id
+
+    def _fetch_issue_changelog(self, issue_key: str) -> list[dict[str, Any]]:
+        histories = []
+        start_at = 0
+        while start_at is not None:
+            try:
+                response = self._get_json(f'issue/{issue_key}/changelog', params=_changelog_page_params(start_at))
+            except _jira_error() as e:
+                if e.status_code != 404:
+                    raise
+                # Older servers have no changelog endpoint, the whole changelog is then expanded on the issue itself.
+                return _expanded_changelog(self._get_json(f'issue/{issue_key}', params=EXPANDED_CHANGELOG_PARAMS))
+            start_at = _add_changelog_page(response, start_at, histories)
+        return histories
+
+    async def _fetch_issue_changelog_async(self, issue_key: str) -> list[dict[str, Any]]:
+        histories = []
+        start_at = 0
+        while start_at is not None:
+            try:
+                response = await self._get_json_async(f'issue/{issue_key}/changelog', params=_changelog_page_params(start_at))
+            except _jira_error() as e:
+                if e.status_code != 404:
+                    raise
+                return _expanded_changelog(await self._get_json_async(f'issue/{issue_key}', params=EXPANDED_CHANGELOG_PARAMS))
+            start_at = _add_changelog_page(response, start_at, histories)
+        return histories
+
+    def _get_json(self, path: str, params: dict[str, Any] | None = None, use_post: bool = False) -> Any:
+        request = f"POST {path}" if use_post else path
+        return self._recorded(request, params, lambda: self._fetch_json(path, params, use_post))
+
+    async def _get_json_async(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        with self.profiler.span(_endpoint(path), 'request', path=path):
+            response = await self.scheduler.call_async(lambda: self.transport.get_json(path, params, self.scheduler.remaining()))
+        if self.recorder is not None:
+            self.recorder.record(path, params, response)
+        return response
+
+    def _recorded(self, request: str, params: dict[str, Any] | None, fetch: Callable[[], Any], hedged: bool = False) -> Any:
+        if self.replayer is not None:
+            self.profiler.count('replay.responses')
+            return self.replayer.response(request, params)
+        with self.profiler.span(_endpoint(request), 'request', path=request):
+            # Even the POST requests sent by the client only read data, they can all be retried
+            fetch = partial(self._bounded, fetch)
+            response = self._hedged(fetch) if hedged else self.scheduler.call(fetch)
+        if self.recorder is not None:
+            self.recorder.record(request, params, response)
+        return response
+
+    def _bounded(self, fetch: Callable[[], Any]) -> Any:
+        # Called as the scheduler sends the request: no response is of any use past the deadline, so the jira library session,
+        # which reads its timeout on every request, waits at most for what is left of it by then
+        if self._jira is not None:
+            self._jira._session.timeout = self.scheduler.remaining()
+        return fetch()
+
+    def _hedged(self, fetch: Callable[[], Any]) -> Any:
+        """
+        Sends the request, and a duplicate of it if it is still pending well past the usual latency of the searches.
+        The first successful response wins, the other one is ignored.
+        """
+        started = time.monotonic()
+        attempts = [self.hedge_executor.submit(self.scheduler.call, fetch)]
+        done, _ = concurrent.futures.wait(attempts, timeout=self._hedge_delay())
+        if not done:
+            self.profiler.count('search.hedged')
+            attempts.append(self.hedge_executor.submit(self.scheduler.call, fetch))
+
+        pending = set(attempts)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    if attempt is not attempts[0]:
+                        self.profiler.count('search.hedge_wins')
+                    self._search_latencies.append(time.monotonic() - started)
+                    return attempt.result()
+        return attempts[0].result()
+
+    def _hedge_delay(self) -> float:
+        latencies = list(self._search_latencies)
+        if len(latencies) < 3:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, HEDGE_LATENCY_FACTOR * statistics.median(latencies))
+
+    def _fetch_json(self, path: str, params: dict[str, Any] | None = None, use_post: bool = False) -> Any:
+        """
+        Performs a raw REST request, through the async transport when enabled, or else through the jira library session.
+        """
+        if self.transport is None:
+            if use_post:
+                return self.jira._get_json(path, params=params, use_post=True)
+            return self.jira._get_json(path, params=params)
+        # No response is of any use past the deadline, so no request waits longer than what is left of it, as with the jira library
+        if use_post:
+            return self.transport.run(self.transport.post_json(path, params, self.scheduler.remaining()), self.scheduler.remaining())
+        return self.transport.run(self.transport.get_json(path, params, self.scheduler.remaining()), self.scheduler.remaining())
+
+    def close(self):
+        # The requests still pending when the deadline expired are not sent, and those in flight are not waited for:
+        # they are bounded by the deadline as well
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+        if self._extraction_pool is not None:
+            self._extraction_pool.shutdown(cancel_futures=True)
+        if self.transport is not None:
+            self.transport.close()
+
+    def _build_issues(self, raw_issues: Iterable[dict[str, Any]], window: ReportWindow) -> dict[str, Issue]:
+        if self.config.extraction_processes > 1:
+            issues_dict, scan_counters = self._build_issues_in_processes(raw_issues, window)
+        else:
+            issues_dict = {}
+            scan_counters = Counter()
+            for raw_issue in raw_issues:
+                if raw_issue['key'] not in issues_dict:
+                    issues_dict[raw_issue['key']] = _build_issue(raw_issue, self.config.status_mapping, self.classifier, window, scan_counters)
+        self.profiler.update(scan_counters)
+        self.profiler.count('issues.built', len(issues_dict))
+        return issues_dict
+
+    def _build_issues_in_processes(self, raw_issues: Iterable[dict[str, Any]], window: ReportWindow) -> tuple[dict[str, Issue], Counter]:
+        """
+        Shards the raw issues across the extraction processes, a chunk at a time as their details arrive,
+        and merges the built issues in the order of the raw issues, whatever the order the chunks complete in.
+        """
+        with self._lock:
+            if self._extraction_pool is None:
+                # Forking a process running threads may deadlock it, the extraction processes are started afresh instead
+                self._extraction_pool = concurrent.futures.ProcessPoolExecutor(self.config.extraction_processes,
+                                                                               mp_context=multiprocessing.get_context('spawn'))
+        seen_keys = set()
+        chunk: list[dict[str, Any]] = []
+        chunks = []
+        for raw_issue in raw_issues:
+            if raw_issue['key'] in seen_keys:
+                continue
+            seen_keys.add(raw_issue['key'])
+            chunk.append(raw_issue)
+            if len(chunk) == EXTRACTION_CHUNK_SIZE:
+                chunks.append(self._extraction_pool.submit(_build_issue_chunk, chunk, self.config.status_mapping, window))
+                chunk = []
+        if chunk:
+            chunks.append(self._extraction_pool.submit(_build_issue_chunk, chunk, self.config.status_mapping, window))
+
+        issues_dict = {}
+        scan_counters = Counter()
+        for future in chunks:
+            issues, classifier, chunk_counters = future.result()
+            issues_dict.update((issue.issue_key, issue) for issue in issues)
+            self.classifier.merge(classifier)
+            scan_counters.update(chunk_counters)
+        self.profiler.count('extraction.chunks', len(chunks))
+        return issues_dict, scan_counters
+
     def fetch_jira_statuses(self) -> list:
         self.logger.info("Fetching statuses from Jira server")
         try:
-            return self.jira.statuses()
+            return self.scheduler.call(partial(self._bounded, self.jira.statuses))
         except Exception as e:
             self.logger.error("Failed to fetch Jira Server issue statuses: %s", e)
             raise
+
+
+def _build_issue(raw_issue: dict[str, Any], status_mapping: dict[str, Status], classifier: StatusClassifier, window: ReportWindow,
+                 scan_counters: Counter) -> Issue:
+    fields = raw_issue['fields']
+    assignee = Author.from_raw(fields.get('assignee'))
+    # The issue types and status categories are shared by many issues, they are interned to be stored once
+    issue = Issue(
+        issue_key=raw_issue['key'],
+        issue_type=sys.intern(fields['issuetype']['name']),
+        summary=fields['summary'],
+        status=map_raw_status(fields['status'], status_mapping),
+        assignee=assignee.display_name,
+        daily_actions=[],
+        status_category_key=sys.intern(fields['status']['statusCategory']['key']),
+        assignee_account_id=assignee.account_id
+    )
+    issue.extract_events(raw_issue, classifier, window.since, scan_counters, window.until)
+    return issue
+
+
+def _build_issue_chunk(raw_issues: list[dict[str, Any]], status_mapping: dict[str, Status],
+                       window: ReportWindow) -> tuple[list[Issue], StatusClassifier, Counter]:
+    """
+    Builds the issues of a chunk in an extraction process. The classifier is returned for its classification gaps.
+    """
+    classifier = StatusClassifier(status_mapping)
+    scan_counters = Counter()
+    return [_build_issue(raw_issue, status_mapping, classifier, window, scan_counters) for raw_issue in raw_issues], classifier, scan_counters
+
+
+def _next_start_at(received: int, start_at: int, total: int, is_last: bool | None) -> int | None:
+    # The server may return fewer issues than requested, so the next page starts after what was actually received.
+    next_start = start_at + received
+    if not received or is_last or next_start >= total:
+        return None
+    return next_start
+
+
+def _jql_since(window: ReportWindow, now: datetime) -> str:
+    if not window.current:
+        return _jql_minutes_ago(window.since, now)
+    # Relative to the last day, so that a replayed run sends the queries it recorded
+    return f'startOfDay(-{window.day_count - 1})' if window.day_count > 1 else 'startOfDay()'
+
+
+def _jql_minutes_ago(moment: datetime, now: datetime, rounding: Callable[[float], int] = math.ceil) -> str:
+    # Jira reads the absolute dates in the timezone of the user's profile, which may not be the local one: the local moments
+    # are sent relative to the server's current time instead, rounded to the minute, up by default
+    return f'"-{rounding((now - moment) / MINUTE)}m"'
+
+
+def _activity_clause(activity_filter: str, report_users: list[ReportUser], window: ReportWindow, now: datetime) -> str | None:
+    """
+    JQL only keeps the history of a few fields: the status changes are matched by author, but not the description edits.
+    The issues the users are assigned or reported are kept for those, and the comments are only matched by author with ScriptRunner.
+    """
+    if activity_filter == 'none':
+        return None
+    # The status changes are matched from the local start of the window, and until its local end, rounded outwards
+    since = _jql_minutes_ago(window.since, now)
+    until = _jql_minutes_ago(window.until, now, math.floor) if not window.current else 'now()'
+    clauses = []
+    for report_user in report_users:
+        user = report_user.jql_reference
+        clauses += [f'status CHANGED BY "{user}" DURING ({since}, {until})', f'assignee = "{user}"', f'reporter = "{user}"']
+        if activity_filter == 'commented':
+            clauses.append(f'issueFunction in commented("by {user} after {window.since:%Y/%m/%d}")')
+    return ' OR '.join(clauses)
+
+
+def _jira_error() -> type[Exception]:
+    # The jira library is heavy to import, it is only loaded once a request has been sent
+    from jira import JIRAError
+    return JIRAError
+
+
+def _endpoint(path: str) -> str:
+    # The requests are profiled by endpoint, not by issue
+    return re.sub(r'issue/[^/]+', 'issue/{key}', path)
+
+
+def _changelog_page_params(start_at: int) -> dict[str, Any]:
+    return {'startAt': start_at, 'maxResults': CHANGELOG_PAGE_SIZE}
+
+
+def _add_changelog_page(response: dict[str, Any], start_at: int, histories: list[dict[str, Any]]) -> int | None:
+    """
+    Adds the used histories of a changelog page to the given ones, and returns the start of the next page, if any.
+    """
+    values = response.get('values', [])
+    histories.extend(_normalize_history(history) for history in values if _has_changelog_field(history))
+    start_at += len(values)
+    if not values or response.get('isLast', True) or start_at >= response.get('total', 0):
+        return None
+    return start_at
+
+
+def _comment_page_params(start_at: int) -> dict[str, Any]:
+    return {'startAt': start_at, 'maxResults': COMMENT_PAGE_SIZE, 'orderBy': '-created'}
+
+
+def _add_comment_page(response: dict[str, Any], start_at: int, comments: list[dict[str, Any]], window_start: datetime) -> int | None:
+    """
+    Adds the metadata of the comments of a page, newest first, to the given ones, and returns the start of the next page, if any.
+    Paging stops at the first page reaching a comment created before the window: the older comments edited inside the window
+    are only reported if they were on the pages already fetched.
+    """
+    values = response.get('comments', [])
+    comments.extend({name: comment[name] for name in COMMENT_FIELDS if name in comment} for comment in values)
+    start_at += len(values)
+    if not values or start_at >= response.get('total', 0):
+        return None
+    newest, oldest = parse_jira_date(values[0]['created']), parse_jira_date(values[-1]['created'])
+    # A server ignoring the order returns the oldest comments first, which must then all be fetched
+    if oldest < window_start and oldest <= newest:
+        return None
+    return start_at
+
+
+def _expanded_changelog(response: dict[str, Any]) -> list[dict[str, Any]]:
+    return [_normalize_history(history) for history in response['changelog']['histories'] if _has_changelog_field(history)]
+
+
+def _has_changelog_field(history: dict[str, Any]) -> bool:
+    return any(item.get('field') in CHANGELOG_FIELDS for item in history.get('items', ()))
+
+
+def _normalize_history(history: dict[str, Any]) -> dict[str, Any]:
+    """
+    Keeps only the changelog items of the used fields, with the creation date in the same format as the issue fields.
+    """
+    created = history['created']
+    if isinstance(created, int | float):
+        # The bulk changelog endpoint returns epoch timestamps
+        created = datetime.fromtimestamp(created / 1000 if created > 10 ** 11 else created).astimezone().strftime(JIRA_DATE_FORMAT)
+    return {
+        'created': created,
+        'author': history.get('author'),
+        'items': [item for item in history.get('items', ()) if item.get('field') in CHANGELOG_FIELDS],
+    }
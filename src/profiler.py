@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+PROFILE_FORMATS = ('json', 'trace')
+
+
+@dataclass
+class Span:
+    """
+    A timed section of a run, a phase or a request, as seen by the thread that ran it.
+    """
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread_id: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class Profiler:
+    """
+    Collects the timing spans and the counters of a run, from any thread.
+    Collecting is cheap enough to be always on, the profile is only written when requested.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self.counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = 'phase', **args) -> Iterator[dict[str, Any]]:
+        """
+        Times the enclosed block. The yielded arguments may be completed by the block, they are attached to the span.
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            span = Span(name, category, start - self.started, time.perf_counter() - start, threading.get_native_id(), args)
+            with self._lock:
+                self.spans.append(span)
+
+    def reset(self):
+        """
+        Drops the spans and the counters collected so far, and restarts the wall time.
+        """
+        with self._lock:
+            self.started = time.perf_counter()
+            self.spans.clear()
+            self.counters.clear()
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def update(self, counters: dict[str, int]):
+        with self._lock:
+            self.counters.update(counters)
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary: the time spent in each span name, then the counters.
+        Spans running concurrently overlap, so their total time may exceed the wall time of the run.
+        """
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        lines = [f"Profile: {time.perf_counter() - self.started:.3f} s wall time"]
+        totals: dict[tuple[str, str], list[float]] = {}
+        for span in spans:
+            totals.setdefault((span.category, span.name), []).append(span.duration)
+        if totals:
+            lines.append(f"  {'span':<30} {'count':>7} {'total (s)':>10} {'max (s)':>10}")
+            for (category, name), durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+                lines.append(f"  {category + ':' + name:<30} {len(durations):>7} {sum(durations):>10.3f} {max(durations):>10.3f}")
+        if counters:
+            lines.append(f"  {'counter':<30} {'value':>7}")
+            for name, value in sorted(counters.items()):
+                lines.append(f"  {name:<30} {value:>7}")
+        return '\n'.join(lines)
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'wall_seconds': time.perf_counter() - self.started,
+                'spans': [vars(span) for span in self.spans],
+                'counters': dict(self.counters),
+            }
+
+    def to_trace_events(self) -> dict[str, Any]:
+        """
+        Returns the spans in the Trace Event Format, viewable in chrome://tracing or Perfetto.
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': pid, 'tid': span.thread_id,
+                 'ts': span.start * 1_000_000, 'dur': span.duration * 1_000_000, 'args': span.args}
+                for span in self.spans
+            ]
+            end = (time.perf_counter() - self.started) * 1_000_000
+            events.extend({'name': name, 'ph': 'C', 'pid': pid, 'ts': end, 'args': {'value': value}} for name, value in self.counters.items())
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path: Path, profile_format: str = 'json'):
+        content = self.to_trace_events() if profile_format == 'trace' else self.to_json()
+        with open(path, 'w', encoding='utf-8') as profile_file:
+            json.dump(content, profile_file, default=str)
+
+    def print_summary(self, stream: TextIO):
+        print(self.summary(), file=stream)
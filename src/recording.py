@@ -0,0 +1,77 @@
+import gzip
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+
+class ReplayError(LookupError):
+    pass
+
+
+class ResponseRecorder:
+    """
+    Captures the raw responses received from Jira during a run, so that the run can be replayed later without any network.
+    The dump is written as JSON lines, gzip compressed when the file name ends with '.gz'.
+    """
+
+    def __init__(self, server: str, window_start: datetime):
+        self.server = server
+        self.window_start = window_start
+        # The queries give their dates relative to this time, a replayed run sends them relative to it as well
+        self.recorded_at = datetime.now().astimezone()
+        # The responses are serialized as soon as they are received, as the client completes the raw issues in place
+        self.responses: dict[str, str] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def record(self, request: str, params: dict[str, Any] | None, response: Any):
+        self.responses[_request_key(request, params)] = json.dumps(response, separators=(',', ':'))
+
+    def save(self, path: Path):
+        header = {'server': self.server, 'window_start': self.window_start.isoformat(), 'recorded_at': self.recorded_at.isoformat()}
+        with _open_dump(path, 'wt') as dump_file:
+            dump_file.write(json.dumps(header) + '\n')
+            for key, response in self.responses.items():
+                dump_file.write(f'{{"request":{key},"response":{response}}}\n')
+        self.logger.info("Recorded %d Jira responses to %s", len(self.responses), path)
+
+
+class ResponseReplayer:
+    """
+    Serves the responses of a recorded run in place of Jira.
+    """
+
+    def __init__(self, server: str, window_start: datetime, responses: dict[str, str], recorded_at: datetime | None = None):
+        self.server = server
+        self.window_start = window_start
+        self.responses = responses
+        self.recorded_at = recorded_at or datetime.now().astimezone()
+
+    @staticmethod
+    def load(path: Path) -> 'ResponseReplayer':
+        with _open_dump(path, 'rt') as dump_file:
+            header = json.loads(dump_file.readline())
+            responses = {}
+            for line in dump_file:
+                entry = json.loads(line)
+                responses[json.dumps(entry['request'], sort_keys=True, separators=(',', ':'))] = json.dumps(entry['response'])
+        recorded_at = datetime.fromisoformat(header['recorded_at']) if 'recorded_at' in header else None
+        return ResponseReplayer(header['server'], datetime.fromisoformat(header['window_start']), responses, recorded_at)
+
+    def response(self, request: str, params: dict[str, Any] | None) -> Any:
+        try:
+            # Every request gets its own copy, as the client completes the raw issues in place
+            return json.loads(self.responses[_request_key(request, params)])
+        except KeyError:
+            raise ReplayError(f"No recorded response for {request} with {params}") from None
+
+
+def _request_key(request: str, params: dict[str, Any] | None) -> str:
+    return json.dumps([request, params or {}], sort_keys=True, separators=(',', ':'))
+
+
+def _open_dump(path: Path, mode: str) -> IO[str]:
+    if path.suffix == '.gz':
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
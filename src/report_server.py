@@ -0,0 +1,198 @@
+import errno
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Delay suggested to the clients asking for the report before the first one is rendered
+FIRST_REPORT_RETRY_AFTER = 5
+# Header required to refresh the report: a page of another site cannot send it without the consent of the server
+REFRESH_HEADER = 'X-Requested-By'
+
+
+class ReportServer:
+    """
+    Keeps the report warm in a long running process: the Jira session, the resolved users and the parsed issues are kept
+    by the render function between refreshes, and the last rendered report is served over HTTP, on a port of the loopback
+    interface or on a Unix socket.
+        GET /          returns the last rendered report
+        POST /refresh  renders the report again, then returns it, if the request has an X-Requested-By header
+    """
+
+    def __init__(self, render: Callable[[], str], interval: float):
+        self.render = render
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        # The last rendered report and its rendering time, replaced at once so that the handlers never see a partial update
+        self.snapshot: tuple[str, datetime] | None = None
+        self.error: str | None = None
+        self.http_server: socketserver.BaseServer | None = None
+        self.address: str | None = None
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def refresh(self) -> bool:
+        """
+        Renders the report again. On failure the previous report is still served, and False is returned.
+        """
+        with self._refresh_lock:
+            started = time.perf_counter()
+            try:
+                report = self.render()
+            except Exception as e:
+                self.logger.error("Failed to refresh the report, serving the previous one: %s", e)
+                self.error = str(e)
+                return False
+            self.snapshot = (report, datetime.now().astimezone())
+            self.error = None
+            self.logger.info("Report refreshed in %.2f s.", time.perf_counter() - started)
+            return True
+
+    def bind(self, address: str):
+        """
+        Listens at the given address: a port number of the loopback interface, 0 for any free port, or a Unix socket path.
+        """
+        if address.isdigit():
+            http_server: socketserver.BaseServer = _LoopbackHTTPServer(('127.0.0.1', int(address)), _ReportHandler)
+            self.address = f"http://127.0.0.1:{http_server.server_address[1]}/"
+        else:
+            path = Path(address)
+            if path.is_socket():
+                if _is_listening(path):
+                    raise OSError(errno.EADDRINUSE, f"A report server is already listening at {path}")
+                # Left behind by a server that did not stop cleanly
+                path.unlink()
+            # The report is only readable by the user running the server: the socket is created with these permissions,
+            # as other users could connect between its creation and a later change of its permissions
+            previous_umask = os.umask(0o177)
+            try:
+                http_server = _unix_http_server(str(path))
+            finally:
+                os.umask(previous_umask)
+            self.address = str(path)
+        http_server.report_server = self
+        self.http_server = http_server
+
+    def serve_forever(self):
+        """
+        Refreshes the report on the interval, the first time immediately, and serves it until interrupted or stopped.
+        """
+        if self.http_server is None:
+            raise RuntimeError("The report server must be bound before serving.")
+        threading.Thread(target=self._refresh_periodically, name='report-refresh', daemon=True).start()
+        self.logger.info("Serving the report at %s, refreshed every %g s.", self.address, self.interval)
+        try:
+            self.http_server.serve_forever()
+        except KeyboardInterrupt:
+            self.logger.info("Report server interrupted.")
+        finally:
+            self._stopped.set()
+            self.http_server.server_close()
+            if not self.address.startswith('http'):
+                Path(self.address).unlink(missing_ok=True)
+
+    def stop(self):
+        self._stopped.set()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+
+    def _refresh_periodically(self):
+        self.refresh()
+        while not self._stopped.wait(self.interval):
+            self.refresh()
+
+
+class _ReportHandler(BaseHTTPRequestHandler):
+    server: '_LoopbackHTTPServer'
+
+    def do_GET(self):
+        if not self._accepts_host():
+            return
+        if urlparse(self.path).path != '/':
+            self._reply(404, "Not found, the report is served at /.\n")
+            return
+        self._reply_report()
+
+    def do_POST(self):
+        if not self._accepts_host():
+            return
+        if urlparse(self.path).path != '/refresh':
+            self._reply(404, "Not found, the report is refreshed at /refresh.\n")
+            return
+        if REFRESH_HEADER not in self.headers:
+            # A form, or any other simple request of a page of another site, cannot set a custom header
+            self._reply(403, f"Forbidden, the report is refreshed by requests with an {REFRESH_HEADER} header.\n")
+            return
+        self.server.report_server.refresh()
+        self._reply_report()
+
+    def _accepts_host(self) -> bool:
+        # A page of another site may resolve its own host name to the loopback address: over TCP, only the requests
+        # addressed to the loopback interface itself are answered
+        allowed_hosts = getattr(self.server, 'allowed_hosts', None)
+        if allowed_hosts is not None and (self.headers.get('Host') or '').lower() not in allowed_hosts:
+            self._reply(403, "Forbidden, the report is only served to the requests addressed to the loopback interface.\n")
+            return False
+        return True
+
+    def _reply_report(self):
+        report_server = self.server.report_server
+        snapshot = report_server.snapshot
+        if snapshot is None:
+            reason = f": {report_server.error}" if report_server.error else ""
+            self._reply(503, f"The first report is not ready yet{reason}.\n", {'Retry-After': str(FIRST_REPORT_RETRY_AFTER)})
+            return
+        report, rendered_at = snapshot
+        self._reply(200, report, {'Last-Modified': formatdate(rendered_at.timestamp(), usegmt=True)})
+
+    def _reply(self, status: int, text: str, headers: dict[str, str] | None = None):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # The clients of a Unix socket have no address
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug("%s - %s", self.address_string(), format % args)
+
+
+class _LoopbackHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    report_server: ReportServer
+
+    def server_bind(self):
+        super().server_bind()
+        port = self.server_address[1]
+        self.allowed_hosts = frozenset({f'127.0.0.1:{port}', f'localhost:{port}'})
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(path))
+        except ConnectionRefusedError:
+            return False
+    return True
+
+
+def _unix_http_server(path: str) -> socketserver.BaseServer:
+    # Unix sockets are not available on every platform, so the class is only defined when one is requested
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    return UnixHTTPServer(path, _ReportHandler)
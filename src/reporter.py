@@ -1,15 +1,31 @@
 import logging
+from collections.abc import Iterable
+from typing import TextIO
 
 from config import ReportConfig
-from issue import Issue
+from issue import Issue, ReportWindow
+
+WEEKDAYS = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
 
 
 class Reporter:
-    def __init__(self, config: ReportConfig):
+    def __init__(self, config: ReportConfig, output: TextIO | None = None):
         self.config = config
+        # The standard output by default
+        self.output = output
         self.logger = logging.getLogger(__name__)
 
-    def generate_report(self, issues: list[Issue]):
+    def generate_team_report(self, issues_by_user: dict[str, list[Issue]], window: ReportWindow | None = None):
+        for index, (username, issues) in enumerate(issues_by_user.items()):
+            if index:
+                print(file=self.output)
+            print(f"# {username}", file=self.output)
+            self.generate_report(issues, window)
+
+    def generate_report(self, issues: list[Issue], window: ReportWindow | None = None):
+        """
+        Prints the actions of the issues, in one section per day if the report window spans several days.
+        """
         if not issues:
             self.logger.info("No issues found.")
             return
@@ -20,6 +36,22 @@ class Reporter:
         report_lines = []
         if self.config.introduction:
             report_lines.append(self.config.introduction)
+
+        if window is None or window.day_count == 1:
+            report_lines.extend(self._issue_lines(issues) or ["No issues found."])
+        else:
+            days = window.days()
+            for day in days:
+                current = window.current and day == days[-1]
+                report_lines.append(f"## {WEEKDAYS[day.weekday()]} {day:%d/%m/%Y}")
+                report_lines.extend(self._issue_lines(issue.on_day(day, current) for issue in issues) or ["No issues found."])
+
+        print("\n".join(report_lines), file=self.output)
+
+        self.logger.info("Report generation complete.")
+
+    def _issue_lines(self, issues: Iterable[Issue]) -> list[str]:
+        issue_lines = []
         for issue in issues:
             if not issue.is_valid():
                 self.logger.warning("Invalid issue skipped: %s", issue)
@@ -31,15 +63,21 @@ class Reporter:
             if issue.is_in_progress:
                 issue.daily_actions[-1] += " (en cours)"
 
-            report_lines.append(f"* {issue.issue_key} {issue.summary}")
+            issue_lines.append(f"* {issue.issue_key} {issue.summary}")
             for action in issue.daily_actions:
-                report_lines.append(f"  * {action}")
+                issue_lines.append(f"  * {action}")
 
-        empty_report_length = 1 if self.config.introduction else 0
-        if len(report_lines) == empty_report_length:
-            report_lines.append("No issues found.")
+        if not issue_lines:
             self.logger.info("No issues found.")
+        return issue_lines
 
-        print("\n".join(report_lines))
-
-        self.logger.info("Report generation complete.")
+    def report_missing(self, missing: list[str]):
+        """
+        Marks a report cut short by the deadline, listing the parts left out.
+        """
+        if not missing:
+            return
+        print(file=self.output)
+        print("Incomplete report, missing when the deadline expired:", file=self.output)
+        for part in missing:
+            print(f"  * {part}", file=self.output)
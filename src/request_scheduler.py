@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+from profiler import Profiler
+
+T = TypeVar('T')
+
+# Statuses of the responses worth retrying, and those meaning that Jira asks the clients to slow down
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+DEFAULT_MAX_RETRIES = 5
+BASE_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 60.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised instead of sending a request once the deadline of the run has expired, or instead of the error of a request
+    cut short by it.
+    """
+
+
+class RequestScheduler:
+    """
+    Paces the requests sent to Jira, from any thread or coroutine:
+    - a token bucket caps the request rate, when a rate limit is configured,
+    - the concurrency limit is halved when Jira throttles a request, and slowly raised back while requests succeed,
+    - a throttled request pauses every request for the Retry-After delay sent by Jira,
+    - the failed requests are retried with a jittered exponential backoff,
+    - no request is sent, nor retried, past the deadline, if any.
+    """
+
+    def __init__(self, max_concurrency: int, rate_limit: float | None = None, max_retries: int = DEFAULT_MAX_RETRIES,
+                 profiler: Profiler | None = None, deadline: float | None = None):
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        # Monotonic time after which the requests are refused
+        self.deadline = deadline
+        self.profiler = profiler or Profiler()
+        self.logger = logging.getLogger(__name__)
+
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        # The bucket holds up to a second of requests
+        self.burst = max(1.0, rate_limit or 0.0)
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+        self._condition = threading.Condition()
+        # A request sent while another one is being scheduled by the same thread does not take another slot
+        self._local = threading.local()
+
+    def remaining(self) -> float | None:
+        """
+        Returns the time left before the deadline, or None if there is no deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def call(self, fetch: Callable[[], T], retryable: bool = True) -> T:
+        """
+        Sends a request when the scheduler allows it, and retries it if it fails with a transient error.
+        Only the requests without side effects may be retried.
+        """
+        if getattr(self._local, 'scheduled', False):
+            return fetch()
+
+        attempt = 0
+        while True:
+            self._acquire()
+            self._local.scheduled = True
+            try:
+                response = fetch()
+            except Exception as e:
+                delay = self._on_failure(e, attempt, retryable)
+                if delay is None:
+                    self._raise_if_cut_short(e)
+                    raise
+            else:
+                self._on_success()
+                return response
+            finally:
+                self._local.scheduled = False
+                self._release()
+            attempt += 1
+            time.sleep(delay)
+
+    async def call_async(self, fetch: Callable[[], Awaitable[T]], retryable: bool = True) -> T:
+        attempt = 0
+        while True:
+            while (wait := self._try_acquire()) > 0:
+                # The event loop cannot wait on the condition, it polls the scheduler instead
+                await asyncio.sleep(min(wait, 0.05, self._wait_before_deadline()))
+            try:
+                response = await fetch()
+            except Exception as e:
+                delay = self._on_failure(e, attempt, retryable)
+                if delay is None:
+                    self._raise_if_cut_short(e)
+                    raise
+            else:
+                self._on_success()
+                return response
+            finally:
+                self._release()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _acquire(self):
+        with self._condition:
+            waited = 0.0
+            while (wait := self._try_acquire_locked()) > 0:
+                started = time.monotonic()
+                wait = min(wait, self._wait_before_deadline())
+                self._condition.wait(None if math.isinf(wait) else wait)
+                waited += time.monotonic() - started
+        if waited:
+            self.profiler.count('scheduler.wait_ms', round(waited * 1000))
+
+    def _wait_before_deadline(self) -> float:
+        remaining = self.remaining()
+        if remaining is None:
+            return math.inf
+        if remaining <= 0:
+            raise DeadlineExceeded("The deadline expired before the request could be sent.")
+        return remaining
+
+    def _try_acquire(self) -> float:
+        with self._condition:
+            return self._try_acquire_locked()
+
+    def _try_acquire_locked(self) -> float:
+        """
+        Takes a slot and a token, and returns 0, or returns how long to wait before trying again.
+        """
+        now = time.monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            raise DeadlineExceeded("The deadline expired before the request could be sent.")
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.concurrency_limit):
+            # A slot is freed by a running request, which notifies the waiting threads
+            return math.inf
+        if self.rate_limit:
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate_limit)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate_limit
+            self.tokens -= 1
+        self.in_flight += 1
+        return 0.0
+
+    def _release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _on_success(self):
+        with self._condition:
+            if self.concurrency_limit < self.max_concurrency:
+                # Additive increase: about one more slot per round of successful requests
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+                self._condition.notify_all()
+
+    def _on_failure(self, error: Exception, attempt: int, retryable: bool) -> float | None:
+        """
+        Returns the delay before retrying the failed request, or None if it must not be retried.
+        """
+        status_code = getattr(error, 'status_code', None)
+        if isinstance(error, DeadlineExceeded) or (status_code not in RETRY_STATUSES and not isinstance(error, OSError)):
+            return None
+
+        retry_after = _retry_after(error)
+        if status_code in THROTTLE_STATUSES:
+            self.profiler.count('scheduler.throttled')
+            with self._condition:
+                # Multiplicative decrease, and every request waits for the delay asked by Jira
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                if retry_after is not None:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+        if not retryable or attempt >= self.max_retries:
+            return None
+
+        delay = retry_after if retry_after is not None else retry_delay(attempt)
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            return None
+        self.profiler.count('scheduler.retries')
+        self.logger.warning("Jira request failed (%s), retrying in %.1f s with up to %d concurrent requests.",
+                            status_code or type(error).__name__, delay, int(self.concurrency_limit))
+        return delay
+
+    def _raise_if_cut_short(self, error: Exception):
+        # Each request only waits for what is left of the deadline: whatever the transport raises, a request timed out,
+        # or disconnected, once the deadline expired was cut short by it
+        if isinstance(error, OSError) and not isinstance(error, DeadlineExceeded) and self.expired():
+            raise DeadlineExceeded("The deadline expired before the response was received.") from error
+
+
+def retry_delay(attempt: int) -> float:
+    # Full jitter: the clients throttled at the same time do not all come back at the same time
+    return random.uniform(0, min(MAX_RETRY_DELAY, BASE_RETRY_DELAY * 2 ** attempt))
+
+
+def _retry_after(error: Exception) -> float | None:
+    response: Any = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return min(MAX_RETRY_DELAY, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        # The delay may also be given as an HTTP date
+        return min(MAX_RETRY_DELAY, max(0.0, (parsedate_to_datetime(value) - datetime.now().astimezone()).total_seconds()))
+    except (TypeError, ValueError):
+        return None
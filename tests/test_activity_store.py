@@ -0,0 +1,86 @@
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from datetime import date, timedelta
+from pathlib import Path
+
+from activity_store import ActivityStore
+from issue import Action, Author, Event, Issue, ReportUser, ReportWindow, Status, local_midnight
+
+TUESDAY = date(2024, 4, 30)
+
+
+def _issue(issue_key: str, events: list[Event]) -> Issue:
+    return Issue(issue_key, "Bug", f"Summary of {issue_key}", Status.IN_PROGRESS, "Test User", [],
+                 status_category_key='indeterminate', is_in_progress=True, events=events)
+
+
+class TestActivityStore(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.store = ActivityStore(Path(self.temporary_directory.name) / 'store' / 'activity.sqlite')
+        self.user = Author("Test User", "tuser", "tuser@example.com", "JIRAUSER1")
+        self.other = Author("Other User", "ouser", None, "JIRAUSER2")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _at(self, day: date, hour: int):
+        return local_midnight(day) + timedelta(hours=hour)
+
+    def test_load_the_report_of_a_past_day(self):
+        # Arrange
+        wednesday = TUESDAY + timedelta(days=1)
+        self.store.save([
+            _issue("PROJ-1", [
+                Event(self._at(TUESDAY, 9), self.user, Action.FIX, Status.IN_PROGRESS),
+                Event(self._at(TUESDAY, 10), self.other, Action.DISCUSSION),
+                Event(self._at(wednesday, 9), self.user, Action.TO_REVIEW, Status.TO_REVIEW),
+            ]),
+            _issue("PROJ-2", [Event(self._at(TUESDAY, 8), self.user, Action.DISCUSSION)]),
+        ], ReportWindow(local_midnight(TUESDAY), day_count=2, current=False))
+
+        # Act
+        issues = self.store.load_issues(ReportUser("tuser"), ReportWindow(local_midnight(TUESDAY), current=False))
+
+        # Assert
+        self.assertEqual([(issue.issue_key, issue.daily_actions, issue.is_in_progress) for issue in issues], [
+            ("PROJ-2", [Action.DISCUSSION], False),
+            ("PROJ-1", [Action.FIX], False),
+        ])
+        self.assertEqual(issues[1].events[0].status, Status.IN_PROGRESS)
+        self.assertEqual(issues[1].events[0].created, self._at(TUESDAY, 9))
+
+    def test_save_replaces_the_events_of_the_window(self):
+        # Arrange
+        window = ReportWindow(local_midnight(TUESDAY), current=False)
+        self.store.save([_issue("PROJ-1", [
+            Event(self._at(TUESDAY - timedelta(days=1), 9), self.user, Action.FIX),
+            Event(self._at(TUESDAY, 9), self.user, Action.DISCUSSION),
+        ])], ReportWindow(local_midnight(TUESDAY - timedelta(days=1)), day_count=2, current=False))
+
+        # Act
+        # The comment was deleted since the previous fetch
+        self.store.save([_issue("PROJ-1", [])], window)
+
+        # Assert
+        self.assertEqual(self.store.load_issues(ReportUser("tuser"), window), [])
+        monday = ReportWindow(local_midnight(TUESDAY - timedelta(days=1)), current=False)
+        self.assertEqual([issue.daily_actions for issue in self.store.load_issues(ReportUser("tuser"), monday)], [[Action.FIX]])
+
+    def test_events_are_queried_by_author_and_day(self):
+        self.store.save([_issue("PROJ-1", [Event(self._at(TUESDAY, 9), self.user, Action.FIX)])], ReportWindow(local_midnight(TUESDAY)))
+
+        with closing(sqlite3.connect(self.store.path)) as connection:
+            plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM events WHERE author IN (?) AND day BETWEEN ? AND ?",
+                                      ['JIRAUSER1', '2024-04-30', '2024-04-30']).fetchall()
+
+        self.assertIn('events_by_author_day', ' '.join(str(row) for row in plan))
+
+    def test_unknown_user(self):
+        self.assertEqual(self.store.load_issues(ReportUser("nobody"), ReportWindow(local_midnight(TUESDAY), current=False)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import gzip
+import importlib.util
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from jira import JIRAError
+
+# The async transport is an optional extra
+AIOHTTP_INSTALLED = importlib.util.find_spec('aiohttp') is not None
+if AIOHTTP_INSTALLED:
+    from async_transport import AsyncJiraTransport, _query_params
+
+# The Basic credentials of user:token
+AUTHORIZATION = 'Basic dXNlcjp0b2tlbg=='
+
+
+class _JiraHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.headers.get('Authorization') != AUTHORIZATION:
+            self._reply(401, {'errorMessages': ['Unauthorized']})
+        elif url.path == '/rest/api/2/issue/TEST-1/changelog':
+            self._reply(200, {'path': url.path, 'query': parse_qs(url.query)})
+        else:
+            self._reply(404, {'errorMessages': ['Not found']})
+
+    def do_POST(self):
+        if self.headers.get('Authorization') != AUTHORIZATION:
+            self._reply(401, {'errorMessages': ['Unauthorized']})
+            return
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._reply(200, {'payload': payload})
+
+    def _reply(self, status, content):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipUnless(AIOHTTP_INSTALLED, "aiohttp is not installed")
+class TestAsyncJiraTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _JiraHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.transport = AsyncJiraTransport(f'http://127.0.0.1:{self.server.server_port}', 'user', 'token', 2)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_json(self):
+        response = self.transport.run(self.transport.get_json('issue/TEST-1/changelog', params={'startAt': 0, 'maxResults': None}))
+
+        self.assertEqual(response, {'path': '/rest/api/2/issue/TEST-1/changelog', 'query': {'startAt': ['0']}})
+
+    def test_post_json(self):
+        response = self.transport.run(self.transport.post_json('changelog/bulkfetch', {'issueIdsOrKeys': ['TEST-1']}))
+
+        self.assertEqual(response, {'payload': {'issueIdsOrKeys': ['TEST-1']}})
+
+    def test_gather_requests_concurrently(self):
+        coroutines = [self.transport.get_json('issue/TEST-1/changelog', params={'startAt': start_at}) for start_at in range(5)]
+
+        responses = self.transport.run(self.transport.gather(coroutines))
+
+        self.assertEqual([response['query']['startAt'] for response in responses], [[str(start_at)] for start_at in range(5)])
+
+    def test_error_status_raises_jira_error(self):
+        with self.assertRaises(JIRAError) as cm:
+            self.transport.run(self.transport.get_json('issue/UNKNOWN-1/changelog'))
+
+        self.assertEqual(cm.exception.status_code, 404)
+
+    def test_run_times_out(self):
+        with self.assertRaises(TimeoutError):
+            self.transport.run(asyncio.sleep(60), timeout=0.1)
+
+    def test_close_cancels_the_pending_coroutines(self):
+        transport = AsyncJiraTransport(f'http://127.0.0.1:{self.server.server_port}', 'user', 'token', 2)
+        errors = []
+
+        def wait_forever():
+            try:
+                transport.run(asyncio.sleep(60))
+            except concurrent.futures.CancelledError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=wait_forever)
+        thread.start()
+        thread.join(timeout=0.1)
+
+        # Act
+        transport.close()
+
+        # Assert
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_query_params(self):
+        self.assertEqual(
+            _query_params({'jql': 'project = TEST', 'fields': ['key', 'status'], 'validate': True, 'nextPageToken': None}),
+            {'jql': 'project = TEST', 'fields': 'key,status', 'validate': 'true'},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
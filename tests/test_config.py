@@ -2,6 +2,7 @@ from unittest import mock
 import unittest
 import logging
 import configparser
+from pathlib import Path
 from unittest.mock import MagicMock, patch, mock_open
 from config import Config, ConfigFileInitializer
 from issue import Status
@@ -39,12 +40,21 @@ level = DEBUG
         self.assertEqual(config_obj.jira_config.server, "https://jira.example.com")
         self.assertEqual(config_obj.jira_config.username, "testuser")
         self.assertEqual(config_obj.jira_config.api_token, "testtoken")
-        self.assertEqual(config_obj.jira_config.project, "TEST_PROJECT")
+        self.assertEqual(config_obj.jira_config.projects, ["TEST_PROJECT"])
+        self.assertEqual(config_obj.jira_config.max_workers, 8)
         self.assertEqual(config_obj.jira_config.status_mapping, {}) # No mapping section
+        self.assertEqual(config_obj.jira_config.backend, "resources")
+        self.assertEqual(config_obj.jira_config.transport, "sync")
+        self.assertIsNone(config_obj.jira_config.rate_limit)
+        self.assertEqual(config_obj.jira_config.max_retries, 5)
+        self.assertFalse(config_obj.jira_config.activity_filter)
+        self.assertEqual(config_obj.jira_config.extraction_processes, 0)
+        self.assertIsNone(config_obj.cache_config.activity_store)
 
         # Test Report config
         self.assertEqual(config_obj.report_config.username, "reportuser")
         self.assertEqual(config_obj.report_config.introduction, "Test Report")
+        self.assertEqual(config_obj.report_config.team, [])
 
         # Test Logging config
         self.assertEqual(config_obj.logging_config.level, logging.DEBUG)
@@ -101,6 +111,128 @@ Backlog = INVALID_STATUS
             self._create_config_from_string(config_string)
         self.assertIn("Invalid status value 'INVALID_STATUS'", str(cm.exception))
 
+    def test_multiple_projects_loading(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = ALPHA, BETA
+max_workers = 3
+
+[Report]
+username = x
+"""
+        config_obj = self._create_config_from_string(config_string)
+        self.assertEqual(config_obj.jira_config.projects, ["ALPHA", "BETA"])
+        self.assertEqual(config_obj.jira_config.max_workers, 3)
+
+    def test_team_loading(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+
+[Report]
+username = x
+team = alice, bob ,, carol
+"""
+        config_obj = self._create_config_from_string(config_string)
+        self.assertEqual(config_obj.report_config.team, ["alice", "bob", "carol"])
+
+    def test_invalid_backend_value(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+backend = xml
+
+[Report]
+username = x
+"""
+        with self.assertRaises(ValueError) as cm:
+            self._create_config_from_string(config_string)
+        self.assertIn("Invalid backend 'xml'", str(cm.exception))
+
+    def test_invalid_transport_value(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+transport = http2
+
+[Report]
+username = x
+"""
+        with self.assertRaises(ValueError) as cm:
+            self._create_config_from_string(config_string)
+        self.assertIn("Invalid transport 'http2'", str(cm.exception))
+
+    def test_request_pacing_loading(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+rate_limit = 12.5
+max_retries = 2
+hedge_searches = true
+activity_filter = yes
+extraction_processes = 4
+
+[Report]
+username = x
+"""
+        config_obj = self._create_config_from_string(config_string)
+        self.assertEqual(config_obj.jira_config.rate_limit, 12.5)
+        self.assertEqual(config_obj.jira_config.max_retries, 2)
+        self.assertTrue(config_obj.jira_config.hedge_searches)
+        self.assertTrue(config_obj.jira_config.activity_filter)
+        self.assertEqual(config_obj.jira_config.extraction_processes, 4)
+
+    def test_invalid_request_pacing(self):
+        for option, message in (('max_workers = 0', "Invalid max_workers '0'"), ('rate_limit = -1', "Invalid rate_limit '-1'"),
+                                ('max_retries = -1', "Invalid max_retries '-1'")):
+            with self.subTest(option=option):
+                config_string = f"""
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+{option}
+
+[Report]
+username = x
+"""
+                with self.assertRaises(ValueError) as cm:
+                    self._create_config_from_string(config_string)
+                self.assertIn(message, str(cm.exception))
+
+    def test_activity_store_loading(self):
+        config_string = """
+[Jira]
+server = a
+username = b
+api_token = c
+project_key = e
+
+[Report]
+username = x
+
+[Cache]
+activity_store = ~/activity.sqlite
+"""
+        config_obj = self._create_config_from_string(config_string)
+        self.assertEqual(config_obj.cache_config.activity_store, Path('~/activity.sqlite').expanduser())
+
 
 class TestConfigFileInitializer(unittest.TestCase):
     def test_initialize_status_mapping(self):
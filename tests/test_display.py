@@ -0,0 +1,21 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+SOURCE_DIRECTORY = Path(__file__).resolve().parent.parent / 'src'
+
+
+class TestDisplay(unittest.TestCase):
+    def test_startup_does_not_import_jira(self):
+        # The jira library is heavy to import, it must only be loaded by the first request
+        result = subprocess.run(
+            [sys.executable, '-c', "import sys, display; print('jira' in sys.modules)"],
+            cwd=SOURCE_DIRECTORY, capture_output=True, text=True, check=True,
+        )
+
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import importlib.util
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from benchmarks.fake_jira import FakeJira, FakeJiraServer
+from benchmarks.payloads import REPORT_USER, STATUS_MAPPING, Workload, generate_raw_issues
+from config import JiraConfig
+from issue import parse_jira_date, start_of_day
+from jira_client import JiraClient
+
+
+class TestEndToEnd(unittest.TestCase):
+    """
+    Runs the client against the local fake Jira server, through the real jira library and HTTP stack.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.raw_issues = generate_raw_issues(Workload(issues=200, histories=30, comments=3, today_fraction=0.5), datetime.now().astimezone())
+
+    def setUp(self):
+        self.server = FakeJiraServer(FakeJira(self.raw_issues)).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _fetch_issues(self, **options):
+        config = JiraConfig(server=self.server.url, username='user', api_token='token', projects=['BENCH'],
+                            status_mapping=STATUS_MAPPING, **options)
+        client = JiraClient(config)
+        try:
+            return client.fetch_issues(REPORT_USER['name'])
+        finally:
+            client.close()
+
+    def test_fetch_issues_follows_the_server_pagination(self):
+        # Act
+        issues = self._fetch_issues(backend='json')
+
+        # Assert
+        window_start = start_of_day()
+        expected_keys = {
+            raw_issue['key'] for raw_issue in self.raw_issues
+            if parse_jira_date(raw_issue['fields']['updated']) >= window_start
+            or (raw_issue['fields']['assignee']['key'] == REPORT_USER['key'] and raw_issue['fields']['status']['statusCategory']['key'] != 'done')
+        }
+        self.assertEqual({issue.issue_key for issue in issues}, expected_keys)
+        statistics = self.server.statistics()
+        # The server caps the search pages to 50 issues, below the page size requested by the client
+        self.assertGreater(statistics['requests_by_endpoint']['search'], 2)
+        self.assertEqual(statistics['throttled'], 0)
+
+    def test_backends_and_transports_report_the_same_actions(self):
+        reference = {issue.issue_key: issue.daily_actions for issue in self._fetch_issues(backend='json')}
+        self.assertTrue(any(reference.values()))
+
+        for options in ({'backend': 'resources'}, {'backend': 'json', 'transport': 'async'}):
+            with self.subTest(**options):
+                if options.get('transport') == 'async' and importlib.util.find_spec('aiohttp') is None:
+                    self.skipTest("aiohttp is not installed")
+                self.assertEqual({issue.issue_key: issue.daily_actions for issue in self._fetch_issues(**options)}, reference)
+
+    def _fetch_issues_until(self, deadline: float, **options) -> JiraClient:
+        config = JiraConfig(server=self.server.url, username='user', api_token='token', projects=['BENCH'],
+                            status_mapping=STATUS_MAPPING, backend='json', **options)
+        if options.get('transport') == 'async' and importlib.util.find_spec('aiohttp') is None:
+            self.skipTest("aiohttp is not installed")
+        client = JiraClient(config, deadline=deadline)
+        try:
+            client.fetch_issues(REPORT_USER['name'])
+        finally:
+            client.close()
+        return client
+
+    def test_async_transport_shuts_down_past_the_deadline(self):
+        self.server.latency = 0.1
+
+        client = self._fetch_issues_until(1.0, transport='async')
+
+        self.assertTrue(client.missing)
+        # No thread of the client is left waiting for a request cut short by the deadline
+        for thread in threading.enumerate():
+            if thread.name.startswith('jira'):
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive(), thread.name)
+
+    def test_requests_slower_than_the_deadline_leave_a_partial_report(self):
+        self.server.latency = 2.0
+
+        for transport in ('sync', 'async'):
+            with self.subTest(transport=transport):
+                started = time.monotonic()
+
+                client = self._fetch_issues_until(0.5, transport=transport)
+
+                # Each request only waits for what was left of the deadline when it was sent
+                self.assertLess(time.monotonic() - started, 2.0)
+                self.assertIn(f"the resolution of the report user '{REPORT_USER['name']}', matched by name instead", client.missing)
+
+if __name__ == '__main__':
+    unittest.main()
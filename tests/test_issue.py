@@ -1,10 +1,21 @@
+import pickle
 import unittest
+from collections import Counter
+from datetime import date, datetime, timedelta
 from unittest.mock import Mock
 from issue import (
     Action,
     Status,
+    StatusClassifier,
+    Author,
+    Event,
+    EventTable,
     Issue,
+    ReportUser,
+    ReportWindow,
+    local_midnight,
     map_status,
+    map_raw_status,
     map_action_from_status,
 )
 
@@ -61,6 +72,13 @@ class TestMapStatus(unittest.TestCase):
         status = map_status(jira_status, {}) # Empty mapping
         self.assertEqual(status, Status.DONE)
 
+    def test_map_raw_status(self):
+        # Raw JSON statuses follow the same rules as the Resource ones
+        raw_status = {"id": "1005", "name": "In Test", "statusCategory": {"key": "indeterminate"}}
+        self.assertEqual(map_raw_status(raw_status, self.custom_mapping), Status.IN_TEST)
+        raw_status = {"id": "10000", "name": "Done", "statusCategory": {"key": "done"}}
+        self.assertEqual(map_raw_status(raw_status, {}), Status.DONE)
+
     def test_unmappable_status_raises_error(self):
         # This status has an unknown category and is not in the mapping
         jira_status = MockJiraStatus("99", "Unknown", "unknown_category")
@@ -92,6 +110,156 @@ class TestIssue(unittest.TestCase):
         story_issue = Issue("KEY-1", "Story", "Summary", Status.TO_DO, "User", [])
         self.assertFalse(story_issue.is_bug())
 
+    def test_extract_events_since_window_start(self):
+        since = datetime.fromisoformat('2024-05-02T00:00:00.000+0000')
+        author = {'displayName': 'User'}
+        raw_issue = {
+            'changelog': {'histories': [
+                {'created': '2024-04-30T09:00:00.000+0000', 'author': author, 'items': [{'field': 'status', 'to': '1', 'toString': 'Done'}]},
+                {'created': '2024-05-02T09:00:00.000+0000', 'author': author, 'items': [{'field': 'status', 'to': '3', 'toString': 'In Progress'}]},
+                {'created': '2024-05-02T11:00:00.000+0000', 'author': author, 'items': [{'field': 'description'}]},
+            ]},
+            'fields': {'comment': {'comments': [
+                {'created': '2024-04-30T09:00:00.000+0000', 'updated': '2024-04-30T09:00:00.000+0000', 'author': author},
+                {'created': '2024-04-30T10:00:00.000+0000', 'updated': '2024-05-02T10:00:00.000+0000', 'author': author, 'updateAuthor': author},
+                {'created': '2024-05-02T14:00:00.000+0200', 'updated': '2024-05-02T14:00:00.000+0200', 'author': author},
+            ]}},
+        }
+        issue = Issue("KEY-1", "Bug", "Summary", Status.TO_DO, "User", [])
+        scan_counters = Counter()
+
+        issue.extract_events(raw_issue, StatusClassifier({}), since, scan_counters)
+
+        self.assertEqual(
+            [(event.created.isoformat(), event.action) for event in issue.events],
+            [
+                ('2024-05-02T09:00:00+00:00', Action.FIX),
+                ('2024-05-02T10:00:00+00:00', Action.DISCUSSION),
+                ('2024-05-02T11:00:00+00:00', Action.DESCRIPTION_UPDATE),
+                ('2024-05-02T14:00:00+02:00', Action.DISCUSSION),
+            ],
+        )
+        self.assertEqual(scan_counters, {
+            'events.histories_scanned': 3,
+            'events.histories_in_window': 2,
+            'events.comments_scanned': 3,
+            'events.comments_in_window': 2,
+        })
+
+    def test_extract_events_until_window_end(self):
+        since = datetime.fromisoformat('2024-05-02T00:00:00.000+0000')
+        until = datetime.fromisoformat('2024-05-03T00:00:00.000+0000')
+        author = {'displayName': 'User'}
+        raw_issue = {
+            'changelog': {'histories': [
+                {'created': '2024-05-02T09:00:00.000+0000', 'author': author, 'items': [{'field': 'status', 'to': '3', 'toString': 'In Progress'}]},
+                {'created': '2024-05-03T09:00:00.000+0000', 'author': author, 'items': [{'field': 'description'}]},
+            ]},
+            'fields': {'comment': {'comments': [
+                {'created': '2024-05-02T10:00:00.000+0000', 'updated': '2024-05-03T10:00:00.000+0000', 'author': author, 'updateAuthor': author},
+                {'created': '2024-05-03T11:00:00.000+0000', 'updated': '2024-05-03T11:00:00.000+0000', 'author': author},
+            ]}},
+        }
+        issue = Issue("KEY-1", "Bug", "Summary", Status.TO_DO, "User", [])
+
+        issue.extract_events(raw_issue, StatusClassifier({}), since, until=until)
+
+        self.assertEqual(
+            [(event.created.isoformat(), event.action) for event in issue.events],
+            [('2024-05-02T09:00:00+00:00', Action.FIX), ('2024-05-02T10:00:00+00:00', Action.DISCUSSION)],
+        )
+
+    def test_on_day_keeps_the_actions_of_the_day(self):
+        user = Author(display_name="User")
+        first_day = datetime(2024, 5, 2, 10).astimezone()
+        issue = Issue("KEY-1", "Bug", "Summary", Status.IN_PROGRESS, "User", [], status_category_key='indeterminate', events=[
+            Event(first_day, user, Action.FIX),
+            Event(first_day + timedelta(days=1), user, Action.DISCUSSION),
+            Event(first_day + timedelta(days=1, hours=1), Author(display_name="Someone else"), Action.REVIEW),
+        ]).for_user(ReportUser("User"))
+
+        self.assertEqual(issue.daily_actions, [Action.FIX, Action.DISCUSSION])
+        self.assertEqual(issue.on_day(date(2024, 5, 2), current=False).daily_actions, [Action.FIX])
+        self.assertFalse(issue.on_day(date(2024, 5, 2), current=False).is_in_progress)
+        self.assertEqual(issue.on_day(date(2024, 5, 3), current=True).daily_actions, [Action.DISCUSSION])
+        # The current state is only reported on the current day
+        self.assertEqual(issue.on_day(date(2024, 5, 4), current=False).daily_actions, [])
+        current_day = issue.on_day(date(2024, 5, 4), current=True)
+        self.assertEqual(current_day.daily_actions, [Action.FIX])
+        self.assertTrue(current_day.is_in_progress)
+
+    def test_event_table_keeps_the_events(self):
+        user = Author.from_raw({'displayName': 'User', 'key': 'JIRAUSER1'})
+        other = Author(display_name="Someone else")
+        events = [
+            Event(datetime.fromisoformat('2024-05-02T09:00:00.123456+0200'), user, Action.FIX, Status.IN_PROGRESS),
+            Event(datetime.fromisoformat('2024-05-02T10:00:00.000-0530'), other, Action.DISCUSSION),
+            Event(datetime.fromisoformat('2024-05-02T11:00:00.000+0000'), user, Action.DONE, Status.DONE),
+        ]
+
+        table = EventTable(events)
+
+        self.assertEqual(table, events)
+        self.assertEqual(table[-1], events[-1])
+        self.assertEqual(table[1].created.isoformat(), '2024-05-02T10:00:00-05:30')
+        self.assertEqual(table[1:], events[1:])
+        self.assertEqual(list(table.actions()), [Action.FIX, Action.DISCUSSION, Action.DONE])
+        self.assertEqual(table.by_authors(lambda author: author == user), [events[0], events[2]])
+        self.assertEqual(pickle.loads(pickle.dumps(table)), events)
+        # The authors are shared by all the events
+        self.assertIs(Author.from_raw({'displayName': 'User', 'key': 'JIRAUSER1'}), user)
+
+    def test_report_user_matches_authors(self):
+        resolved_user = ReportUser("jo", account_id="account-1")
+        self.assertTrue(resolved_user.is_author(Author(display_name="Someone else", account_id="account-1")))
+        self.assertFalse(resolved_user.is_author(Author(display_name="jo", account_id="account-2")))
+        # Authors without identity fall back to the name matching
+        self.assertTrue(resolved_user.is_author(Author(email_address="jo@example.com")))
+        self.assertFalse(resolved_user.is_author(Author(email_address="jo.doe@example.com")))
+
+
+class TestReportWindow(unittest.TestCase):
+    def test_window_between_past_days(self):
+        window = ReportWindow.between(date(2024, 5, 3), date(2024, 5, 6))
+
+        self.assertEqual(window.days(), [date(2024, 5, 3), date(2024, 5, 4), date(2024, 5, 5), date(2024, 5, 6)])
+        self.assertEqual(window.since, local_midnight(date(2024, 5, 3)))
+        self.assertFalse(window.current)
+        self.assertEqual(window.until, local_midnight(date(2024, 5, 7)))
+
+    def test_window_up_to_today_is_current(self):
+        today = date.today()
+        window = ReportWindow.between(today - timedelta(days=2), today + timedelta(days=1))
+
+        self.assertEqual(window.days()[-1], today)
+        self.assertTrue(window.current)
+        self.assertIsNone(window.until)
+
+    def test_window_ending_before_it_starts(self):
+        with self.assertRaises(ValueError):
+            ReportWindow.between(date(2024, 5, 6), date(2024, 5, 3))
+
+
+class TestStatusClassifier(unittest.TestCase):
+    def test_classify_mapped_status(self):
+        classifier = StatusClassifier({"1001": Status.TO_REVIEW, "in test": Status.IN_TEST})
+
+        self.assertEqual(classifier.classify("Story", "1001", "Code Review"), Action.TO_REVIEW)
+        self.assertEqual(classifier.classify("Story", "1005", "In Test"), Action.TEST)
+        self.assertEqual(classifier.unmapped, {})
+        self.assertEqual(classifier.unclassified, 0)
+
+    def test_classify_counts_unmapped_statuses(self):
+        classifier = StatusClassifier({})
+
+        self.assertEqual(classifier.classify("Bug", "3", "In Progress"), Action.FIX)
+        self.assertEqual(classifier.classify("Story", "3", "In Progress"), Action.IMPLEMENTATION)
+        self.assertEqual(classifier.classify("Story", "3", "In Progress"), Action.IMPLEMENTATION)
+        self.assertIsNone(classifier.classify("Story", None, "Unknown"))
+
+        self.assertEqual(classifier.unmapped, {("3", "In Progress"): 3})
+        self.assertEqual(classifier.unclassified, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
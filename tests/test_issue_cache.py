@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from issue import Action, Author, Event, Issue, ReportUser, Status
+from issue_cache import CacheState, IssueCache, MemoryIssueCache
+
+
+class TestIssueCache(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cache = IssueCache(Path(self.temporary_directory.name) / 'cache')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_load_missing_cache(self):
+        self.assertIsNone(self.cache.load('PROJ'))
+
+    def test_save_and_load_round_trip(self):
+        # Arrange
+        created = datetime(2024, 5, 2, 10, 30, tzinfo=UTC)
+        issue = Issue(
+            "PROJ-1", "Bug", "A bug", Status.IN_PROGRESS, "testuser", [],
+            status_category_key='indeterminate',
+            is_in_progress=True,
+            events=[Event(created, Author("testuser", "tuser", "testuser@example.com"), Action.FIX)],
+        )
+        state = CacheState(
+            window_start=datetime(2024, 5, 2, tzinfo=UTC),
+            report_username="testuser",
+            high_water_mark=datetime(2024, 5, 2, 10, 29, tzinfo=UTC),
+            issues={"PROJ-1": issue},
+        )
+
+        # Act
+        self.cache.save('PROJ', state)
+        loaded = self.cache.load('PROJ')
+
+        # Assert
+        self.assertEqual(loaded, state)
+        self.assertFalse(self.cache.path_for('PROJ').with_suffix('.tmp').exists())
+
+    def test_unreadable_cache_is_ignored(self):
+        self.cache.directory.mkdir(parents=True)
+        self.cache.path_for('PROJ').write_text('{not json', encoding='utf-8')
+
+        self.assertIsNone(self.cache.load('PROJ'))
+
+    def test_memory_cache_writes_through(self):
+        # Arrange
+        state = CacheState(
+            window_start=datetime(2024, 5, 2, tzinfo=UTC),
+            report_username="testuser",
+            high_water_mark=datetime(2024, 5, 2, 10, 29, tzinfo=UTC),
+            issues={},
+        )
+        memory_cache = MemoryIssueCache(self.cache.directory)
+        memory_only_cache = MemoryIssueCache()
+
+        # Act
+        for cache in (memory_cache, memory_only_cache):
+            cache.save('PROJ', state)
+            cache.save_deployment_type('https://jira.example.com', 'Server')
+            cache.save_activity_filter('https://jira.example.com', 'changed')
+
+        # Assert
+        # The very same state is kept in memory, without parsing it again
+        self.assertIs(memory_only_cache.load('PROJ'), state)
+        self.assertEqual(memory_only_cache.load_deployment_type('https://jira.example.com'), 'Server')
+        self.assertFalse(Path('PROJ.json').exists())
+        self.assertEqual(self.cache.load('PROJ'), state)
+        self.assertEqual(self.cache.load_deployment_type('https://jira.example.com'), 'Server')
+        self.assertEqual(self.cache.load_activity_filter('https://jira.example.com'), 'changed')
+
+    def test_concurrent_report_user_saves_are_all_kept(self):
+        # Arrange
+        report_users = [ReportUser(f"user{index}", account_id=f"JIRAUSER{index}") for index in range(12)]
+
+        # Act
+        # The users of a team are resolved, and saved, by the client threads
+        with ThreadPoolExecutor(max_workers=len(report_users)) as executor:
+            list(executor.map(lambda report_user: self.cache.save_report_user('https://jira.example.com', report_user), report_users))
+
+        # Assert
+        self.assertEqual([self.cache.load_report_user('https://jira.example.com', report_user.username) for report_user in report_users],
+                         report_users)
+        self.assertEqual([path.name for path in self.cache.directory.iterdir()], ['users.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,87 @@
+import math
+import tempfile
+import threading
 import unittest
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from jira_client import JiraClient
+from jira import JIRAError
+from jira.client import ResultList
+
+from issue import Action, Issue, ReportUser, ReportWindow, Status, start_of_day
+from issue_cache import CacheState, IssueCache
+from jira_client import JiraClient, _activity_clause, _build_issue
+from recording import ResponseRecorder, ResponseReplayer
+
+
+def _mock_config() -> MagicMock:
+    mock_config = MagicMock()
+    mock_config.server = 'http://test.jira.com'
+    mock_config.projects = ['TEST']
+    mock_config.max_workers = 4
+    mock_config.transport = 'sync'
+    mock_config.rate_limit = None
+    mock_config.max_retries = 2
+    mock_config.hedge_searches = False
+    mock_config.activity_filter = False
+    mock_config.extraction_processes = 0
+    return mock_config
+
+
+def _mock_server_issues(mock_jira_instance: MagicMock):
+    """
+    A Jira Server with an issue updated today and a stale one assigned to the report user.
+    """
+    mock_jira_instance.server_info.return_value = {'deploymentType': 'Server'}
+    now = datetime.now().astimezone().strftime("%Y-%m-%dT%H:%M:%S.000%z")
+    raw_issue = {
+        'id': '10001',
+        'key': 'TEST-1',
+        'fields': {
+            'updated': now,
+            'summary': 'A bug',
+            'issuetype': {'name': 'Bug'},
+            'status': {'id': '3', 'name': 'In Progress', 'statusCategory': {'key': 'indeterminate'}},
+            'assignee': {'displayName': 'Test User', 'key': 'JIRAUSER1'},
+        },
+    }
+    stale_issue = {
+        'id': '10002',
+        'key': 'TEST-2',
+        'fields': {
+            'updated': '2024-05-02T10:30:00.000+0000',
+            'summary': 'A story',
+            'issuetype': {'name': 'Story'},
+            'status': {'id': '3', 'name': 'In Progress', 'statusCategory': {'key': 'indeterminate'}},
+            'assignee': {'displayName': 'Test User', 'key': 'JIRAUSER1'},
+        },
+    }
+    changelog = {'startAt': 0, 'total': 1, 'isLast': True, 'values': [{
+        'created': now,
+        'author': {'displayName': 'Test User', 'key': 'JIRAUSER1'},
+        'items': [{'field': 'status', 'to': '3', 'toString': 'In Progress'}],
+    }]}
+    comment = {'created': now, 'updated': now, 'author': {'displayName': 'Test User', 'key': 'JIRAUSER1'}, 'body': 'A long pasted log'}
+    comments = {'startAt': 0, 'maxResults': 10, 'total': 1, 'comments': [comment]}
+
+    def get_json(path, params):
+        if path == 'user/search':
+            return [{'name': 'test_user', 'key': 'JIRAUSER1', 'displayName': 'Test User'}]
+        return comments if path.endswith('/comment') else changelog
+
+    mock_jira_instance._get_json.side_effect = get_json
+
+    def search_issues(jql, **kwargs):
+        if 'assignee' in jql:
+            return {'startAt': 0, 'total': 2, 'issues': [raw_issue, stale_issue]}
+        return {'startAt': 0, 'total': 1, 'issues': [raw_issue]}
+
+    mock_jira_instance.search_issues.side_effect = search_issues
 
 
 class TestJiraClient(unittest.TestCase):
-    @patch('jira_client.JIRA')
+    @patch('jira.JIRA')
     def test_fetch_project_statuses(self, mock_jira_class):
         # Arrange
         mock_jira_instance = MagicMock()
@@ -20,7 +96,7 @@ class TestJiraClient(unittest.TestCase):
             MagicMock(id='3', name='In Progress')
         ]
 
-        mock_config = MagicMock()
+        mock_config = _mock_config()
         mock_config.server = 'http://test.jira.com'
         mock_config.username = 'user'
         mock_config.api_token = 'token'
@@ -34,7 +110,7 @@ class TestJiraClient(unittest.TestCase):
         self.assertEqual(len(statuses), 2)
         mock_jira_instance.statuses.assert_called_once()
 
-    @patch('jira_client.JIRA')
+    @patch('jira.JIRA')
     def test_fetch_issues_optimized_fields(self, mock_jira_class):
         # Arrange
         mock_jira_instance = MagicMock()
@@ -43,7 +119,7 @@ class TestJiraClient(unittest.TestCase):
         # Mock empty response
         mock_jira_instance.search_issues.return_value = []
 
-        mock_config = MagicMock()
+        mock_config = _mock_config()
         mock_config.server = 'http://test.jira.com'
         mock_config.username = 'user'
         mock_config.api_token = 'token'
@@ -63,15 +139,652 @@ class TestJiraClient(unittest.TestCase):
 
         args_updated, kwargs_updated = mock_jira_instance.search_issues.call_args_list[0]
         self.assertIn('fields', kwargs_updated)
-        self.assertEqual(kwargs_updated['fields'], "key,summary,status,assignee,issuetype,comment")
-        self.assertIn('expand', kwargs_updated)
-        self.assertEqual(kwargs_updated['expand'], "changelog")
+        self.assertEqual(kwargs_updated['fields'], "key,summary,status,assignee,issuetype,updated")
+        # The changelogs and comments are fetched separately, only for the issues updated today
+        self.assertNotIn('expand', kwargs_updated)
 
         args_assigned, kwargs_assigned = mock_jira_instance.search_issues.call_args_list[1]
         self.assertIn('fields', kwargs_assigned)
-        self.assertEqual(kwargs_assigned['fields'], "key,summary,status,assignee,issuetype,comment")
-        self.assertIn('expand', kwargs_assigned)
-        self.assertEqual(kwargs_assigned['expand'], "changelog")
+        self.assertEqual(kwargs_assigned['fields'], "key,summary,status,assignee,issuetype,updated")
+        self.assertNotIn('expand', kwargs_assigned)
+
+    @patch('jira.JIRA')
+    def test_connects_lazily_and_caches_the_deployment_type(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Cloud'}
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = IssueCache(Path(directory))
+
+            # Act
+            client = JiraClient(_mock_config(), cache)
+            mock_jira_class.assert_not_called()
+            first_run_is_cloud = client.is_cloud
+            second_run_is_cloud = JiraClient(_mock_config(), cache).is_cloud
+
+        # Assert
+        self.assertTrue(first_run_is_cloud)
+        self.assertTrue(second_run_is_cloud)
+        # The server information is probed once, and never while connecting
+        mock_jira_class.assert_called_once()
+        self.assertFalse(mock_jira_class.call_args.kwargs['get_server_info'])
+        mock_jira_instance.server_info.assert_called_once()
+        self.assertEqual(mock_jira_instance.deploymentType, 'Cloud')
+
+    @patch('jira.JIRA')
+    def test_fetch_issues_with_cache_only_fetches_changes(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Server'}
+        mock_jira_instance.search_issues.return_value = []
+
+        mock_config = _mock_config()
+        mock_config.status_mapping = {}
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = IssueCache(Path(directory))
+            cached_issue = Issue("TEST-1", "Story", "Cached story", Status.IN_PROGRESS, "test_user", [],
+                                 status_category_key='indeterminate', is_in_progress=True)
+            cache.save('TEST', CacheState(
+                window_start=start_of_day(),
+                report_username="test_user",
+                high_water_mark=datetime.now().astimezone() - timedelta(minutes=10),
+                issues={"TEST-1": cached_issue},
+            ))
+
+            client = JiraClient(mock_config, cache)
+
+            # Act
+            issues = client.fetch_issues("test_user")
+            refreshed_state = cache.load('TEST')
+
+        # Assert
+        mock_jira_instance.search_issues.assert_called_once()
+        jql = mock_jira_instance.search_issues.call_args.args[0]
+        # Relative to the time of the server, rounded up to the minute
+        self.assertIn('updated >= "-11m"', jql)
+        self.assertEqual([issue.issue_key for issue in issues], ["TEST-1"])
+        self.assertEqual(issues[0].daily_actions, ["Implémentation"])
+        self.assertGreater(refreshed_state.high_water_mark, datetime.now().astimezone() - timedelta(minutes=2))
+
+    def test_changed_jql_does_not_depend_on_the_timezones(self):
+        now = datetime(2024, 5, 2, 10, 30, tzinfo=UTC)
+        high_water_mark = datetime.fromisoformat('2024-05-02T14:00:30+0400')
+
+        jql = JiraClient._changed_jql('TEST', high_water_mark, now)
+
+        self.assertEqual(jql, 'project = "TEST" AND updated >= "-30m" ORDER BY updated ASC')
+
+    def test_activity_clause_does_not_depend_on_the_timezones(self):
+        now = datetime(2024, 5, 3, 10, 30, tzinfo=UTC)
+        window = ReportWindow(datetime.fromisoformat('2024-05-01T00:00+02:00'), current=False)
+        until_minutes = math.floor((now - window.until) / timedelta(minutes=1))
+
+        clause = _activity_clause('changed', [ReportUser('jo')], window, now)
+
+        self.assertEqual(clause, f'status CHANGED BY "jo" DURING ("-3630m", "-{until_minutes}m") OR assignee = "jo" OR reporter = "jo"')
+
+    @patch('jira.JIRA')
+    def test_search_follows_offset_pages(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Server'}
+        # The server caps the page size below the requested one
+        mock_jira_instance.search_issues.side_effect = [
+            ResultList([MagicMock(raw={'key': 'TEST-1'}), MagicMock(raw={'key': 'TEST-2'})], _startAt=0, _total=3),
+            ResultList([MagicMock(raw={'key': 'TEST-3'})], _startAt=2, _total=3),
+        ]
+
+        client = JiraClient(_mock_config())
+
+        # Act
+        issues = [issue for page in client._search_pages('project = TEST') for issue in page]
+
+        # Assert
+        self.assertEqual([issue['key'] for issue in issues], ['TEST-1', 'TEST-2', 'TEST-3'])
+        start_ats = [call.kwargs['startAt'] for call in mock_jira_instance.search_issues.call_args_list]
+        self.assertEqual(start_ats, [0, 2])
+
+    @patch('jira.JIRA')
+    def test_search_follows_page_tokens_on_cloud(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Cloud'}
+        mock_jira_instance.enhanced_search_issues.side_effect = [
+            ResultList([MagicMock(raw={'key': 'TEST-1'})], _nextPageToken='token-2'),
+            ResultList([MagicMock(raw={'key': 'TEST-2'})], _nextPageToken=None),
+        ]
+
+        client = JiraClient(_mock_config())
+
+        # Act
+        issues = [issue for page in client._search_pages('project = TEST') for issue in page]
+
+        # Assert
+        self.assertEqual([issue['key'] for issue in issues], ['TEST-1', 'TEST-2'])
+        tokens = [call.kwargs['nextPageToken'] for call in mock_jira_instance.enhanced_search_issues.call_args_list]
+        self.assertEqual(tokens, [None, 'token-2'])
+        mock_jira_instance.search_issues.assert_not_called()
+
+    @patch('jira.JIRA')
+    def test_fetch_issues_in_two_phases_with_json_backend(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+
+        client = JiraClient(mock_config)
+
+        # Act
+        issues = client.fetch_issues("test_user")
+
+        # Assert
+        self.assertTrue(all(call.kwargs['json_result'] for call in mock_jira_instance.search_issues.call_args_list))
+        # The details are only fetched once, and only for the issue updated today
+        details_calls = [call for call in mock_jira_instance._get_json.call_args_list if call.args[0].startswith('issue/')]
+        self.assertCountEqual([(call.args[0], call.kwargs['params']) for call in details_calls], [
+            ('issue/TEST-1/comment', {'startAt': 0, 'maxResults': 10, 'orderBy': '-created'}),
+            ('issue/TEST-1/changelog', {'startAt': 0, 'maxResults': 100}),
+        ])
+        issues_by_key = {issue.issue_key: issue for issue in issues}
+        self.assertEqual(len(issues), 2)
+        self.assertEqual(issues_by_key['TEST-1'].status, Status.IN_PROGRESS)
+        self.assertEqual(issues_by_key['TEST-1'].daily_actions, ["Correction", "Échange sur le ticket"])
+        self.assertEqual(issues_by_key['TEST-2'].daily_actions, ["Implémentation"])
+
+    @patch('jira.JIRA')
+    def test_fetched_events_are_stored(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        store = MagicMock()
+        window = ReportWindow(start_of_day())
+
+        client = JiraClient(mock_config, store=store)
+
+        # Act
+        client.fetch_issues("test_user", window=window)
+
+        # Assert
+        stored_issues, stored_window = store.save.call_args.args
+        stored_issues = list(stored_issues)
+        self.assertEqual(stored_window, window)
+        self.assertEqual([issue.issue_key for issue in stored_issues], ['TEST-1', 'TEST-2'])
+        self.assertEqual([(event.action, event.status) for event in stored_issues[0].events],
+                         [(Action.FIX, Status.IN_PROGRESS), (Action.DISCUSSION, None)])
+
+    @patch('jira.JIRA')
+    def test_extraction_processes_build_the_same_issues(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        window = ReportWindow(start_of_day())
+
+        client = JiraClient(mock_config)
+        self.addCleanup(client.close)
+        serial_issues = client.fetch_issues("test_user", window=window)
+        mock_config.extraction_processes = 2
+
+        # Act
+        with patch('jira_client.EXTRACTION_CHUNK_SIZE', 1):
+            issues = client.fetch_issues("test_user", window=window)
+
+        # Assert
+        self.assertEqual(issues, serial_issues)
+        self.assertEqual(client.profiler.counters['extraction.chunks'], 2)
+
+    @patch('jira.JIRA')
+    def test_replay_recorded_responses(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_search = mock_jira_instance.search_issues.side_effect
+
+        def search_issues(jql, **kwargs):
+            # A server without ScriptRunner
+            if 'issueFunction' in jql:
+                raise JIRAError(status_code=400, text="Field 'issueFunction' does not exist")
+            return server_search(jql, **kwargs)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        mock_config.activity_filter = True
+        yesterday = date.today() - timedelta(days=1)
+
+        # The queries of a past window give their dates relative to the time of the recording
+        for window in (ReportWindow(start_of_day()), ReportWindow.between(yesterday - timedelta(days=1), yesterday)):
+            with self.subTest(current=window.current), tempfile.TemporaryDirectory() as directory:
+                recorder = ResponseRecorder(mock_config.server, window.since)
+                dump_path = Path(directory) / 'responses.jsonl.gz'
+                recorded_issues = JiraClient(mock_config, recorder=recorder).fetch_issues("test_user", window=window)
+                recorder.save(dump_path)
+                mock_jira_class.reset_mock()
+
+                # Act
+                replayer = ResponseReplayer.load(dump_path)
+                # The rejected activity filter probe was not recorded, the replayed one is told apart without the jira library
+                with patch('jira_client._jira_error', side_effect=AssertionError("The jira library is imported")):
+                    replayed_issues = JiraClient(mock_config, replayer=replayer).fetch_issues("test_user", window=window)
+
+                # Assert
+                mock_jira_class.assert_not_called()
+                self.assertEqual(replayed_issues, recorded_issues)
+
+    @patch('jira.JIRA')
+    def test_fetch_changelogs_in_bulk_on_cloud(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Cloud'}
+        mock_jira_instance._get_json.side_effect = [
+            {'issueChangeLogs': [{'issueId': '1', 'changeHistories': [
+                {'created': 1714645800000, 'author': {'displayName': 'test_user'}, 'items': [{'field': 'description'}]},
+            ]}], 'nextPageToken': 'token-2'},
+            {'issueChangeLogs': [{'issueId': '2', 'changeHistories': [
+                {'created': '2024-05-02T10:30:00.000+0000', 'author': {'displayName': 'test_user'}, 'items': [{'field': 'status'}]},
+            ]}, {'issueId': '1', 'changeHistories': [
+                {'created': '2024-05-02T18:00:00.000+0000', 'author': {'displayName': 'test_user'}, 'items': [{'field': 'status'}]},
+                {'created': '2024-05-01T09:00:00.000+0000', 'author': {'displayName': 'test_user'}, 'items': [{'field': 'status'}]},
+            ]}]},
+        ]
+        raw_issues = [{'id': '1', 'key': 'TEST-1'}, {'id': '2', 'key': 'TEST-2'}, {'id': '3', 'key': 'TEST-3'}]
+
+        client = JiraClient(_mock_config())
+
+        # Act
+        client._fetch_changelogs(raw_issues)
+
+        # Assert
+        first_call, second_call = mock_jira_instance._get_json.call_args_list
+        self.assertEqual(first_call.args, ('changelog/bulkfetch',))
+        self.assertEqual(first_call.kwargs['params']['fieldIds'], ['status', 'description'])
+        self.assertEqual(second_call.kwargs['params']['nextPageToken'], 'token-2')
+        # The histories are sorted oldest first, whatever the pages they came in
+        first_histories = raw_issues[0]['changelog']['histories']
+        self.assertEqual(first_histories[0]['created'], '2024-05-01T09:00:00.000+0000')
+        self.assertEqual(datetime.strptime(first_histories[1]['created'], "%Y-%m-%dT%H:%M:%S.%f%z").timestamp(), 1714645800)
+        self.assertEqual(first_histories[2]['created'], '2024-05-02T18:00:00.000+0000')
+        self.assertEqual(raw_issues[1]['changelog']['histories'][0]['created'], '2024-05-02T10:30:00.000+0000')
+        self.assertEqual(raw_issues[2]['changelog'], {'histories': []})
+
+    @patch('jira.JIRA')
+    def test_fetch_comments_stops_before_the_window(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        author = {'displayName': 'Test User', 'key': 'JIRAUSER1'}
+        mock_jira_instance._get_json.return_value = {'startAt': 0, 'maxResults': 2, 'total': 5, 'comments': [
+            {'created': '2024-05-02T10:30:00.000+0000', 'author': author, 'body': 'A long pasted log'},
+            {'created': '2024-05-01T18:00:00.000+0000', 'author': author, 'body': 'Another one'},
+        ]}
+        raw_issue = {'key': 'TEST-1', 'fields': {}}
+
+        client = JiraClient(_mock_config())
+
+        # Act
+        client._fetch_comments([raw_issue], datetime(2024, 5, 2, tzinfo=UTC))
+
+        # Assert
+        # The second comment is older than the window, the older pages are not fetched
+        mock_jira_instance._get_json.assert_called_once_with('issue/TEST-1/comment', params={'startAt': 0, 'maxResults': 10, 'orderBy': '-created'})
+        self.assertEqual(raw_issue['fields']['comment'], {'comments': [
+            {'created': '2024-05-02T10:30:00.000+0000', 'author': author},
+            {'created': '2024-05-01T18:00:00.000+0000', 'author': author},
+        ]})
+
+    @patch('jira.JIRA')
+    def test_resolve_report_user_is_cached(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Cloud'}
+        mock_jira_instance._get_json.return_value = [
+            {'accountId': 'account-2', 'displayName': 'Jo Doe', 'emailAddress': 'jo.doe@example.com'},
+            {'accountId': 'account-1', 'displayName': 'Jo', 'emailAddress': 'jo@example.com'},
+        ]
+
+        mock_config = _mock_config()
+        mock_config.server = 'http://test.jira.com'
+
+        with tempfile.TemporaryDirectory() as directory:
+            client = JiraClient(mock_config, IssueCache(Path(directory)))
+
+            # Act
+            first_user = client.resolve_report_user('jo')
+            second_user = client.resolve_report_user('jo')
+
+        # Assert
+        mock_jira_instance._get_json.assert_called_once_with('user/search', params={'query': 'jo'})
+        self.assertEqual(first_user, second_user)
+        self.assertEqual(first_user.account_id, 'account-1')
+        self.assertEqual(first_user.jql_reference, 'account-1')
+
+    @patch('jira.JIRA')
+    def test_resolve_report_user_ignores_the_partial_matches(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Cloud'}
+        mock_jira_instance._get_json.return_value = [{'accountId': 'account-2', 'displayName': 'Jo Doe'}]
+
+        with tempfile.TemporaryDirectory() as directory:
+            client = JiraClient(_mock_config(), IssueCache(Path(directory)))
+
+            # Act
+            first_user = client.resolve_report_user('jo')
+            second_user = client.resolve_report_user('jo')
+
+        # Assert
+        self.assertEqual(first_user, ReportUser('jo'))
+        self.assertEqual(second_user, ReportUser('jo'))
+        # The unresolved user is not cached, the next run searches again
+        self.assertEqual(mock_jira_instance._get_json.call_count, 2)
+
+    @patch('jira.JIRA')
+    def test_fetch_team_issues_shares_the_updated_issues(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Server'}
+        mock_jira_instance._get_json.side_effect = lambda path, params: [{'name': params['username'], 'key': params['username'].upper()}]
+
+        def raw_issue(key, assignee):
+            return {'key': key, 'fields': {
+                'updated': '2024-05-02T10:30:00.000+0000',
+                'summary': key,
+                'issuetype': {'name': 'Story'},
+                'status': {'id': '3', 'name': 'In Progress', 'statusCategory': {'key': 'indeterminate'}},
+                'assignee': {'displayName': assignee.title(), 'name': assignee, 'key': assignee.upper()},
+            }}
+
+        def search_issues(jql, **kwargs):
+            if 'assignee = "alice"' in jql:
+                return ResultList([MagicMock(raw=raw_issue('TEST-1', 'alice'))], _total=1)
+            if 'assignee = "bob"' in jql:
+                return ResultList([MagicMock(raw=raw_issue('TEST-2', 'bob'))], _total=1)
+            return ResultList([], _total=0)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+
+        mock_config = _mock_config()
+        mock_config.status_mapping = {}
+
+        client = JiraClient(mock_config)
+
+        # Act
+        issues_by_user = client.fetch_team_issues(['alice', 'bob'])
+
+        # Assert
+        updated_calls = [call for call in mock_jira_instance.search_issues.call_args_list if 'startOfDay()' in call.args[0]]
+        self.assertEqual(len(updated_calls), 1)
+        self.assertEqual(mock_jira_instance.search_issues.call_count, 3)
+        reported = {username: [issue.issue_key for issue in issues if issue.daily_actions] for username, issues in issues_by_user.items()}
+        self.assertEqual(reported, {'alice': ['TEST-1'], 'bob': ['TEST-2']})
+
+    @patch('jira.JIRA')
+    def test_fetch_issues_across_projects(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        mock_jira_instance.server_info.return_value = {'deploymentType': 'Server'}
+        mock_jira_instance._get_json.return_value = []
+
+        def search_issues(jql, **kwargs):
+            project = jql.split('"')[1]
+            return ResultList([MagicMock(raw={'key': f'{project}-1', 'fields': {
+                'updated': '2024-05-02T10:30:00.000+0000',
+                'summary': project,
+                'issuetype': {'name': 'Story'},
+                'status': {'id': '1', 'name': 'To Do', 'statusCategory': {'key': 'new'}},
+                'assignee': None,
+            }})], _total=1)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+
+        mock_config = _mock_config()
+        mock_config.projects = ['ALPHA', 'BETA']
+        mock_config.status_mapping = {}
+
+        client = JiraClient(mock_config)
+
+        # Act
+        issues = client.fetch_issues("test_user")
+
+        # Assert
+        self.assertEqual(mock_jira_instance.search_issues.call_count, 4)
+        self.assertEqual([issue.issue_key for issue in issues], ['ALPHA-1', 'BETA-1'])
+
+    @patch('jira.JIRA')
+    def test_fetch_issues_over_past_days(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        yesterday = date.today() - timedelta(days=1)
+        window = ReportWindow.between(yesterday - timedelta(days=1), yesterday)
+
+        client = JiraClient(mock_config)
+
+        # Act
+        started = datetime.now().astimezone()
+        issues = client.fetch_issues("test_user", window=window)
+        ended = datetime.now().astimezone()
+
+        # Assert
+        # A single query for the whole window, and none for the current state of the assigned issues,
+        # starting at local midnight relative to the server's current time, whatever the timezone of the user's profile
+        scans = [call.args[0] for call in mock_jira_instance.search_issues.call_args_list]
+        self.assertIn(scans, [
+            [f'project = "TEST" AND updated >= "-{math.ceil((now - window.since) / timedelta(minutes=1))}m" ORDER BY updated ASC']
+            for now in (started, ended)
+        ])
+        # The changes made today are out of the window
+        self.assertEqual([(issue.issue_key, issue.daily_actions) for issue in issues], [('TEST-1', [])])
+
+    @patch('jira.JIRA')
+    def test_issues_are_built_while_the_scans_go_on(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_search = mock_jira_instance.search_issues.side_effect
+        built = threading.Event()
+        built_while_scanning = []
+
+        def search_issues(jql, **kwargs):
+            # The open sprints query only returns once the issues updated today are built
+            if 'openSprints' in jql:
+                built_while_scanning.append(built.wait(5))
+            return server_search(jql, **kwargs)
+
+        def build_issue(*args):
+            built.set()
+            return _build_issue(*args)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        client = JiraClient(mock_config)
+
+        # Act
+        with patch('jira_client._build_issue', side_effect=build_issue):
+            issues = client.fetch_issues("test_user")
+
+        # Assert
+        self.assertEqual(built_while_scanning, [True])
+        self.assertEqual([issue.issue_key for issue in issues], ['TEST-1', 'TEST-2'])
+
+    @patch('jira.JIRA')
+    def test_deadline_reports_the_issues_fetched_in_time(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_search = mock_jira_instance.search_issues.side_effect
+        released = threading.Event()
+
+        def search_issues(jql, **kwargs):
+            # The open sprints query hangs past the deadline
+            if 'openSprints' in jql:
+                released.wait(5)
+            return server_search(jql, **kwargs)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        client = JiraClient(mock_config, deadline=0.5)
+
+        # Act
+        try:
+            issues = client.fetch_issues("test_user")
+        finally:
+            released.set()
+            client.close()
+
+        # Assert
+        self.assertEqual([issue.issue_key for issue in issues], ['TEST-1'])
+        self.assertEqual(issues[0].daily_actions, ["Correction", "Échange sur le ticket"])
+        self.assertEqual(len(client.missing), 1)
+        self.assertIn('openSprints', client.missing[0])
+
+    @patch('jira.JIRA')
+    def test_deadline_leaves_out_the_missing_details(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_get_json = mock_jira_instance._get_json.side_effect
+        released = threading.Event()
+
+        def get_json(path, params):
+            if path.endswith('/changelog'):
+                released.wait(5)
+            return server_get_json(path, params)
+
+        mock_jira_instance._get_json.side_effect = get_json
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        client = JiraClient(mock_config, deadline=0.5)
+
+        # Act
+        try:
+            issues = client.fetch_issues("test_user")
+        finally:
+            released.set()
+            client.close()
+
+        # Assert
+        issues_by_key = {issue.issue_key: issue for issue in issues}
+        # Without its comments, the current work on the issue is all that is reported
+        self.assertEqual(issues_by_key['TEST-1'].daily_actions, ["Correction"])
+        self.assertEqual(issues_by_key['TEST-2'].daily_actions, ["Implémentation"])
+        self.assertEqual(client.missing, ["the changes and comments of 1 issues (TEST-1)"])
+
+    @patch('jira_client.HEDGE_DEFAULT_DELAY', 0.05)
+    @patch('jira.JIRA')
+    def test_hedged_search_uses_the_first_response(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_search = mock_jira_instance.search_issues.side_effect
+        released = threading.Event()
+        attempts = []
+
+        def search_issues(jql, **kwargs):
+            # The first attempt of the updated issues search is stuck, its duplicate is not
+            if 'updated' in jql:
+                attempts.append(jql)
+                if len(attempts) == 1:
+                    released.wait(5)
+            return server_search(jql, **kwargs)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        mock_config.hedge_searches = True
+        client = JiraClient(mock_config)
+
+        # Act
+        try:
+            issues = client.fetch_issues("test_user")
+        finally:
+            released.set()
+            client.close()
+
+        # Assert
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(len(issues), 2)
+        self.assertEqual(client.profiler.counters['search.hedged'], 1)
+        self.assertEqual(client.profiler.counters['search.hedge_wins'], 1)
+        self.assertEqual(client.missing, [])
+
+    @patch('jira.JIRA')
+    def test_activity_filter_falls_back_to_the_supported_jql(self, mock_jira_class):
+        # Arrange
+        mock_jira_instance = MagicMock()
+        mock_jira_class.return_value = mock_jira_instance
+        _mock_server_issues(mock_jira_instance)
+        server_search = mock_jira_instance.search_issues.side_effect
+
+        def search_issues(jql, **kwargs):
+            # A server without ScriptRunner
+            if 'issueFunction' in jql:
+                raise JIRAError(status_code=400, text="Field 'issueFunction' does not exist")
+            return server_search(jql, **kwargs)
+
+        mock_jira_instance.search_issues.side_effect = search_issues
+        mock_config = _mock_config()
+        mock_config.backend = 'json'
+        mock_config.status_mapping = {}
+        mock_config.activity_filter = True
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = IssueCache(Path(cache_dir))
+            client = JiraClient(mock_config, cache=cache)
+
+            # Act
+            issues = client.fetch_issues("test_user", refresh=True)
+            client.fetch_issues("test_user", refresh=True)
+
+            # Assert
+            self.assertEqual(cache.load_activity_filter(mock_config.server), 'changed')
+
+        searches = [call.args[0] for call in mock_jira_instance.search_issues.call_args_list]
+        # The supported filter is only probed once
+        self.assertEqual(sum('issueFunction' in jql for jql in searches), 1)
+        scans = [jql for jql in searches if 'openSprints' not in jql and 'issueFunction' not in jql]
+        self.assertTrue(scans)
+        for jql in scans:
+            self.assertRegex(jql, r'AND \(status CHANGED BY "test_user" DURING \("-\d+m", now\(\)\) OR assignee = "test_user" OR reporter = "test_user"\)')
+        self.assertEqual(len(issues), 2)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,70 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+
+    def test_spans_and_counters_from_several_threads(self):
+        def request():
+            with self.profiler.span('search', 'request', page=1):
+                self.profiler.update({'http.requests': 1, 'http.bytes_received': 100})
+
+        with self.profiler.span('scan') as args:
+            threads = [threading.Thread(target=request) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            args['issues'] = 12
+
+        self.assertEqual([(span.category, span.name) for span in self.profiler.spans].count(('request', 'search')), 4)
+        self.assertEqual(self.profiler.spans[-1].args, {'issues': 12})
+        self.assertEqual(self.profiler.counters, {'http.requests': 4, 'http.bytes_received': 400})
+
+    def test_summary(self):
+        for _ in range(3):
+            with self.profiler.span('search', 'request'):
+                pass
+        self.profiler.count('search.pages', 3)
+
+        summary = self.profiler.summary()
+
+        self.assertIn('wall time', summary)
+        self.assertRegex(summary, r'request:search\s+3 ')
+        self.assertRegex(summary, r'search.pages\s+3')
+
+    def test_reset(self):
+        with self.profiler.span('fetch'):
+            self.profiler.count('issues.reported', 2)
+
+        self.profiler.reset()
+
+        self.assertEqual(self.profiler.spans, [])
+        self.assertEqual(self.profiler.counters, {})
+
+    def test_save_trace_events(self):
+        with self.profiler.span('fetch'):
+            self.profiler.count('issues.reported', 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'trace.json'
+            self.profiler.save(path, 'trace')
+            with open(path, encoding='utf-8') as trace_file:
+                trace = json.load(trace_file)
+
+        complete_events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        counter_events = [event for event in trace['traceEvents'] if event['ph'] == 'C']
+        self.assertEqual([(event['name'], event['cat']) for event in complete_events], [('fetch', 'phase')])
+        self.assertGreaterEqual(complete_events[0]['dur'], 0)
+        self.assertEqual([(event['name'], event['args']) for event in counter_events], [('issues.reported', {'value': 2})])
+
+
+if __name__ == '__main__':
+    unittest.main()
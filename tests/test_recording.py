@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from datetime import UTC, datetime
+from pathlib import Path
+
+from recording import ReplayError, ResponseRecorder, ResponseReplayer
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.window_start = datetime(2024, 5, 2, tzinfo=UTC)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_record_and_replay_round_trip(self):
+        for file_name in ('responses.jsonl', 'responses.jsonl.gz'):
+            with self.subTest(file_name=file_name):
+                # Arrange
+                path = Path(self.temporary_directory.name) / file_name
+                response = {'issues': [{'key': 'TEST-1', 'fields': {}}]}
+                recorder = ResponseRecorder('http://test.jira.com', self.window_start)
+                recorder.record('search', {'jql': 'project = TEST', 'cursor': None}, response)
+                # The client completes the raw issues in place, after they have been recorded
+                response['issues'][0]['changelog'] = {'histories': []}
+
+                # Act
+                recorder.save(path)
+                replayer = ResponseReplayer.load(path)
+
+                # Assert
+                self.assertEqual(replayer.server, 'http://test.jira.com')
+                self.assertEqual(replayer.window_start, self.window_start)
+                self.assertEqual(replayer.recorded_at, recorder.recorded_at)
+                self.assertEqual(replayer.response('search', {'cursor': None, 'jql': 'project = TEST'}),
+                                 {'issues': [{'key': 'TEST-1', 'fields': {}}]})
+
+    def test_replay_unknown_request(self):
+        replayer = ResponseReplayer('http://test.jira.com', self.window_start, {})
+
+        with self.assertRaises(ReplayError) as cm:
+            replayer.response('serverInfo', None)
+        self.assertIn("No recorded response for serverInfo", str(cm.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
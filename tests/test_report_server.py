@@ -0,0 +1,167 @@
+import http.client
+import socket
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from report_server import ReportServer
+
+
+class TestReportServer(unittest.TestCase):
+    def setUp(self):
+        self.renders = 0
+        self.rendered = threading.Event()
+
+    def _render(self) -> str:
+        self.renders += 1
+        self.rendered.set()
+        return f"Report {self.renders}\n"
+
+    def _serve(self, report_server: ReportServer):
+        thread = threading.Thread(target=report_server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(report_server.stop)
+
+    def test_serves_and_refreshes_the_report_over_loopback_http(self):
+        # Arrange
+        report_server = ReportServer(self._render, interval=3600)
+        report_server.bind('0')
+        self._serve(report_server)
+        self.assertTrue(self.rendered.wait(5))
+
+        # Act
+        with urllib.request.urlopen(report_server.address, timeout=5) as response:
+            report = response.read().decode('utf-8')
+        refresh = urllib.request.Request(report_server.address + 'refresh', headers={'X-Requested-By': 'test'}, method='POST')
+        with urllib.request.urlopen(refresh, timeout=5) as response:
+            refreshed_report = response.read().decode('utf-8')
+
+        # Assert
+        self.assertEqual(report, "Report 1\n")
+        self.assertEqual(refreshed_report, "Report 2\n")
+
+    def test_rejects_the_requests_of_other_sites(self):
+        # Arrange
+        report_server = ReportServer(self._render, interval=3600)
+        report_server.bind('0')
+        self._serve(report_server)
+        self.assertTrue(self.rendered.wait(5))
+        port = report_server.http_server.server_address[1]
+
+        def request(method: str, path: str, headers: dict[str, str]) -> int:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            try:
+                connection.request(method, path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            finally:
+                connection.close()
+
+        # Act
+        statuses = {
+            'rebound host name': request('GET', '/', {'Host': f'attacker.example:{port}'}),
+            'refresh without the custom header': request('POST', '/refresh', {'Content-Type': 'application/x-www-form-urlencoded'}),
+            'localhost': request('GET', '/', {'Host': f'localhost:{port}'}),
+        }
+
+        # Assert
+        self.assertEqual(statuses, {'rebound host name': 403, 'refresh without the custom header': 403, 'localhost': 200})
+        self.assertEqual(self.renders, 1)
+
+    def test_failed_refresh_keeps_the_previous_report(self):
+        # Arrange
+        report_server = ReportServer(self._render, interval=3600)
+        report_server.refresh()
+        report_server.render = MagicMock(side_effect=ConnectionError("Jira is down"))
+
+        # Act
+        refreshed = report_server.refresh()
+
+        # Assert
+        self.assertFalse(refreshed)
+        self.assertEqual(report_server.snapshot[0], "Report 1\n")
+        self.assertEqual(report_server.error, "Jira is down")
+
+    def test_first_report_not_ready(self):
+        # Arrange
+        started = threading.Event()
+        released = threading.Event()
+
+        def render() -> str:
+            started.set()
+            released.wait(5)
+            return "Report\n"
+
+        report_server = ReportServer(render, interval=3600)
+        report_server.bind('0')
+        self._serve(report_server)
+        self.addCleanup(released.set)
+        self.assertTrue(started.wait(5))
+
+        # Act
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            urllib.request.urlopen(report_server.address, timeout=5)
+
+        # Assert
+        self.assertEqual(cm.exception.code, 503)
+        self.assertEqual(cm.exception.headers['Retry-After'], '5')
+        cm.exception.close()
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets are not available")
+    def test_serves_the_report_over_a_unix_socket(self):
+        # Arrange
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'report.sock'
+        report_server = ReportServer(self._render, interval=3600)
+        report_server.bind(str(path))
+        self._serve(report_server)
+        self.assertTrue(self.rendered.wait(5))
+
+        # Act
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(5)
+            client.connect(str(path))
+            client.sendall(b"GET / HTTP/1.0\r\n\r\n")
+            response = b''.join(iter(lambda: client.recv(4096), b''))
+
+        # Assert
+        self.assertTrue(response.startswith(b"HTTP/1.0 200"))
+        self.assertTrue(response.endswith(b"\r\n\r\nReport 1\n"))
+        self.assertEqual(path.stat().st_mode & 0o777, 0o600)
+
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets are not available")
+    def test_unix_socket_of_a_running_server_is_not_taken_over(self):
+        # Arrange
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'report.sock'
+        report_server = ReportServer(self._render, interval=3600)
+        report_server.bind(str(path))
+        self._serve(report_server)
+        self.assertTrue(self.rendered.wait(5))
+        # Left behind by a server that did not stop cleanly
+        stale_path = Path(directory.name) / 'stale.sock'
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+            stale_socket.bind(str(stale_path))
+
+        # Act
+        with self.assertRaises(OSError):
+            ReportServer(self._render, interval=3600).bind(str(path))
+        stale_server = ReportServer(self._render, interval=3600)
+        stale_server.bind(str(stale_path))
+        stale_server.http_server.server_close()
+
+        # Assert
+        self.assertEqual(stale_server.address, str(stale_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
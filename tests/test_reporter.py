@@ -3,7 +3,8 @@ import unittest
 from unittest.mock import patch
 from io import StringIO
 from reporter import Reporter, ReportConfig
-from issue import Issue, Status, Action
+from datetime import date, datetime
+from issue import Author, Event, Issue, ReportWindow, Status, Action, local_midnight
 
 
 class TestReporter(unittest.TestCase):
@@ -41,6 +42,63 @@ class TestReporter(unittest.TestCase):
         # Check that the invalid issue is not in the report
         self.assertNotIn("- PROJ-6", "".join(output))
 
+    def test_generate_team_report(self):
+        issues_by_user = {
+            "alice": [Issue("PROJ-1", "Story", "First story", Status.IN_PROGRESS, "alice", [str(Action.IMPLEMENTATION)])],
+            "bob": [Issue("PROJ-1", "Story", "First story", Status.IN_PROGRESS, "alice", [str(Action.REVIEW)])],
+        }
+
+        reporter = Reporter(self.report_config)
+
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            reporter.generate_team_report(issues_by_user)
+            output = fake_out.getvalue().strip().split('\n')
+
+        self.assertEqual(output, [
+            "# alice", "Daily Report", "* PROJ-1 First story", f"  * {Action.IMPLEMENTATION}",
+            "",
+            "# bob", "Daily Report", "* PROJ-1 First story", f"  * {Action.REVIEW}",
+        ])
+
+    def test_generate_report_by_day(self):
+        user = Author(display_name="testuser")
+        issues = [
+            Issue("PROJ-1", "Story", "First story", Status.IN_PROGRESS, "testuser", [str(Action.IMPLEMENTATION)], "indeterminate", True,
+                  [Event(datetime(2024, 5, 3, 10).astimezone(), user, Action.IMPLEMENTATION)]),
+            Issue("PROJ-2", "Bug", "A bug to fix", Status.DONE, "testuser", [str(Action.DONE)], "done", False,
+                  [Event(datetime(2024, 5, 6, 9).astimezone(), user, Action.DONE)]),
+        ]
+        window = ReportWindow(local_midnight(date(2024, 5, 3)), day_count=4, current=True)
+
+        reporter = Reporter(self.report_config)
+
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            reporter.generate_report(issues, window)
+            output = fake_out.getvalue().strip().split('\n')
+
+        self.assertEqual(output, [
+            "Daily Report",
+            "## vendredi 03/05/2024", "* PROJ-1 First story", f"  * {Action.IMPLEMENTATION}",
+            "## samedi 04/05/2024", "No issues found.",
+            "## dimanche 05/05/2024", "No issues found.",
+            # The issue in progress is reported on the current day, without any action on that day
+            "## lundi 06/05/2024", "* PROJ-1 First story", f"  * {Action.IMPLEMENTATION} (en cours)", "* PROJ-2 A bug to fix", f"  * {Action.DONE}",
+        ])
+
+    def test_report_missing(self):
+        reporter = Reporter(self.report_config)
+
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            reporter.report_missing([])
+            self.assertEqual(fake_out.getvalue(), "")
+            reporter.report_missing(["the changes and comments of 1 issues (PROJ-1)"])
+            output = fake_out.getvalue().strip().split('\n')
+
+        self.assertEqual(output, [
+            "Incomplete report, missing when the deadline expired:",
+            "  * the changes and comments of 1 issues (PROJ-1)",
+        ])
+
 
 if __name__ == '__main__':
     unittest.main()
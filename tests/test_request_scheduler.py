@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import requests
+from jira import JIRAError
+
+from request_scheduler import DeadlineExceeded, RequestScheduler, _retry_after
+
+
+def _throttled(retry_after: str | None = '0') -> JIRAError:
+    headers = {'Retry-After': retry_after} if retry_after is not None else {}
+    return JIRAError(status_code=429, text='Rate limit exceeded', response=MagicMock(headers=headers))
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def test_throttled_request_is_retried_with_less_concurrency(self):
+        scheduler = RequestScheduler(max_concurrency=8)
+        fetch = MagicMock(side_effect=[_throttled(), 'response'])
+
+        self.assertEqual(scheduler.call(fetch), 'response')
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertLess(scheduler.concurrency_limit, 8)
+        self.assertEqual(scheduler.profiler.counters['scheduler.throttled'], 1)
+        self.assertEqual(scheduler.profiler.counters['scheduler.retries'], 1)
+
+    def test_concurrency_ramps_up_when_healthy(self):
+        scheduler = RequestScheduler(max_concurrency=8)
+        scheduler.concurrency_limit = 2.0
+
+        for _ in range(40):
+            scheduler.call(lambda: None)
+
+        self.assertEqual(scheduler.concurrency_limit, 8)
+
+    def test_client_errors_are_not_retried(self):
+        scheduler = RequestScheduler(max_concurrency=8)
+        fetch = MagicMock(side_effect=JIRAError(status_code=404))
+
+        with self.assertRaises(JIRAError):
+            scheduler.call(fetch)
+        fetch.assert_called_once()
+
+    @patch('request_scheduler.retry_delay', return_value=0)
+    def test_retries_are_bounded(self, mock_retry_delay):
+        scheduler = RequestScheduler(max_concurrency=8, max_retries=3)
+        fetch = MagicMock(side_effect=ConnectionError("Connection reset"))
+
+        with self.assertRaises(ConnectionError):
+            scheduler.call(fetch)
+        self.assertEqual(fetch.call_count, 4)
+        self.assertEqual([call.args for call in mock_retry_delay.call_args_list], [(0,), (1,), (2,)])
+
+    def test_rate_limit(self):
+        scheduler = RequestScheduler(max_concurrency=8, rate_limit=50)
+
+        started = time.monotonic()
+        for _ in range(60):
+            scheduler.call(lambda: None)
+
+        # The first 50 requests are a burst, the next 10 are paced at 50 per second
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+    def test_concurrency_limit(self):
+        scheduler = RequestScheduler(max_concurrency=3)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: scheduler.call(fetch), range(24)))
+
+        self.assertEqual(max(peak), 3)
+
+    def test_async_throttled_request_is_retried(self):
+        scheduler = RequestScheduler(max_concurrency=8)
+        responses = iter([_throttled(), 'response'])
+
+        async def fetch():
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.assertEqual(asyncio.run(scheduler.call_async(fetch)), 'response')
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_no_request_past_the_deadline(self):
+        scheduler = RequestScheduler(max_concurrency=8, deadline=time.monotonic() - 1)
+        fetch = MagicMock()
+
+        with self.assertRaises(DeadlineExceeded):
+            scheduler.call(fetch)
+        fetch.assert_not_called()
+        self.assertEqual(scheduler.remaining(), 0)
+
+    def test_no_retry_past_the_deadline(self):
+        scheduler = RequestScheduler(max_concurrency=8, deadline=time.monotonic() + 0.5)
+        fetch = MagicMock(side_effect=_throttled('30'))
+
+        with self.assertRaises(JIRAError):
+            scheduler.call(fetch)
+        fetch.assert_called_once()
+
+    def test_request_cut_short_by_the_deadline(self):
+        scheduler = RequestScheduler(max_concurrency=8, deadline=time.monotonic() + 0.1)
+
+        def fetch():
+            time.sleep(0.2)
+            raise requests.ReadTimeout("Read timed out.")
+
+        with self.assertRaises(DeadlineExceeded):
+            scheduler.call(fetch)
+
+    def test_retry_after(self):
+        self.assertEqual(_retry_after(_throttled('3')), 3)
+        self.assertIsNone(_retry_after(_throttled(None)))
+        self.assertEqual(_retry_after(_throttled('Wed, 21 Oct 2015 07:28:00 GMT')), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()